@@ -1,16 +1,140 @@
 #!/usr/bin/env python3
 """
 Clone Your Voice - Main Entry Point
-Run the voice cloning web application
+Run the voice cloning web application, or synthesize a file of texts offline
+
+    python main.py [serve]
+    python main.py synth --voice dave --input prompts.txt [--workers 4 --threads 2]
+
+With FLASK_ENV=production `serve` starts the async production server;
+otherwise the Flask development server.
 """
+import argparse
+import os
 import sys
+from datetime import datetime
 from pathlib import Path
 
 # Add src directory to Python path
 src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
-from src.api.app import run_app
+
+def serve(args):
+    """Start the web server"""
+    if os.getenv('FLASK_ENV', 'development') == 'production':
+        from src.api.asgi import run_production
+        run_production()
+    else:
+        from src.api.app import run_app
+        run_app()
+
+
+def synth(args):
+    """Synthesize every text of an input file with one voice"""
+    from src.config.logging_config import setup_logging
+    from src.config.settings import get_config
+    from src.services.offline_synthesis import (
+        plan_workers, resolve_voice, run_offline_synthesis, usable_cores
+    )
+    from src.utils.audio import get_audio_format
+    from src.utils.manifest import parse_manifest
+
+    config = get_config()
+    setup_logging(level=args.log_level)
+
+    if get_audio_format(args.format) is None:
+        sys.exit(f"Unsupported output format: {args.format}")
+
+    voice, error = resolve_voice(args.voice, config.SAMPLES_FOLDER, args.ref_text)
+    if error:
+        sys.exit(error)
+
+    input_path = Path(args.input)
+    if not input_path.is_file():
+        sys.exit(f"Input file not found: {input_path}")
+    items, error = parse_manifest(
+        input_path.read_text(encoding='utf-8-sig'), input_path.name, max_items=args.max_items
+    )
+    if error:
+        sys.exit(f"{input_path}: {error}")
+
+    workers, threads = plan_workers(len(usable_cores()), args.workers, args.threads)
+    output_dir = Path(args.output) if args.output else (
+        # Outside the web output folder, which the storage reaper sweeps
+        config.DATA_DIR / "synth" / datetime.now().strftime('%Y%m%d_%H%M%S')
+    )
+
+    def report(done, total):
+        print(f"\r{done}/{total} items", end="", file=sys.stderr, flush=True)
+
+    try:
+        summary = run_offline_synthesis(
+            items,
+            voice,
+            output_dir,
+            engine_kwargs=dict(
+                backbone_repo=config.TTS_BACKBONE_REPO,
+                backbone_device=config.TTS_BACKBONE_DEVICE,
+                codec_repo=config.TTS_CODEC_REPO,
+                codec_device=config.TTS_CODEC_DEVICE,
+                weights_cache_dir=config.TTS_WEIGHTS_CACHE
+            ),
+            workers=workers,
+            threads_per_worker=threads,
+            output_format=args.format,
+            language=args.language,
+            max_tokens=config.TTS_MAX_TOKENS,
+            generation_batch_size=args.batch_size or config.TTS_GENERATION_BATCH_SIZE,
+            decode_batch_size=config.TTS_DECODE_BATCH_SIZE,
+            pin_cores=args.pin_cores,
+            on_progress=report
+        )
+    except RuntimeError as e:
+        sys.exit(f"\n{e}")
+
+    print(file=sys.stderr)
+    print(f"Output:       {output_dir}")
+    print(f"Items:        {summary.completed} completed, {summary.failed} failed")
+    print(f"Workers:      {summary.workers} x {summary.threads_per_worker} thread(s)")
+    print(f"Wall time:    {summary.wall_seconds:.1f}s")
+    print(f"Audio:        {summary.audio_seconds:.1f}s ({summary.real_time_factor:.2f}x real time)")
+    for stats in summary.worker_stats:
+        print(
+            f"  worker {stats['pid']}: load {stats['load_seconds']:.1f}s, "
+            f"{stats['items']} items, busy {stats['busy_seconds']:.1f}s"
+        )
+    if summary.failed:
+        sys.exit(1)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command line interface"""
+    parser = argparse.ArgumentParser(description="Clone Your Voice")
+    subcommands = parser.add_subparsers(dest="command")
+
+    subcommands.add_parser("serve", help="Run the web application (default)").set_defaults(handler=serve)
+
+    synth_parser = subcommands.add_parser("synth", help="Synthesize a file of texts offline")
+    synth_parser.add_argument("--voice", required=True,
+                              help="Sample name, reference audio file or .pt codes file")
+    synth_parser.add_argument("--ref-text", help="Transcript of the reference (default: the voice's .txt)")
+    synth_parser.add_argument("--input", required=True,
+                              help="Texts: .txt (one per line), .jsonl or .csv manifest")
+    synth_parser.add_argument("--output", help="Output directory (default: data/synth/<timestamp>)")
+    synth_parser.add_argument("--format", default="wav", help="Output format (wav, flac, opus, mp3)")
+    synth_parser.add_argument("--language", default="en-us", help="Language code")
+    synth_parser.add_argument("--workers", type=int, help="Worker processes (default: cores / threads)")
+    synth_parser.add_argument("--threads", type=int, help="Compute threads per worker (default: up to 4)")
+    synth_parser.add_argument("--pin-cores", action="store_true", help="Give each worker dedicated cores")
+    synth_parser.add_argument("--batch-size", type=int, help="Chunks per backbone pass")
+    synth_parser.add_argument("--max-items", type=int, default=100000, help="Maximum number of texts")
+    synth_parser.add_argument("--log-level", default="WARNING", help="Log level")
+    synth_parser.set_defaults(handler=synth)
+
+    return parser
+
 
 if __name__ == '__main__':
-    run_app()
+    args = build_parser().parse_args()
+    getattr(args, 'handler', serve)(args)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Watermark Benchmark
+Measures Perth watermarking cost per second of audio
+
+Usage:
+    python scripts/benchmark_watermark.py [--durations 0.5 1 5 30] [--repeats 3]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import perth
+
+# Allow running from the repository root without installing
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.tts.streaming import StreamingProcessor
+
+SAMPLE_RATE = 24_000
+HOP_LENGTH = 480
+
+
+def time_watermark(watermarker, n_samples: int, repeats: int) -> float:
+    """Return the best wall time (seconds) to watermark n_samples of audio"""
+    wav = (np.random.default_rng(0).standard_normal(n_samples) * 0.1).astype(np.float32)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        watermarker.apply_watermark(wav, sample_rate=SAMPLE_RATE)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark watermark cost per second of audio")
+    parser.add_argument("--durations", type=float, nargs="+", default=[0.5, 1.0, 5.0, 30.0],
+                        help="Audio durations in seconds to watermark")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per duration")
+    args = parser.parse_args()
+
+    watermarker = perth.PerthImplicitWatermarker()
+
+    # Warm-up so model loading and first-call overhead are not measured
+    time_watermark(watermarker, SAMPLE_RATE, repeats=1)
+
+    print(f"{'audio (s)':>10} {'time (ms)':>10} {'ms / audio s':>13}")
+    for duration in args.durations:
+        elapsed = time_watermark(watermarker, int(duration * SAMPLE_RATE), args.repeats)
+        print(f"{duration:>10.2f} {elapsed * 1000:>10.1f} {elapsed * 1000 / duration:>13.1f}")
+
+    # Streaming: the full decode window used to be watermarked for every emitted chunk
+    processor = StreamingProcessor(decoder=None, watermarker=watermarker, hop_length=HOP_LENGTH)
+    emitted = processor.stride_samples
+    window = processor.window_frames * HOP_LENGTH
+    per_chunk_window = time_watermark(watermarker, window, args.repeats)
+    per_chunk_emitted = time_watermark(watermarker, emitted, args.repeats)
+    chunk_seconds = emitted / SAMPLE_RATE
+
+    print()
+    print(f"Streaming chunk: {chunk_seconds:.2f}s emitted from a {window / SAMPLE_RATE:.2f}s decode window")
+    print(f"  watermark full window:    {per_chunk_window * 1000 / chunk_seconds:>8.1f} ms / audio s")
+    print(f"  watermark emitted only:   {per_chunk_emitted * 1000 / chunk_seconds:>8.1f} ms / audio s")
+
+
+if __name__ == "__main__":
+    main()
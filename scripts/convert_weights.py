@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Weight Cache Converter
+Downloads the configured models once and stores them as pre-converted
+weights in the local weight cache, so engine startup skips Hub resolution
+
+Usage:
+    python scripts/convert_weights.py [--backbone REPO] [--codec REPO] [--cache-dir DIR]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Allow running from the repository root without installing
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config.settings import get_config
+from src.tts import weights
+
+
+def main():
+    config = get_config()
+
+    parser = argparse.ArgumentParser(description="Pre-convert model weights into the local weight cache")
+    parser.add_argument("--backbone", default=config.TTS_BACKBONE_REPO, help="Backbone repo to cache")
+    parser.add_argument("--codec", default=config.TTS_CODEC_REPO, help="Codec repo to cache")
+    parser.add_argument("--cache-dir", type=Path, default=config.TTS_WEIGHTS_CACHE, help="Weight cache directory")
+    args = parser.parse_args()
+
+    print(f"Backbone: {weights.export_backbone(args.backbone, args.cache_dir)}")
+    try:
+        print(f"Codec: {weights.export_codec(args.codec, args.cache_dir)}")
+    except ValueError as e:
+        # The ONNX decoder loads from its own files
+        print(f"Codec: skipped ({e})")
+
+
+if __name__ == '__main__':
+    main()
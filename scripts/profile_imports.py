@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Import Profiler
+Reports web-tier import time, the slowest imports and any ML-stack modules
+pulled in; exits non-zero when over budget
+
+Usage:
+    python scripts/profile_imports.py [--modules src.api.app ...] [--top 15] [--budget 1.0]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Allow running from the repository root without installing
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.import_profile import (
+    WEB_TIER_IMPORT_BUDGET_SECONDS,
+    WEB_TIER_MODULES,
+    profile_imports,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile web-tier import time")
+    parser.add_argument("--modules", nargs="+", default=list(WEB_TIER_MODULES), help="Modules to import")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list")
+    parser.add_argument("--budget", type=float, default=WEB_TIER_IMPORT_BUDGET_SECONDS,
+                        help="Import time budget in seconds")
+    args = parser.parse_args()
+
+    profile = profile_imports(tuple(args.modules))
+
+    print(f"{'cumulative (ms)':>16}  module")
+    for name, seconds in profile.slowest[:args.top]:
+        print(f"{seconds * 1000:16.1f}  {name}")
+    print()
+    print(f"Imported {len(profile.modules)} modules in {profile.seconds:.3f}s (budget {args.budget:.3f}s)")
+
+    failed = False
+    engine_modules = profile.engine_modules()
+    if engine_modules:
+        print(f"ML-stack modules imported: {', '.join(engine_modules)}")
+        failed = True
+    if profile.seconds > args.budget:
+        print("Over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,8 +9,11 @@ from pathlib import Path
 from src.config.settings import get_config
 from src.config.logging_config import setup_logging, get_logger
 from src.api.middleware.error_handlers import register_error_handlers
+from src.api.middleware.uploads import register_upload_handling
 from src.api.routes.main import main_bp
-from src.api.routes.synthesis import synthesis_bp
+from src.api.routes.synthesis import (
+    synthesis_bp, recover_synthesis_jobs, start_engine_warm_up, start_maintenance
+)
 from src.api.routes.media import media_bp
 
 
@@ -61,6 +64,9 @@ def create_app(env: str = None) -> Flask:
     # Register error handlers
     register_error_handlers(app)
 
+    # Stream uploads to disk, enforcing the size limit while reading
+    register_upload_handling(app)
+
     # Register blueprints
     app.register_blueprint(main_bp)
     app.register_blueprint(synthesis_bp)
@@ -100,6 +106,15 @@ def run_app():
     print("Press Ctrl+C to stop")
     print("=" * 60)
 
+    # Resume interrupted jobs, start storage maintenance and load the model now
+    # rather than on the first request; with the debug reloader only the serving
+    # child process does this
+    if not config.DEBUG or os.getenv('WERKZEUG_RUN_MAIN'):
+        recover_synthesis_jobs(config)
+        start_maintenance(config)
+        if config.TTS_EAGER_LOAD:
+            start_engine_warm_up(config)
+
     # Run app
     app.run(
         host=config.HOST,
@@ -0,0 +1,520 @@
+"""
+ASGI Application
+Production serving mode on an async server
+
+Progress (SSE) and audio streams are served natively as async code, so an
+idle connection is a parked coroutine rather than a blocked thread. All
+other routes are delegated to the Flask application, which runs on a pool
+of WSGI_THREADS threads.
+
+Request bodies are received into a spooled temporary file (on disk past
+BODY_SPOOL_MEMORY bytes) while MAX_CONTENT_LENGTH is enforced, so an
+oversized upload is rejected as soon as it crosses the limit rather than
+after it has been received in full.
+"""
+import asyncio
+import contextlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+from typing import IO
+
+from flask import Flask
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
+
+from src.api.app import create_app
+from src.api.routes.synthesis import (
+    claim_progress_stream,
+    recover_synthesis_jobs,
+    release_progress_stream,
+    start_audio_stream,
+    start_engine_warm_up,
+    start_maintenance,
+)
+from src.services.session_manager import get_session_manager
+from src.services.storage_reaper import stop_storage_reaper
+from src.services.tts_service import shutdown_tts_service
+from src.utils.audio import StreamEncoder
+from src.utils.cancellation import SynthesisCancelled
+from src.config.settings import get_config
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_PROGRESS_PATH = re.compile(r"/api/progress/(?P<session_id>[^/]+)")
+_STREAM_PATH = "/api/stream"
+
+# Returned by _next_chunk when an audio stream is exhausted
+_END = object()
+
+# Request bodies up to this size are spooled in memory, larger ones on disk
+BODY_SPOOL_MEMORY = 1024 * 1024
+
+_STREAM_HEADERS = [
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),
+]
+
+
+def _build_environ(scope: dict, body: IO[bytes]) -> dict:
+    """
+    Build a WSGI environ from an ASGI HTTP scope and its request body
+
+    Args:
+        scope: ASGI HTTP scope
+        body: Complete request body (see _spool_body)
+
+    Returns:
+        WSGI environ dict
+    """
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": root_path.encode("utf8").decode("latin1"),
+        "PATH_INFO": path.encode("utf8").decode("latin1"),
+        "QUERY_STRING": scope["query_string"].decode("ascii"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        # The body is complete, so it can be read without a Content-Length
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin1")
+        if name == "content-length":
+            key = "CONTENT_LENGTH"
+        elif name == "content-type":
+            key = "CONTENT_TYPE"
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        value = value.decode("latin1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def _spool_body(scope: dict, receive, max_bytes: int) -> IO[bytes]:
+    """
+    Receive the request body into a spooled temporary file
+
+    Args:
+        scope: ASGI HTTP scope
+        receive: ASGI receive callable
+        max_bytes: Maximum body size
+
+    Returns:
+        Body file positioned at its start (the caller closes it)
+
+    Raises:
+        RequestEntityTooLarge: As soon as the declared or received size exceeds max_bytes
+        ConnectionResetError: If the client disconnects
+    """
+    for name, value in scope.get("headers", []):
+        if name.lower() == b"content-length" and value.isdigit() and int(value) > max_bytes:
+            raise RequestEntityTooLarge()
+
+    body = SpooledTemporaryFile(max_size=BODY_SPOOL_MEMORY)
+    try:
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise ConnectionResetError("Client disconnected while sending the request")
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > max_bytes:
+                raise RequestEntityTooLarge()
+            body.write(chunk)
+            if not message.get("more_body"):
+                break
+    except BaseException:
+        body.close()
+        raise
+    body.seek(0)
+    return body
+
+
+async def _send_too_large(send, config):
+    """Send the 413 response of the Flask error handler"""
+    await _send_json(send, 413, {
+        "error": "File Too Large",
+        "message": f"The uploaded file is too large. Maximum size is {config.MAX_UPLOAD_SIZE_MB}MB."
+    })
+
+
+async def _wait_for_disconnect(receive):
+    """Return once the client has disconnected"""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _unless_disconnected(awaitable, disconnected: asyncio.Future) -> tuple:
+    """
+    Await a result unless the client disconnects first
+
+    Returns:
+        Tuple of (completed, result); completed is False on disconnect
+    """
+    task = asyncio.ensure_future(awaitable)
+    await asyncio.wait({task, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+    if task.done():
+        return True, task.result()
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    return False, None
+
+
+async def _next_chunk(chunks):
+    """Next item of an async generator, or _END when it is exhausted"""
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return _END
+
+
+async def _send_json(send, status: int, payload: dict):
+    """Send a complete JSON response"""
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_flask_response(send, response):
+    """Send a complete (non-streaming) Flask response"""
+    body = response.get_data()
+    await send({
+        "type": "http.response.start",
+        "status": response.status_code,
+        "headers": [
+            (name.lower().encode("latin1"), value.encode("latin1"))
+            for name, value in response.headers.items()
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AsyncServingApp:
+    """
+    ASGI application serving streams natively and everything else via Flask
+
+    The synthesis workers feed progress and audio to the event loop, which
+    writes them to clients; a disconnect cancels the job just like with the
+    WSGI routes. Flask requests run concurrently on a thread pool.
+    """
+
+    def __init__(self, flask_app: Flask, config):
+        """
+        Initialize ASGI application
+
+        Args:
+            flask_app: Configured Flask application
+            config: Application configuration
+        """
+        self.flask_app = flask_app
+        self.config = config
+        self._wsgi_executor = ThreadPoolExecutor(
+            max_workers=max(1, config.WSGI_THREADS), thread_name_prefix="wsgi"
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        if scope["type"] == "http":
+            path = scope["path"]
+            root_path = scope.get("root_path", "")
+            if root_path and path.startswith(root_path):
+                path = path[len(root_path):]
+
+            match = _PROGRESS_PATH.fullmatch(path)
+            if match and scope["method"] == "GET":
+                await self._progress(receive, send, match.group("session_id"))
+                return
+            if path == _STREAM_PATH and scope["method"] in ("GET", "POST"):
+                await self._stream(scope, receive, send)
+                return
+
+        await self._wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        """Handle server startup and shutdown"""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await asyncio.to_thread(recover_synthesis_jobs, self.config)
+                start_maintenance(self.config)
+                if self.config.TTS_EAGER_LOAD:
+                    # Warm-up runs in the background; /ready reports when it is done
+                    start_engine_warm_up(self.config)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await asyncio.to_thread(stop_storage_reaper)
+                await asyncio.to_thread(shutdown_tts_service)
+                self._wsgi_executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _wsgi(self, scope, receive, send):
+        """Receive the request body, then run the Flask app on the WSGI thread pool"""
+        if scope["type"] != "http":
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+        try:
+            body = await _spool_body(scope, receive, self.config.MAX_CONTENT_LENGTH)
+        except ConnectionResetError:
+            return
+        except RequestEntityTooLarge:
+            await _send_too_large(send, self.config)
+            return
+
+        loop = asyncio.get_running_loop()
+        environ = _build_environ(scope, body)
+
+        def send_from_thread(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def run():
+            response_start = {}
+
+            def send_body(data: bytes):
+                if "sent" not in response_start:
+                    response_start["sent"] = True
+                    send_from_thread(response_start["message"])
+                if data:
+                    send_from_thread({"type": "http.response.body", "body": data, "more_body": True})
+
+            def start_response(status, headers, exc_info=None):
+                if exc_info is not None and "sent" in response_start:
+                    raise exc_info[1].with_traceback(exc_info[2])
+                response_start["message"] = {
+                    "type": "http.response.start",
+                    "status": int(status.split(" ", 1)[0]),
+                    "headers": [
+                        (name.lower().encode("latin1"), value.encode("latin1"))
+                        for name, value in headers
+                    ],
+                }
+                return send_body
+
+            result = self.flask_app(environ, start_response)
+            try:
+                for data in result:
+                    send_body(data)
+                send_body(b"")
+                send_from_thread({"type": "http.response.body", "body": b""})
+            finally:
+                if hasattr(result, "close"):
+                    result.close()
+
+        with body:
+            await loop.run_in_executor(self._wsgi_executor, run)
+
+    async def _progress(self, receive, send, session_id: str):
+        """Stream progress updates via Server-Sent Events"""
+        # Session and job calls may wait on SQLite or the job queue lock, so
+        # they run off the event loop
+        session_manager = await asyncio.to_thread(
+            get_session_manager,
+            self.config.SESSION_TIMEOUT_SECONDS,
+            backend=self.config.SESSION_BACKEND,
+            db_path=self.config.SESSION_DB_PATH
+        )
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream"), *_STREAM_HEADERS],
+        })
+
+        if not await asyncio.to_thread(session_manager.has_session, session_id):
+            event = f"data: {json.dumps({'error': 'Invalid session ID'})}\n\n"
+            await send({"type": "http.response.body", "body": event.encode()})
+            return
+
+        owner = claim_progress_stream(session_id)
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+        finished = False
+        try:
+            while True:
+                connected, update = await _unless_disconnected(
+                    session_manager.get_progress_async(session_id, timeout=30), disconnected
+                )
+                if not connected:
+                    return
+
+                event = f"data: {json.dumps(update)}\n\n"
+                await send({"type": "http.response.body", "body": event.encode(), "more_body": True})
+
+                # If complete or error, clean up and exit
+                if update.get("complete") or update.get("error"):
+                    finished = True
+                    await asyncio.to_thread(session_manager.delete_session, session_id)
+                    break
+
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            disconnected.cancel()
+            if owner:
+                await asyncio.to_thread(release_progress_stream, session_id, finished)
+
+    async def _stream(self, scope, receive, send):
+        """Synthesize and stream audio while it is generated"""
+        try:
+            body = await _spool_body(scope, receive, self.config.MAX_CONTENT_LENGTH)
+        except ConnectionResetError:
+            return
+        except RequestEntityTooLarge:
+            await _send_too_large(send, self.config)
+            return
+
+        loop = asyncio.get_running_loop()
+        environ = _build_environ(scope, body)
+
+        def prepare():
+            # Validation, uploads and queueing reuse the Flask request handling
+            with self.flask_app.request_context(environ):
+                audio_format, job_id, chunks, error_response = start_audio_stream(loop)
+                if error_response is not None:
+                    return None, None, None, self.flask_app.make_response(error_response)
+                return audio_format, job_id, chunks, None
+
+        try:
+            audio_format, job_id, chunks, error_response = await asyncio.to_thread(prepare)
+        except HTTPException as e:
+            # Rejected while parsing the upload
+            await _send_json(send, e.code, {"error": e.description})
+            return
+        except Exception as e:
+            logger.error(f"Error starting audio stream: {e}", exc_info=True)
+            await _send_json(send, 500, {"error": str(e)})
+            return
+        finally:
+            # The request (and any upload) has been parsed
+            body.close()
+        if error_response is not None:
+            await _send_flask_response(send, error_response)
+            return
+
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+        encoder = None
+        try:
+            # Wait for the first chunk before responding so setup errors get a proper status
+            try:
+                connected, chunk = await _unless_disconnected(_next_chunk(chunks), disconnected)
+            except ValueError as e:
+                await _send_json(send, 400, {"error": str(e)})
+                return
+            except Exception as e:
+                logger.error(f"Error starting audio stream: {e}", exc_info=True)
+                await _send_json(send, 500, {"error": str(e)})
+                return
+            if not connected:
+                return
+            if chunk is _END:
+                await _send_json(send, 500, {"error": "No audio generated"})
+                return
+
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", audio_format.mimetype.encode()),
+                    *_STREAM_HEADERS,
+                    (b"x-job-id", job_id.encode()),
+                ],
+            })
+
+            encoder = StreamEncoder(audio_format, self.config.TTS_SAMPLE_RATE)
+            while chunk is not _END:
+                data = encoder.encode(chunk)
+                if data:
+                    await send({"type": "http.response.body", "body": data, "more_body": True})
+                connected, chunk = await _unless_disconnected(_next_chunk(chunks), disconnected)
+                if not connected:
+                    return
+
+            await send({"type": "http.response.body", "body": encoder.finish()})
+
+        except SynthesisCancelled as e:
+            logger.info(f"Audio stream {job_id} cancelled: {e}")
+        except Exception as e:
+            logger.error(f"Error in audio stream: {e}", exc_info=True)
+        finally:
+            disconnected.cancel()
+            if encoder is not None:
+                encoder.close()
+            # Cancels the job if it is still running
+            await chunks.aclose()
+
+
+def create_asgi_app(env: str = None) -> AsyncServingApp:
+    """
+    ASGI application factory
+
+    Args:
+        env: Environment name (development, production, testing)
+             If None, uses FLASK_ENV environment variable
+
+    Returns:
+        ASGI application
+    """
+    return AsyncServingApp(create_app(env), get_config(env))
+
+
+def run_production():
+    """
+    Run the production server (uvicorn)
+
+    The model runs in TTS_ENGINE_PROCESSES dedicated processes. This starts
+    one server process; with SESSION_BACKEND=sqlite, more can run on the
+    same host behind a load balancer.
+    """
+    import uvicorn
+
+    env = os.getenv('FLASK_ENV', 'production')
+    app = create_asgi_app(env)
+    config = get_config(env)
+
+    print("=" * 60)
+    print("NeuTTS-Air Web Interface - Clone Your Voice")
+    print("=" * 60)
+    print(f"Environment: {config.ENV} (async server)")
+    print(f"Engine processes: {config.TTS_ENGINE_PROCESSES}")
+    print(f"Starting server on http://{config.HOST}:{config.PORT}")
+    print("Press Ctrl+C to stop")
+    print("=" * 60)
+
+    uvicorn.run(
+        app,
+        host=config.HOST,
+        port=config.PORT,
+        log_config=None,
+        proxy_headers=True
+    )
@@ -2,7 +2,7 @@
 Error Handlers
 Centralized error handling for Flask application
 """
-from flask import jsonify
+from flask import current_app, jsonify
 from werkzeug.exceptions import HTTPException
 from src.config.logging_config import get_logger
 
@@ -41,7 +41,10 @@ def register_error_handlers(app):
         logger.warning(f"File too large: {error}")
         return jsonify({
             "error": "File Too Large",
-            "message": "The uploaded file is too large. Maximum size is 50MB."
+            "message": (
+                "The uploaded file is too large. "
+                f"Maximum size is {current_app.config['MAX_UPLOAD_SIZE_MB']}MB."
+            )
         }), 413
 
     @app.errorhandler(500)
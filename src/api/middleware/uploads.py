@@ -0,0 +1,40 @@
+"""
+Upload Handling
+Streams uploaded files straight into the upload directory
+"""
+from pathlib import Path
+from flask import Request, current_app, request
+
+from src.services.file_manager import UploadSpool
+
+
+class UploadRequest(Request):
+    """
+    Request whose uploaded files are written once, into the upload directory
+
+    Werkzeug would spool each file part to a temporary file elsewhere, to be
+    copied into place afterwards. Here each part goes into an UploadSpool,
+    which enforces MAX_UPLOAD_SIZE_MB while the body is read and is renamed
+    into place by the file manager.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        config = current_app.config
+        return UploadSpool(Path(config['UPLOAD_FOLDER']), config['MAX_UPLOAD_SIZE_MB'] * 1024 * 1024)
+
+
+def register_upload_handling(app):
+    """
+    Stream uploads of the Flask app to disk
+
+    Args:
+        app: Flask application instance
+    """
+    app.request_class = UploadRequest
+
+    @app.before_request
+    def parse_uploads():
+        """Read multipart bodies before the view, so oversized files get a 413 response"""
+        if request.mimetype == 'multipart/form-data':
+            # Accessing the files parses the whole body, form fields included
+            request.files
@@ -2,8 +2,9 @@
 Main Routes
 Homepage and utility routes
 """
-from flask import Blueprint, render_template, jsonify
-from src.utils.helpers import get_sample_files
+from flask import Blueprint, render_template, jsonify, request
+from src.services.sample_catalog import get_sample_catalog
+from src.api.routes.synthesis import get_engine_readiness
 from src.config.settings import get_config
 from src.config.logging_config import get_logger
 
@@ -22,12 +23,15 @@ def index():
 
 @main_bp.route('/api/samples')
 def list_samples():
-    """List available sample files"""
+    """List available sample files (revalidated with the catalog's ETag)"""
     try:
         config = get_config()
-        samples = get_sample_files(config.SAMPLES_FOLDER)
-        logger.debug(f"Returning {len(samples)} samples")
-        return jsonify({'samples': samples})
+        payload, etag = get_sample_catalog(config.SAMPLES_FOLDER).listing()
+        logger.debug(f"Returning {len(payload['samples'])} samples")
+        response = jsonify(payload)
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
     except Exception as e:
         logger.error(f"Error listing samples: {e}")
         return jsonify({'error': str(e)}), 500
@@ -40,3 +44,17 @@ def health():
         'status': 'healthy',
         'service': 'clone-your-voice'
     }), 200
+
+
+@main_bp.route('/ready')
+def ready():
+    """Readiness endpoint: succeeds once the TTS engine is loaded and warmed up"""
+    is_ready, error = get_engine_readiness()
+    if is_ready:
+        return jsonify({'status': 'ready', 'service': 'clone-your-voice'}), 200
+
+    response = {'status': 'warming_up', 'service': 'clone-your-voice'}
+    if error:
+        response['status'] = 'failed'
+        response['error'] = error
+    return jsonify(response), 503
@@ -2,9 +2,14 @@
 Media Routes
 Audio file download and playback endpoints
 """
-from flask import Blueprint, jsonify, send_file
+from pathlib import Path
+from typing import Optional
+from flask import Blueprint, Response, jsonify, request, send_file
 
 from src.services.file_manager import get_file_manager
+from src.services.output_store import get_output_store
+from src.utils.audio import format_for_path, negotiate_format
+from src.utils.helpers import compute_file_etag
 from src.config.settings import get_config
 from src.config.logging_config import get_logger
 
@@ -13,30 +18,129 @@ logger = get_logger(__name__)
 media_bp = Blueprint('media', __name__, url_prefix='/api')
 
 
-@media_bp.route('/download/<filename>')
-def download(filename):
-    """Download generated audio file"""
+def _resolve_output(filename):
+    """
+    Resolve an output file in the format negotiated for the current request
+
+    Content-addressed outputs are looked up in the output index; other
+    files in the output folder (older outputs) are served directly. The
+    format comes from the ``format`` query parameter or the Accept
+    header; when the client accepts the stored format it is served as is,
+    otherwise a cached encoded variant is used (and created if missing).
+
+    Args:
+        filename: Requested output filename
+
+    Returns:
+        Tuple of (file_path, audio_format, error_response); error_response is
+        None on success
+    """
+    config = get_config()
+    file_manager = get_file_manager(
+        config.UPLOAD_FOLDER,
+        config.OUTPUT_FOLDER,
+        config.SAMPLES_FOLDER
+    )
+
+    output_store = get_output_store(config.OUTPUT_FOLDER, Path(config.OUTPUT_INDEX_PATH))
+    file_path = output_store.resolve(filename) or file_manager.get_output_path(filename)
+    if file_path is None:
+        return None, None, (jsonify({'error': 'File not found'}), 404)
+
+    # The requested name's format is the default; the store may return the
+    # master WAV for a variant that hasn't been encoded yet
+    stored_format = format_for_path(Path(filename)) or format_for_path(file_path)
+    requested = request.args.get('format')
+    audio_format = negotiate_format(
+        requested,
+        request.accept_mimetypes,
+        default=stored_format.name if stored_format else 'wav'
+    )
+    if audio_format is None:
+        return None, None, (jsonify({'error': f'Unsupported output format: {requested}'}), 400)
+
+    if audio_format != format_for_path(file_path):
+        file_path = file_manager.get_output_variant(file_path, audio_format)
+
+    return file_path, audio_format, None
+
+
+def _accel_path(file_path, output_folder) -> Optional[str]:
+    """
+    Path of an output file relative to the output folder, for X-Accel-Redirect
+
+    Returns:
+        POSIX relative path, or None if the file lies outside the output folder
+        (e.g. a batch archive written elsewhere)
+    """
     try:
-        config = get_config()
-        file_manager = get_file_manager(
-            config.UPLOAD_FOLDER,
-            config.OUTPUT_FOLDER,
-            config.SAMPLES_FOLDER
-        )
+        return Path(file_path).resolve().relative_to(Path(output_folder).resolve()).as_posix()
+    except ValueError:
+        return None
 
-        file_path = file_manager.get_output_path(filename)
-        if file_path is None:
-            logger.warning(f"Download requested for non-existent file: {filename}")
-            return jsonify({'error': 'File not found'}), 404
 
-        logger.info(f"Downloading file: {filename}")
-        return send_file(
+def _send_output(file_path, audio_format, as_attachment=False):
+    """
+    Send an output file with strong ETag, range support and immutable caching
+
+    When MEDIA_ACCEL_REDIRECT_PREFIX is configured, transfers of files in
+    the output folder are handed to nginx with X-Accel-Redirect
+    (USE_X_SENDFILE is handled by Flask).
+
+    Args:
+        file_path: Output file to send
+        audio_format: Format of the file
+        as_attachment: Whether to send as a download
+
+    Returns:
+        Flask response
+    """
+    config = get_config()
+    etag = compute_file_etag(file_path)
+
+    relative_path = (
+        _accel_path(file_path, config.OUTPUT_FOLDER) if config.MEDIA_ACCEL_REDIRECT_PREFIX else None
+    )
+    if relative_path is not None:
+        response = Response(mimetype=audio_format.mimetype)
+        response.headers['X-Accel-Redirect'] = (
+            f"{config.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{relative_path}"
+        )
+        if as_attachment:
+            response.headers['Content-Disposition'] = f'attachment; filename="{file_path.name}"'
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = config.MEDIA_CACHE_MAX_AGE
+        response = response.make_conditional(request)
+    else:
+        response = send_file(
             file_path,
-            mimetype='audio/wav',
-            as_attachment=True,
-            download_name=filename
+            mimetype=audio_format.mimetype,
+            as_attachment=as_attachment,
+            download_name=file_path.name,
+            conditional=True,
+            etag=etag,
+            max_age=config.MEDIA_CACHE_MAX_AGE
         )
 
+    response.cache_control.immutable = True
+    # The served variant depends on the Accept header
+    response.vary.add('Accept')
+    return response
+
+
+@media_bp.route('/download/<filename>')
+def download(filename):
+    """Download generated audio file"""
+    try:
+        file_path, audio_format, error_response = _resolve_output(filename)
+        if error_response is not None:
+            logger.warning(f"Download requested for unavailable file: {filename}")
+            return error_response
+
+        logger.info(f"Downloading file: {file_path.name}")
+        return _send_output(file_path, audio_format, as_attachment=True)
+
     except Exception as e:
         logger.error(f"Error downloading file: {e}")
         return jsonify({'error': str(e)}), 500
@@ -45,6 +149,27 @@ def download(filename):
 @media_bp.route('/play/<filename>')
 def play(filename):
     """Stream audio file for playback"""
+    try:
+        file_path, audio_format, error_response = _resolve_output(filename)
+        if error_response is not None:
+            logger.warning(f"Playback requested for unavailable file: {filename}")
+            return error_response
+
+        logger.debug(f"Streaming file: {file_path.name}")
+        return _send_output(file_path, audio_format)
+
+    except Exception as e:
+        logger.error(f"Error playing file: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+# Non-audio outputs of batch jobs
+_BATCH_MIMETYPES = {'.zip': 'application/zip', '.json': 'application/json'}
+
+
+@media_bp.route('/batch/<filename>')
+def download_batch(filename):
+    """Download the output archive or result manifest of a batch job"""
     try:
         config = get_config()
         file_manager = get_file_manager(
@@ -54,16 +179,21 @@ def play(filename):
         )
 
         file_path = file_manager.get_output_path(filename)
-        if file_path is None:
-            logger.warning(f"Playback requested for non-existent file: {filename}")
+        if file_path is None or file_path.suffix not in _BATCH_MIMETYPES:
+            logger.warning(f"Batch download requested for unavailable file: {filename}")
             return jsonify({'error': 'File not found'}), 404
 
-        logger.debug(f"Streaming file: {filename}")
+        logger.info(f"Downloading batch file: {file_path.name}")
         return send_file(
             file_path,
-            mimetype='audio/wav'
+            mimetype=_BATCH_MIMETYPES[file_path.suffix],
+            as_attachment=True,
+            download_name=file_path.name,
+            conditional=True,
+            etag=compute_file_etag(file_path),
+            max_age=config.MEDIA_CACHE_MAX_AGE
         )
 
     except Exception as e:
-        logger.error(f"Error playing file: {e}")
+        logger.error(f"Error downloading batch file: {e}")
         return jsonify({'error': str(e)}), 500
@@ -3,15 +3,24 @@ Synthesis Routes
 TTS synthesis and progress tracking endpoints
 """
 import json
-from flask import Blueprint, request, jsonify, Response, stream_with_context
+import threading
 from pathlib import Path
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 
-from src.models.synthesis_request import SynthesisRequest
+from src.models.synthesis_request import BatchSynthesisRequest, SynthesisRequest
 from src.services.session_manager import get_session_manager
-from src.services.tts_service import get_tts_service
+from src.services.tts_service import active_synthesis_jobs, get_tts_service
+from src.services.job_queue import PRIORITY_CLASSES, QueueFullError
+from src.services.job_store import get_job_store
+from src.services.output_store import get_output_store
 from src.services.file_manager import get_file_manager
-from src.utils.validators import validate_text_input, validate_sample_name
-from src.utils.helpers import generate_session_id
+from src.services.sample_catalog import get_sample_catalog
+from src.services.storage_reaper import StoragePolicy, start_storage_reaper
+from src.utils.validators import validate_text_input
+from src.utils.helpers import find_reference_sample, generate_session_id
+from src.utils.manifest import parse_manifest
+from src.utils.audio import encode_stream, get_audio_format, negotiate_format
+from src.utils.cancellation import SynthesisCancelled
 from src.config.settings import get_config
 from src.config.logging_config import get_logger
 
@@ -19,126 +28,573 @@ logger = get_logger(__name__)
 
 synthesis_bp = Blueprint('synthesis', __name__, url_prefix='/api')
 
+# Sessions with an open owning progress stream (see claim_progress_stream)
+_progress_owners: set[str] = set()
+_progress_owners_lock = threading.Lock()
+
+
+def _resolve_reference(config, file_manager):
+    """
+    Resolve the reference voice of the current request
+
+    Uses the named sample of the sample catalog (its precomputed codes if
+    any, and its transcript unless ``ref_text`` is given) when
+    ``use_sample`` is set, otherwise saves the uploaded ``ref_audio``.
+
+    Args:
+        config: Application configuration
+        file_manager: File manager for uploads
+
+    Returns:
+        Tuple of (ref_audio_path, ref_text, error_response); error_response
+        is None on success
+    """
+    ref_text = request.values.get('ref_text', '').strip()
+    use_sample = request.values.get('use_sample', 'false') == 'true'
+    sample_name = request.values.get('sample_name', '')
+
+    if use_sample and sample_name:
+        # Use sample file, or its precomputed codes
+        sample = get_sample_catalog(config.SAMPLES_FOLDER).get(sample_name)
+        if sample is None:
+            return None, None, (jsonify({'error': f'Sample not found: {sample_name}'}), 404)
+        ref_audio_path = sample.reference_path
+
+        # Use the sample's transcript if no reference text was provided
+        if not ref_text:
+            ref_text = sample.transcript
+            if not ref_text:
+                return None, None, (jsonify({'error': 'Reference text is required'}), 400)
+    else:
+        # Use uploaded file
+        if 'ref_audio' not in request.files:
+            return None, None, (jsonify({'error': 'Reference audio is required'}), 400)
+
+        ref_audio = request.files['ref_audio']
+        if ref_audio.filename == '':
+            return None, None, (jsonify({'error': 'No reference audio selected'}), 400)
+
+        # Save uploaded file
+        success, ref_audio_path, error_msg = file_manager.save_uploaded_audio(
+            ref_audio,
+            max_size_mb=config.MAX_UPLOAD_SIZE_MB,
+            max_duration_seconds=config.UPLOAD_MAX_DURATION_SECONDS
+        )
+        if not success:
+            return None, None, (jsonify({'error': error_msg}), 400)
+
+    # Validate reference text
+    is_valid, error_msg = validate_text_input(ref_text, field_name="Reference text")
+    if not is_valid:
+        return None, None, (jsonify({'error': error_msg}), 400)
+
+    return ref_audio_path, ref_text, None
+
+
+def _build_synthesis_request(config, file_manager, session_id=None):
+    """
+    Build a synthesis request from the current request's form/query data
+
+    Args:
+        config: Application configuration
+        file_manager: File manager for samples and uploads
+        session_id: Optional session to attach to the request
+
+    Returns:
+        Tuple of (synthesis_request, error_response); exactly one is None
+    """
+    # Get form data
+    input_text = request.values.get('input_text', '').strip()
+    language = request.values.get('language', 'en-us')
+
+    # Choose output format from the request field or the Accept header
+    audio_format = negotiate_format(request.values.get('format'), request.accept_mimetypes)
+    if audio_format is None:
+        return None, (jsonify({'error': f"Unsupported output format: {request.values.get('format')}"}), 400)
+
+    # Validate input text
+    is_valid, error_msg = validate_text_input(input_text, field_name="Input text")
+    if not is_valid:
+        return None, (jsonify({'error': error_msg}), 400)
+
+    ref_audio_path, ref_text, error_response = _resolve_reference(config, file_manager)
+    if error_response is not None:
+        return None, error_response
+
+    synthesis_request = SynthesisRequest(
+        input_text=input_text,
+        ref_text=ref_text,
+        ref_audio_path=ref_audio_path,
+        backbone=config.TTS_BACKBONE_REPO,
+        max_tokens=config.TTS_MAX_TOKENS,
+        session_id=session_id,
+        language=language,
+        output_format=audio_format.name
+    )
+    return synthesis_request, None
+
+
+def _get_session_manager(config):
+    """Get the global session manager configured from application settings"""
+    return get_session_manager(
+        config.SESSION_TIMEOUT_SECONDS,
+        backend=config.SESSION_BACKEND,
+        db_path=config.SESSION_DB_PATH
+    )
+
+
+def _get_tts_service(config, session_manager):
+    """Get the global TTS service configured from application settings"""
+    return get_tts_service(
+        session_manager=session_manager,
+        output_folder=config.OUTPUT_FOLDER,
+        backbone_repo=config.TTS_BACKBONE_REPO,
+        backbone_device=config.TTS_BACKBONE_DEVICE,
+        codec_repo=config.TTS_CODEC_REPO,
+        codec_device=config.TTS_CODEC_DEVICE,
+        decode_batch_size=config.TTS_DECODE_BATCH_SIZE,
+        generation_batch_size=config.TTS_GENERATION_BATCH_SIZE,
+        num_workers=config.SYNTHESIS_WORKERS,
+        max_queue_size=config.SYNTHESIS_QUEUE_SIZE,
+        aging_seconds=config.SYNTHESIS_AGING_SECONDS,
+        engine_processes=config.TTS_ENGINE_PROCESSES,
+        engine_threads=config.TTS_ENGINE_THREADS,
+        long_document_chunks=config.TTS_LONG_DOCUMENT_CHUNKS,
+        crossfade_ms=config.TTS_CROSSFADE_MS,
+        weights_cache_dir=config.TTS_WEIGHTS_CACHE,
+        job_store=get_job_store(Path(config.JOB_STORE_PATH)) if config.JOB_STORE_PATH else None,
+        output_store=get_output_store(config.OUTPUT_FOLDER, Path(config.OUTPUT_INDEX_PATH))
+    )
+
+
+def cancel_synthesis(job_id: str, reason: str) -> bool:
+    """
+    Cancel a synthesis job of the global TTS service
+
+    Args:
+        job_id: Job identifier (the session ID for file synthesis)
+        reason: Why the job was cancelled (for logs)
+
+    Returns:
+        True if the job was found, False if unknown or already finished
+    """
+    config = get_config()
+    session_manager = _get_session_manager(config)
+    return _get_tts_service(config, session_manager).cancel(job_id, reason=reason)
+
+
+def claim_progress_stream(session_id: str) -> bool:
+    """
+    Register a progress stream of a session
+
+    The first stream of a session owns it: only that stream's disconnect
+    cancels the job, so another client following the same session cannot
+    cancel it by leaving.
+
+    Args:
+        session_id: Session identifier
+
+    Returns:
+        True if the calling stream owns the session (and must call
+        release_progress_stream), False if another stream does
+    """
+    with _progress_owners_lock:
+        if session_id in _progress_owners:
+            return False
+        _progress_owners.add(session_id)
+        return True
+
+
+def release_progress_stream(session_id: str, finished: bool):
+    """
+    Unregister the owning progress stream of a session
+
+    Args:
+        session_id: Session identifier
+        finished: Whether the stream saw the job finish; if not, it
+            disconnected and the job is cancelled
+    """
+    with _progress_owners_lock:
+        _progress_owners.discard(session_id)
+    if not finished:
+        cancel_synthesis(session_id, reason="progress stream disconnected")
+
+
+def start_engine_warm_up(config=None):
+    """
+    Load and warm up the engine of the global TTS service in the background
+
+    Args:
+        config: Application configuration (default: from FLASK_ENV)
+    """
+    config = config or get_config()
+    session_manager = _get_session_manager(config)
+    reference = find_reference_sample(config.SAMPLES_FOLDER, config.TTS_WARMUP_SAMPLE)
+    if reference is None:
+        logger.warning(f"No warm-up sample with a transcript in {config.SAMPLES_FOLDER}")
+        reference = (None, None)
+    _get_tts_service(config, session_manager).start_warm_up(*reference)
+
+
+def recover_synthesis_jobs(config=None) -> int:
+    """
+    Resume file synthesis jobs interrupted by a restart
+
+    Args:
+        config: Application configuration (default: from FLASK_ENV)
+
+    Returns:
+        Number of jobs requeued
+    """
+    config = config or get_config()
+    session_manager = _get_session_manager(config)
+    recovered = _get_tts_service(config, session_manager).recover_jobs()
+    if recovered:
+        logger.info(f"Recovered {recovered} interrupted synthesis job(s)")
+    return recovered
+
+
+def start_maintenance(config=None):
+    """
+    Start expiring sessions and enforcing the upload and output storage limits
+
+    Args:
+        config: Application configuration (default: from FLASK_ENV)
+    """
+    config = config or get_config()
+    output_store = get_output_store(config.OUTPUT_FOLDER, Path(config.OUTPUT_INDEX_PATH))
+    policies = [
+        StoragePolicy(
+            config.UPLOAD_FOLDER,
+            max_bytes=config.UPLOAD_QUOTA_MB * 1024 * 1024,
+            max_age_seconds=config.UPLOAD_MAX_AGE_HOURS * 3600
+        ),
+        StoragePolicy(
+            config.OUTPUT_FOLDER,
+            max_bytes=config.OUTPUT_QUOTA_MB * 1024 * 1024,
+            max_age_seconds=config.OUTPUT_MAX_AGE_HOURS * 3600,
+            # An output goes as a whole: index entries and all encoded formats
+            on_delete=output_store.discard
+        ),
+    ]
+    start_storage_reaper(
+        policies,
+        session_manager=_get_session_manager(config),
+        session_interval=config.SESSION_CLEANUP_INTERVAL,
+        storage_interval=config.STORAGE_REAPER_INTERVAL,
+        active_sessions=active_synthesis_jobs
+    )
+
+
+def get_engine_readiness():
+    """
+    Report whether the global TTS service can serve requests without a cold start
+
+    Without TTS_EAGER_LOAD the engine loads on first use, so the service
+    counts as ready immediately.
+
+    Returns:
+        Tuple of (is_ready, error_message)
+    """
+    config = get_config()
+    if not config.TTS_EAGER_LOAD:
+        return True, None
+    session_manager = _get_session_manager(config)
+    service = _get_tts_service(config, session_manager)
+    return service.is_ready, service.warm_up_error
+
+
+def _get_priority():
+    """
+    Read the scheduling class from the current request
+
+    Returns:
+        Tuple of (priority, error_response); exactly one is None
+    """
+    priority = request.values.get('priority', 'interactive')
+    if priority not in PRIORITY_CLASSES:
+        return None, (jsonify({'error': f'Unknown priority: {priority}'}), 400)
+    return priority, None
+
+
+def _queue_full_response(error: QueueFullError):
+    """Build a 429 response with a Retry-After estimate"""
+    response = jsonify({
+        'error': 'Server is busy, please retry shortly',
+        'retry_after': error.retry_after
+    })
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
+
 
 @synthesis_bp.route('/synthesize', methods=['POST'])
 def synthesize():
     """Start synthesis and return session ID for progress tracking"""
     try:
         config = get_config()
-        session_manager = get_session_manager(config.SESSION_TIMEOUT_SECONDS)
+        session_manager = _get_session_manager(config)
         file_manager = get_file_manager(
             config.UPLOAD_FOLDER,
             config.OUTPUT_FOLDER,
             config.SAMPLES_FOLDER
         )
 
-        # Get form data
-        input_text = request.form.get('input_text', '').strip()
-        ref_text = request.form.get('ref_text', '').strip()
-        use_sample = request.form.get('use_sample', 'false') == 'true'
-        sample_name = request.form.get('sample_name', '')
-        language = request.form.get('language', 'en-us')
+        priority, error_response = _get_priority()
+        if error_response is not None:
+            return error_response
 
-        # Validate input text
-        is_valid, error_msg = validate_text_input(input_text, field_name="Input text")
-        if not is_valid:
-            return jsonify({'error': error_msg}), 400
+        # Create synthesis request
+        session_id = generate_session_id()
+        synthesis_request, error_response = _build_synthesis_request(
+            config, file_manager, session_id=session_id
+        )
+        if error_response is not None:
+            return error_response
+
+        # Create session
+        session_manager.create_session(session_id)
 
-        # Get reference audio
-        if use_sample and sample_name:
-            # Use sample file
-            is_valid, error_msg = validate_sample_name(sample_name, config.SAMPLES_FOLDER)
-            if not is_valid:
-                return jsonify({'error': error_msg}), 400
+        # Queue synthesis for a worker
+        tts_service = _get_tts_service(config, session_manager)
+        try:
+            position = tts_service.synthesize_async(synthesis_request, priority=priority)
+        except QueueFullError as e:
+            session_manager.delete_session(session_id)
+            logger.warning(f"Rejected synthesis, queue full (retry after {e.retry_after}s)")
+            return _queue_full_response(e)
 
-            ref_audio_path = file_manager.get_sample_path(sample_name)
-            if ref_audio_path is None:
-                return jsonify({'error': f'Sample not found: {sample_name}'}), 404
+        logger.info(f"Queued synthesis for session: {session_id}")
+        return jsonify({'session_id': session_id, 'job_id': session_id, 'queue_position': position})
 
-            # Load reference text if not provided
-            if not ref_text:
-                ref_text = file_manager.get_sample_text(sample_name)
-                if not ref_text:
-                    return jsonify({'error': 'Reference text is required'}), 400
+    except Exception as e:
+        logger.error(f"Error starting synthesis: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
+@synthesis_bp.route('/synthesize/batch', methods=['POST'])
+def synthesize_batch():
+    """
+    Start synthesis of many texts with one voice
+
+    Takes a ``manifest`` file (JSONL or CSV, see src.utils.manifest) and
+    the same reference voice fields as /synthesize. Runs as one batch
+    priority job by default; its progress stream reports every finished item
+    and completes with the archive of outputs and the result manifest.
+    """
+    try:
+        config = get_config()
+        session_manager = _get_session_manager(config)
+        file_manager = get_file_manager(
+            config.UPLOAD_FOLDER,
+            config.OUTPUT_FOLDER,
+            config.SAMPLES_FOLDER
+        )
+
+        if 'priority' not in request.values:
+            priority = 'batch'
         else:
-            # Use uploaded file
-            if 'ref_audio' not in request.files:
-                return jsonify({'error': 'Reference audio is required'}), 400
-
-            ref_audio = request.files['ref_audio']
-            if ref_audio.filename == '':
-                return jsonify({'error': 'No reference audio selected'}), 400
-
-            # Save uploaded file
-            success, ref_audio_path, error_msg = file_manager.save_uploaded_audio(ref_audio)
-            if not success:
-                return jsonify({'error': error_msg}), 400
-
-        # Validate reference text
-        is_valid, error_msg = validate_text_input(ref_text, field_name="Reference text")
-        if not is_valid:
+            priority, error_response = _get_priority()
+            if error_response is not None:
+                return error_response
+
+        audio_format = negotiate_format(request.values.get('format'))
+        if audio_format is None:
+            return jsonify({'error': f"Unsupported output format: {request.values.get('format')}"}), 400
+
+        # Parse manifest before touching the reference upload
+        manifest = request.files.get('manifest')
+        if manifest is None or manifest.filename == '':
+            return jsonify({'error': 'Manifest file is required'}), 400
+        try:
+            content = manifest.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            return jsonify({'error': 'Manifest must be UTF-8 text'}), 400
+        items, error_msg = parse_manifest(content, manifest.filename, max_items=config.BATCH_MAX_ITEMS)
+        if error_msg:
             return jsonify({'error': error_msg}), 400
 
-        # Create session
-        session_id = generate_session_id()
-        session_manager.create_session(session_id)
+        ref_audio_path, ref_text, error_response = _resolve_reference(config, file_manager)
+        if error_response is not None:
+            return error_response
 
-        # Create synthesis request
-        synthesis_request = SynthesisRequest(
-            input_text=input_text,
+        session_id = generate_session_id()
+        batch_request = BatchSynthesisRequest(
+            items=items,
             ref_text=ref_text,
             ref_audio_path=ref_audio_path,
             backbone=config.TTS_BACKBONE_REPO,
             max_tokens=config.TTS_MAX_TOKENS,
-            session_id=session_id,
-            language=language
+            language=request.values.get('language', 'en-us'),
+            output_format=audio_format.name,
+            session_id=session_id
         )
 
-        # Start synthesis in background
-        tts_service = get_tts_service(
-            session_manager=session_manager,
-            output_folder=config.OUTPUT_FOLDER,
-            backbone_repo=config.TTS_BACKBONE_REPO,
-            backbone_device=config.TTS_BACKBONE_DEVICE,
-            codec_repo=config.TTS_CODEC_REPO,
-            codec_device=config.TTS_CODEC_DEVICE
+        session_manager.create_session(session_id)
+
+        tts_service = _get_tts_service(config, session_manager)
+        try:
+            position = tts_service.synthesize_batch_async(batch_request, priority=priority)
+        except QueueFullError as e:
+            session_manager.delete_session(session_id)
+            logger.warning(f"Rejected batch, queue full (retry after {e.retry_after}s)")
+            return _queue_full_response(e)
+
+        logger.info(f"Queued batch of {len(items)} items for session: {session_id}")
+        return jsonify({
+            'session_id': session_id,
+            'job_id': session_id,
+            'items': len(items),
+            'queue_position': position
+        })
+
+    except Exception as e:
+        logger.error(f"Error starting batch synthesis: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
+def start_audio_stream(loop=None):
+    """
+    Validate the current request and queue a streaming synthesis job
+
+    Shared by the WSGI /stream route and the async server, which passes its
+    event loop to receive the audio through an async generator.
+
+    Args:
+        loop: Event loop to hand audio to; None for a blocking generator
+
+    Returns:
+        Tuple of (audio_format, job_id, audio_chunks, error_response);
+        error_response is None on success
+    """
+    config = get_config()
+    session_manager = _get_session_manager(config)
+    file_manager = get_file_manager(
+        config.UPLOAD_FOLDER,
+        config.OUTPUT_FOLDER,
+        config.SAMPLES_FOLDER
+    )
+
+    priority, error_response = _get_priority()
+    if error_response is not None:
+        return None, None, None, error_response
+
+    synthesis_request, error_response = _build_synthesis_request(config, file_manager)
+    if error_response is not None:
+        return None, None, None, error_response
+
+    audio_format = get_audio_format(synthesis_request.output_format)
+    if not audio_format.streamable:
+        return None, None, None, (
+            jsonify({'error': f"Format '{audio_format.name}' cannot be streamed"}), 406
         )
-        tts_service.synthesize_async(synthesis_request)
 
-        logger.info(f"Started synthesis for session: {session_id}")
-        return jsonify({'session_id': session_id})
+    tts_service = _get_tts_service(config, session_manager)
+    job_id = generate_session_id()
+    try:
+        if loop is None:
+            audio_chunks = tts_service.synthesize_stream_async(
+                synthesis_request, priority=priority, job_id=job_id
+            )
+        else:
+            audio_chunks = tts_service.synthesize_stream_aiter(
+                synthesis_request, loop, priority=priority, job_id=job_id
+            )
+    except QueueFullError as e:
+        logger.warning(f"Rejected audio stream, queue full (retry after {e.retry_after}s)")
+        return None, None, None, _queue_full_response(e)
+
+    logger.info(f"Queued {audio_format.name} audio stream {job_id}")
+    return audio_format, job_id, audio_chunks, None
+
+
+@synthesis_bp.route('/stream', methods=['GET', 'POST'])
+def stream():
+    """
+    Synthesize and stream audio while it is generated
+
+    Accepts the same fields as /synthesize (as form data or query string)
+    and responds using chunked transfer encoding, either with a WAV header
+    followed by 16-bit PCM chunks or with Ogg/Opus encoded on the fly.
+    """
+    try:
+        config = get_config()
+        audio_format, job_id, audio_chunks, error_response = start_audio_stream()
+        if error_response is not None:
+            return error_response
+
+        # Produce the first chunk before responding so setup errors get a proper status
+        first_chunk = next(audio_chunks)
 
+    except StopIteration:
+        return jsonify({'error': 'No audio generated'}), 500
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        logger.error(f"Error starting synthesis: {e}", exc_info=True)
+        logger.error(f"Error starting audio stream: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
+    def all_chunks():
+        yield first_chunk
+        yield from audio_chunks
+
+    def generate():
+        try:
+            yield from encode_stream(all_chunks(), audio_format, config.TTS_SAMPLE_RATE)
+        except SynthesisCancelled as e:
+            logger.info(f"Audio stream {job_id} cancelled: {e}")
+        except Exception as e:
+            logger.error(f"Error in audio stream: {e}", exc_info=True)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=audio_format.mimetype,
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+            'X-Job-Id': job_id
+        }
+    )
+
 
 @synthesis_bp.route('/progress/<session_id>')
 def progress(session_id):
-    """Stream progress updates via Server-Sent Events"""
+    """
+    Stream progress updates via Server-Sent Events
+
+    If the session's first progress client disconnects before synthesis
+    finishes, the job is cancelled (detected on the next write, at the
+    latest with the keepalive).
+    """
     def generate():
         config = get_config()
-        session_manager = get_session_manager(config.SESSION_TIMEOUT_SECONDS)
+        session_manager = _get_session_manager(config)
 
-        if session_manager.get_session(session_id) is None:
+        if not session_manager.has_session(session_id):
             yield f"data: {json.dumps({'error': 'Invalid session ID'})}\n\n"
             return
 
-        while True:
-            try:
-                # Get progress update (timeout after 30 seconds)
-                update = session_manager.get_progress(session_id, timeout=30)
-                yield f"data: {json.dumps(update)}\n\n"
+        owner = claim_progress_stream(session_id)
+        finished = False
+        try:
+            while True:
+                try:
+                    # Get progress update (timeout after 30 seconds)
+                    update = session_manager.get_progress(session_id, timeout=30)
+                    yield f"data: {json.dumps(update)}\n\n"
 
-                # If complete or error, clean up and exit
-                if update.get('complete') or update.get('error'):
-                    session_manager.delete_session(session_id)
-                    break
+                    # If complete or error, clean up and exit
+                    if update.get('complete') or update.get('error'):
+                        finished = True
+                        session_manager.delete_session(session_id)
+                        break
 
-            except Exception as e:
-                logger.error(f"Error in progress stream: {e}")
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
-                break
+                except Exception as e:
+                    logger.error(f"Error in progress stream: {e}")
+                    yield f"data: {json.dumps({'error': str(e)})}\n\n"
+                    break
+        finally:
+            if owner:
+                release_progress_stream(session_id, finished)
 
     return Response(
         stream_with_context(generate()),
@@ -148,3 +604,26 @@ def progress(session_id):
             'X-Accel-Buffering': 'no'
         }
     )
+
+
+@synthesis_bp.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running synthesis job"""
+    try:
+        config = get_config()
+        session_manager = _get_session_manager(config)
+        tts_service = _get_tts_service(config, session_manager)
+
+        if not tts_service.cancel(job_id, reason="cancelled by client"):
+            return jsonify({'error': 'Job not found'}), 404
+
+        # Tell a listening progress stream; stream jobs have no session
+        if session_manager.has_session(job_id):
+            session_manager.send_error(job_id, 'Synthesis cancelled')
+
+        logger.info(f"Cancelled job: {job_id}")
+        return jsonify({'job_id': job_id, 'cancelled': True})
+
+    except Exception as e:
+        logger.error(f"Error cancelling job: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
@@ -21,7 +21,12 @@ class BaseConfig:
 
     # Flask settings
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
-    MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50MB max file size
+    # Uploads are streamed to disk and rejected as soon as a file exceeds
+    # MAX_UPLOAD_SIZE_MB; the whole request also carries the form fields
+    MAX_UPLOAD_SIZE_MB = int(os.getenv("MAX_UPLOAD_SIZE_MB", "50"))
+    MAX_CONTENT_LENGTH = (MAX_UPLOAD_SIZE_MB + 1) * 1024 * 1024
+    # Longest accepted reference recording
+    UPLOAD_MAX_DURATION_SECONDS = float(os.getenv("UPLOAD_MAX_DURATION_SECONDS", "60"))
 
     # Directory paths
     UPLOAD_FOLDER = DATA_DIR / "uploads"
@@ -33,19 +38,73 @@ class BaseConfig:
     TTS_BACKBONE_DEVICE = os.getenv("TTS_BACKBONE_DEVICE", "cpu")
     TTS_CODEC_REPO = os.getenv("TTS_CODEC_REPO", "neuphonic/neucodec")
     TTS_CODEC_DEVICE = os.getenv("TTS_CODEC_DEVICE", "cpu")
+    # Pre-converted weights (scripts/convert_weights.py); cached models skip Hub resolution
+    TTS_WEIGHTS_CACHE = Path(os.getenv("TTS_WEIGHTS_CACHE", str(DATA_DIR / "models")))
 
     # TTS Processing Settings
     TTS_MAX_TOKENS = int(os.getenv("TTS_MAX_TOKENS", "1200"))
     TTS_SAMPLE_RATE = 24000
     TTS_MAX_CONTEXT = 2048
+    TTS_DECODE_BATCH_SIZE = int(os.getenv("TTS_DECODE_BATCH_SIZE", "4"))
+    # Number of text chunks of a batch job generated together in one backbone pass
+    TTS_GENERATION_BATCH_SIZE = int(os.getenv("TTS_GENERATION_BATCH_SIZE", "8"))
+
+    # Batch Synthesis
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+
+    # Synthesis Queue
+    SYNTHESIS_WORKERS = int(os.getenv("SYNTHESIS_WORKERS", "1"))
+    SYNTHESIS_QUEUE_SIZE = int(os.getenv("SYNTHESIS_QUEUE_SIZE", "32"))
+    SYNTHESIS_AGING_SECONDS = float(os.getenv("SYNTHESIS_AGING_SECONDS", "60"))
+    # Durable job table: unfinished file jobs are resumed after a restart (empty disables)
+    JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", str(DATA_DIR / "jobs.db"))
+    # Dedicated engine processes (0 = load the model in the web process)
+    TTS_ENGINE_PROCESSES = int(os.getenv("TTS_ENGINE_PROCESSES", "0"))
+    # Compute threads per engine process (0 = split the cores evenly between them)
+    TTS_ENGINE_THREADS = int(os.getenv("TTS_ENGINE_THREADS", "0"))
+    # Texts with at least this many chunks are synthesized on all engine
+    # processes at once and joined with short crossfades (0 disables)
+    TTS_LONG_DOCUMENT_CHUNKS = int(os.getenv("TTS_LONG_DOCUMENT_CHUNKS", "4"))
+    TTS_CROSSFADE_MS = float(os.getenv("TTS_CROSSFADE_MS", "20"))
+    # Load the engine and run a warm-up synthesis at startup; /ready reports
+    # success only once this has finished
+    TTS_EAGER_LOAD = os.getenv("TTS_EAGER_LOAD", "false").lower() == "true"
+    # Sample used for the warm-up synthesis (name without extension; any sample if empty)
+    TTS_WARMUP_SAMPLE = os.getenv("TTS_WARMUP_SAMPLE", "")
+
+    # Index of content-addressed outputs (job, voice, text hash, format, duration)
+    OUTPUT_INDEX_PATH = os.getenv("OUTPUT_INDEX_PATH", str(DATA_DIR / "outputs.db"))
+
+    # Storage Limits
+    # Uploads and outputs are swept every STORAGE_REAPER_INTERVAL seconds (0 disables):
+    # files past the age limit are deleted, then least recently used files until
+    # the directory fits its quota (0 = no limit)
+    STORAGE_REAPER_INTERVAL = int(os.getenv("STORAGE_REAPER_INTERVAL", "300"))
+    UPLOAD_QUOTA_MB = int(os.getenv("UPLOAD_QUOTA_MB", "1024"))
+    UPLOAD_MAX_AGE_HOURS = float(os.getenv("UPLOAD_MAX_AGE_HOURS", "24"))
+    OUTPUT_QUOTA_MB = int(os.getenv("OUTPUT_QUOTA_MB", "10240"))
+    OUTPUT_MAX_AGE_HOURS = float(os.getenv("OUTPUT_MAX_AGE_HOURS", "168"))
+
+    # Media Serving
+    # Generated outputs never change once written, so they are cached as immutable
+    MEDIA_CACHE_MAX_AGE = int(os.getenv("MEDIA_CACHE_MAX_AGE", str(365 * 24 * 3600)))
+    # Hand file transfers to the front proxy: nginx internal location prefix for
+    # X-Accel-Redirect, or USE_X_SENDFILE for Apache/lighttpd (Flask built-in)
+    MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "")
+    USE_X_SENDFILE = os.getenv("USE_X_SENDFILE", "false").lower() == "true"
 
     # Session Management
     SESSION_TIMEOUT_SECONDS = int(os.getenv("SESSION_TIMEOUT_SECONDS", "300"))
     SESSION_CLEANUP_INTERVAL = int(os.getenv("SESSION_CLEANUP_INTERVAL", "60"))
+    # memory (one web process) or sqlite (shared by all web processes on the host)
+    SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+    SESSION_DB_PATH = Path(os.getenv("SESSION_DB_PATH", str(DATA_DIR / "sessions.db")))
 
     # Server Configuration
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", "5000"))
+    # Threads running Flask requests under the async server
+    WSGI_THREADS = int(os.getenv("WSGI_THREADS", "16"))
     BASE_URL = os.getenv("BASE_URL", "")
 
     @classmethod
@@ -72,6 +131,10 @@ class ProductionConfig(BaseConfig):
     # Override with strong secret key in production
     SECRET_KEY = os.getenv("SECRET_KEY")
 
+    # Keep the model out of the web process: one engine process per synthesis worker
+    TTS_ENGINE_PROCESSES = int(os.getenv("TTS_ENGINE_PROCESSES", str(BaseConfig.SYNTHESIS_WORKERS)))
+    TTS_EAGER_LOAD = os.getenv("TTS_EAGER_LOAD", "true").lower() == "true"
+
     @classmethod
     def validate(cls):
         """Validate production configuration"""
@@ -91,6 +154,8 @@ class TestingConfig(BaseConfig):
     # Use temporary directories for testing
     UPLOAD_FOLDER = Path("/tmp/clone-voice-test/uploads")
     OUTPUT_FOLDER = Path("/tmp/clone-voice-test/outputs")
+    JOB_STORE_PATH = "/tmp/clone-voice-test/jobs.db"
+    OUTPUT_INDEX_PATH = "/tmp/clone-voice-test/outputs.db"
 
 
 # Configuration factory
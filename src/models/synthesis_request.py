@@ -23,6 +23,9 @@ class SynthesisRequest:
     max_tokens: int = 1200
     language: str = "en-us"
 
+    # Output encoding (see src.utils.audio.AUDIO_FORMATS)
+    output_format: str = "wav"
+
     # Session tracking
     session_id: Optional[str] = None
 
@@ -49,3 +52,64 @@ class SynthesisRequest:
         """Check if request is valid"""
         valid, _ = self.validate()
         return valid
+
+
+@dataclass
+class BatchItem:
+    """One text of a batch synthesis manifest"""
+
+    # Client-chosen identifier, used for the output filename
+    item_id: str
+    input_text: str
+
+
+@dataclass
+class BatchSynthesisRequest:
+    """Request to synthesize many texts with one reference voice"""
+
+    items: list[BatchItem]
+
+    # Reference audio and text
+    ref_text: str
+    ref_audio_path: Path
+
+    # Optional model configuration
+    backbone: str = "neuphonic/neutts-air"
+    max_tokens: int = 1200
+    language: str = "en-us"
+
+    # Output encoding of every item (see src.utils.audio.AUDIO_FORMATS)
+    output_format: str = "wav"
+
+    # Session tracking
+    session_id: Optional[str] = None
+
+    def validate(self) -> tuple[bool, Optional[str]]:
+        """
+        Validate the batch request
+
+        Returns:
+            Tuple of (is_valid, error_message)
+        """
+        if not self.items:
+            return False, "Manifest contains no items"
+
+        if not self.ref_text or not self.ref_text.strip():
+            return False, "Reference text is required"
+
+        if not self.ref_audio_path.exists():
+            return False, f"Reference audio file not found: {self.ref_audio_path}"
+
+        return True, None
+
+    def item_request(self, item: BatchItem) -> SynthesisRequest:
+        """Single-text request for one item (used for cost estimates)"""
+        return SynthesisRequest(
+            input_text=item.input_text,
+            ref_text=self.ref_text,
+            ref_audio_path=self.ref_audio_path,
+            backbone=self.backbone,
+            max_tokens=self.max_tokens,
+            language=self.language,
+            output_format=self.output_format
+        )
@@ -0,0 +1,96 @@
+"""
+Batch Synthesis
+Batched generation of many texts spoken by one voice
+"""
+from typing import Generator, Optional
+import numpy as np
+
+from src.utils.cancellation import CancellationToken, SynthesisCancelled, raise_if_cancelled
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# (item index, chunk audio, None) or (item index, None, error message)
+BatchEvent = tuple[int, Optional[np.ndarray], Optional[str]]
+
+
+def generate_batch_passes(
+    tts,
+    ref_codes,
+    ref_text: str,
+    item_chunks: list[list[str]],
+    language: str = "en-us",
+    generation_batch_size: int = 8,
+    decode_batch_size: int = 4,
+    cancel_token: Optional[CancellationToken] = None
+) -> Generator[tuple[float, list[BatchEvent]], None, None]:
+    """
+    Generate the text chunks of many items in batched backbone passes
+
+    Chunks of all items are taken in order, ``generation_batch_size`` per
+    backbone pass, and decoded in batched codec passes. After each pass the
+    watermarked audio of its chunks is yielded in order; an item whose
+    generation fails is reported once with an error and its remaining
+    chunks are skipped, without stopping the other items.
+
+    Args:
+        tts: Engine (NeuTTSAir or EngineProcessPool)
+        ref_codes: Encoded reference audio
+        ref_text: Transcript of the reference audio
+        item_chunks: Text chunks per item
+        language: Language code for phonemization
+        generation_batch_size: Chunks generated per backbone pass
+        decode_batch_size: Chunks decoded per codec pass
+        cancel_token: Optional token checked before each backbone pass
+
+    Yields:
+        Tuple of (fraction of chunks processed, events of this pass)
+
+    Raises:
+        SynthesisCancelled: If the token was cancelled
+    """
+    generation_batch_size = max(1, generation_batch_size)
+    decode_batch_size = max(1, decode_batch_size)
+    work = [(index, chunk) for index, chunks in enumerate(item_chunks) for chunk in chunks]
+    failed: set[int] = set()
+
+    for start in range(0, len(work), generation_batch_size):
+        raise_if_cancelled(cancel_token)
+        events: list[BatchEvent] = []
+        group = [
+            (index, chunk) for index, chunk in work[start:start + generation_batch_size]
+            if index not in failed
+        ]
+
+        if group:
+            try:
+                codes = tts.generate_codes_batch(
+                    [chunk for _, chunk in group], ref_codes, ref_text,
+                    language=language, cancel_token=cancel_token
+                )
+            except SynthesisCancelled:
+                raise
+            except Exception as e:
+                # Fail this pass's items; later passes carry on with the rest
+                logger.error(f"Batch generation pass failed: {e}", exc_info=True)
+                codes = [[]] * len(group)
+
+            generated = []
+            for (index, _), chunk_codes in zip(group, codes):
+                if index in failed:
+                    continue
+                if chunk_codes:
+                    generated.append((index, chunk_codes))
+                else:
+                    failed.add(index)
+                    events.append((index, None, "No valid speech tokens generated"))
+
+            for offset in range(0, len(generated), decode_batch_size):
+                part = [(index, codes) for index, codes in generated[offset:offset + decode_batch_size]
+                        if index not in failed]
+                wavs = tts.decode_batch([chunk_codes for _, chunk_codes in part])
+                watermarked = [tts.watermark_async(wav) for wav in wavs]
+                for (index, _), future in zip(part, watermarked):
+                    events.append((index, future.result(), None))
+
+        yield min(1.0, (start + generation_batch_size) / len(work)), events
@@ -0,0 +1,423 @@
+"""
+Engine Process Pool
+Runs TTS engines in dedicated worker processes behind the engine interface
+"""
+import multiprocessing
+import queue
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Generator, Optional
+import numpy as np
+
+from src.utils.cancellation import CancellationToken
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Seconds between cancellation checks while waiting for an engine process
+_POLL_INTERVAL = 0.1
+
+
+def _serve(
+    conn,
+    cancel_event,
+    engine_factory: Optional[Callable],
+    engine_kwargs: dict,
+    threads: Optional[int] = None
+):
+    """
+    Engine process main loop
+
+    Pins the compute thread count if given, loads the engine (NeuTTSAir
+    unless another picklable factory is given), reports its capabilities,
+    then answers calls of the form (method, args, kwargs, cancellable,
+    stream) until it receives None, and closes the engine. Replies are
+    ('ok', value), ('item', value) ... ('end', None) for streams, or
+    ('error', exception).
+    """
+    from src.tts.utils import pin_compute_threads, to_code_array
+
+    if threads:
+        pin_compute_threads(threads)
+
+    if engine_factory is None:
+        from src.tts.engine import NeuTTSAir
+        engine_factory = NeuTTSAir
+
+    try:
+        engine = engine_factory(**engine_kwargs)
+    except Exception as e:
+        conn.send(('error', e))
+        return
+
+    conn.send(('ok', {
+        'supports_streaming': engine.supports_streaming,
+        'sample_rate': engine.sample_rate,
+    }))
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                return
+            if message is None:
+                return
+
+            method, args, kwargs, cancellable, stream = message
+            cancel_event.clear()
+            if cancellable:
+                kwargs['cancel_token'] = CancellationToken(cancel_event)
+
+            try:
+                result = getattr(engine, method)(*args, **kwargs)
+                if stream:
+                    for item in result:
+                        conn.send(('item', item))
+                    conn.send(('end', None))
+                else:
+                    if method == 'encode_reference':
+                        # Keep torch tensors out of the front process
+                        result = to_code_array(result)
+                    conn.send(('ok', result))
+            except Exception as e:
+                conn.send(('error', e))
+    finally:
+        engine.close()
+
+
+class EngineProcess:
+    """Handle to one engine worker process"""
+
+    def __init__(
+        self,
+        engine_kwargs: dict,
+        index: int = 0,
+        engine_factory: Optional[Callable] = None,
+        threads: Optional[int] = None
+    ):
+        """
+        Start an engine process; its engine loads in the background (see wait_ready)
+
+        Args:
+            engine_kwargs: Keyword arguments for the engine
+            index: Process number (for naming)
+            engine_factory: Picklable engine constructor (default NeuTTSAir)
+            threads: Compute threads of the process (library default if None)
+        """
+        context = multiprocessing.get_context('spawn')
+        self._conn, child_conn = context.Pipe()
+        self._cancel_event = context.Event()
+        self.process = context.Process(
+            target=_serve,
+            args=(child_conn, self._cancel_event, engine_factory, engine_kwargs, threads),
+            name=f"tts-engine-{index}",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.info: Optional[dict] = None
+
+    def wait_ready(self):
+        """
+        Wait until the process's engine has loaded
+
+        Raises:
+            RuntimeError: If the engine failed to load
+        """
+        status, info = self._receive()
+        if status == 'error':
+            raise RuntimeError(f"Engine process failed to start: {info}")
+        self.info = info
+
+    def _receive(self, cancel_token: Optional[CancellationToken] = None) -> tuple:
+        """Wait for the next reply, forwarding cancellation to the process"""
+        while not self._conn.poll(_POLL_INTERVAL):
+            if cancel_token is not None and cancel_token.cancelled:
+                self._cancel_event.set()
+            if not self.process.is_alive():
+                raise RuntimeError(f"Engine process {self.process.name} exited unexpectedly")
+        return self._conn.recv()
+
+    def call(self, method: str, *args, cancel_token: Optional[CancellationToken] = None, **kwargs) -> Any:
+        """
+        Call an engine method in the process
+
+        Args:
+            method: NeuTTSAir method name
+            *args: Positional arguments
+            cancel_token: Optional token forwarded to the engine method
+            **kwargs: Keyword arguments
+
+        Returns:
+            Method result
+        """
+        self._conn.send((method, args, kwargs, cancel_token is not None, False))
+        status, value = self._receive(cancel_token)
+        if status == 'error':
+            raise value
+        return value
+
+    def call_stream(
+        self,
+        method: str,
+        *args,
+        cancel_token: Optional[CancellationToken] = None,
+        **kwargs
+    ) -> Generator[Any, None, None]:
+        """
+        Call a generator engine method in the process, yielding its items
+
+        Closing the generator early stops the method in the process.
+
+        Args:
+            method: NeuTTSAir generator method name
+            *args: Positional arguments
+            cancel_token: Optional token forwarded to the engine method
+            **kwargs: Keyword arguments
+
+        Yields:
+            Items produced by the method
+        """
+        self._conn.send((method, args, kwargs, True, True))
+        finished = False
+        try:
+            while True:
+                status, value = self._receive(cancel_token)
+                if status == 'item':
+                    # Items may already be buffered in the pipe; stop here too
+                    if cancel_token is not None:
+                        cancel_token.raise_if_cancelled()
+                    yield value
+                    continue
+                finished = True
+                if status == 'error':
+                    raise value
+                return
+        finally:
+            if not finished:
+                # Stop the process-side generator and drain its replies
+                self._cancel_event.set()
+                while self._receive()[0] == 'item':
+                    pass
+
+    def close(self, timeout: float = 5.0):
+        """Ask the process to exit and wait for it"""
+        try:
+            self._conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self._conn.close()
+
+
+class EngineProcessPool:
+    """
+    Pool of engine processes exposing the NeuTTSAir interface
+
+    Each call checks out an idle process for its duration, so up to
+    ``num_processes`` calls run in parallel without sharing the GIL with the
+    web tier. Calls are stateless (reference codes travel with every call),
+    so consecutive chunks of one job may run in different processes.
+    A call that finds no idle process within ``checkout_timeout`` seconds
+    fails with TimeoutError instead of waiting forever.
+    """
+
+    def __init__(
+        self,
+        num_processes: int = 1,
+        engine_factory: Optional[Callable] = None,
+        threads_per_process: Optional[int] = None,
+        checkout_timeout: float = 300.0,
+        **engine_kwargs
+    ):
+        """
+        Start engine processes
+
+        Args:
+            num_processes: Number of engine processes
+            engine_factory: Picklable engine constructor (default NeuTTSAir)
+            threads_per_process: Compute threads of each process (library
+                default, i.e. all cores, if None)
+            checkout_timeout: Seconds a call waits for an idle process
+            **engine_kwargs: Keyword arguments for the engine
+        """
+        num_processes = max(1, num_processes)
+        self.num_processes = num_processes
+        self.checkout_timeout = checkout_timeout
+        logger.info(
+            f"Starting {num_processes} engine process(es)"
+            + (f" with {threads_per_process} thread(s) each" if threads_per_process else "")
+        )
+
+        # Start every process before waiting, so the engines load in parallel
+        self._processes = [
+            EngineProcess(engine_kwargs, index=i, engine_factory=engine_factory, threads=threads_per_process)
+            for i in range(num_processes)
+        ]
+        try:
+            for process in self._processes:
+                process.wait_ready()
+        except Exception:
+            for process in self._processes:
+                process.close()
+            raise
+
+        self._idle: queue.Queue = queue.Queue()
+        for process in self._processes:
+            self._idle.put(process)
+
+        info = self._processes[0].info
+        self.sample_rate = info['sample_rate']
+        self._supports_streaming = info['supports_streaming']
+        self._watermark_executor = ThreadPoolExecutor(max_workers=num_processes, thread_name_prefix="watermark")
+
+        logger.info("Engine processes ready")
+
+    @property
+    def supports_streaming(self) -> bool:
+        """Whether infer_stream is available for the loaded backbone"""
+        return self._supports_streaming
+
+    @contextmanager
+    def _checkout(self, cancel_token: Optional[CancellationToken] = None):
+        """
+        Borrow an idle engine process
+
+        Args:
+            cancel_token: Optional token that stops the wait
+
+        Raises:
+            TimeoutError: If no process became idle within checkout_timeout
+            SynthesisCancelled: If the token was cancelled while waiting
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No engine process became idle within {self.checkout_timeout:.0f}s")
+            try:
+                process = self._idle.get(timeout=min(_POLL_INTERVAL, remaining))
+                break
+            except queue.Empty:
+                continue
+        try:
+            yield process
+        finally:
+            self._idle.put(process)
+
+    def encode_reference(self, ref_audio_path) -> np.ndarray:
+        """Encode reference audio into codec codes"""
+        with self._checkout() as process:
+            return process.call('encode_reference', ref_audio_path)
+
+    def generate_codes(
+        self,
+        text: str,
+        ref_codes: np.ndarray,
+        ref_text: str,
+        language: str = "en-us",
+        cancel_token: Optional[CancellationToken] = None
+    ) -> list[int]:
+        """Run the backbone to generate codec codes for text"""
+        with self._checkout(cancel_token) as process:
+            return process.call(
+                'generate_codes', text, ref_codes, ref_text,
+                language=language, cancel_token=cancel_token
+            )
+
+    def generate_codes_batch(
+        self,
+        texts: list[str],
+        ref_codes: np.ndarray,
+        ref_text: str,
+        language: str = "en-us",
+        cancel_token: Optional[CancellationToken] = None
+    ) -> list[list[int]]:
+        """Run the backbone once for several texts spoken by the same voice"""
+        with self._checkout(cancel_token) as process:
+            return process.call(
+                'generate_codes_batch', texts, ref_codes, ref_text,
+                language=language, cancel_token=cancel_token
+            )
+
+    def decode_batch(self, code_sequences: list[list[int]]) -> list[np.ndarray]:
+        """Decode several chunks' codes in batched codec passes"""
+        with self._checkout() as process:
+            return process.call('decode_batch', code_sequences)
+
+    def watermark(self, wav: np.ndarray) -> np.ndarray:
+        """Apply the audio watermark to a waveform"""
+        with self._checkout() as process:
+            return process.call('watermark', wav)
+
+    def watermark_async(self, wav: np.ndarray) -> Future:
+        """Watermark a waveform in an engine process without blocking the caller"""
+        return self._watermark_executor.submit(self.watermark, wav)
+
+    def infer(
+        self,
+        text: str,
+        ref_codes: np.ndarray,
+        ref_text: str,
+        language: str = "en-us",
+        cancel_token: Optional[CancellationToken] = None
+    ) -> np.ndarray:
+        """Generate watermarked speech for text"""
+        with self._checkout(cancel_token) as process:
+            return process.call(
+                'infer', text, ref_codes, ref_text,
+                language=language, cancel_token=cancel_token
+            )
+
+    def infer_stream(
+        self,
+        text: str,
+        ref_codes: np.ndarray,
+        ref_text: str,
+        language: str = "en-us",
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Generator[np.ndarray, None, None]:
+        """
+        Generate speech for text, yielding audio chunks as they are decoded
+
+        The process stays checked out until the generator is exhausted or
+        closed, so consume it promptly (synthesis jobs run streams to
+        completion on their worker).
+        """
+        with self._checkout(cancel_token) as process:
+            yield from process.call_stream(
+                'infer_stream', text, ref_codes, ref_text,
+                language=language, cancel_token=cancel_token
+            )
+
+    def warm_up(self, ref_audio_path, ref_text: str, **kwargs):
+        """
+        Warm up every engine process in parallel
+
+        Checks out all processes first so each one runs exactly one warm-up,
+        even if requests arrive meanwhile.
+        """
+        processes = [self._idle.get() for _ in self._processes]
+        try:
+            with ThreadPoolExecutor(max_workers=len(processes)) as executor:
+                futures = [
+                    executor.submit(process.call, 'warm_up', ref_audio_path, ref_text, **kwargs)
+                    for process in processes
+                ]
+                for future in futures:
+                    future.result()
+        finally:
+            for process in processes:
+                self._idle.put(process)
+
+    def close(self):
+        """Stop all engine processes"""
+        self._watermark_executor.shutdown(wait=False)
+        for process in self._processes:
+            process.close()
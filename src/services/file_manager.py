@@ -2,17 +2,93 @@
 File Manager Service
 Handles file upload, storage, and retrieval
 """
+import os
+import shutil
+import tempfile
+import uuid
 from pathlib import Path
 from typing import Optional, Tuple
 from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
 
-from src.utils.validators import validate_audio_file, sanitize_filename
-from src.utils.helpers import generate_timestamp_filename
+from src.utils.validators import (
+    SNIFF_BYTES, UPLOAD_CONTAINERS, sanitize_filename, sniff_audio_container, validate_audio_content
+)
+from src.utils.helpers import sharded_path
+from src.utils.audio import AUDIO_FORMATS, AudioFormat, format_for_path, transcode_file, variant_path
 from src.config.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
+class UploadSpool:
+    """
+    Upload being received into a hidden file of the upload directory
+
+    Writing past ``max_bytes`` deletes the file and raises
+    RequestEntityTooLarge, so an oversized upload is rejected while it is
+    still being read. ``commit`` moves the file into place with a rename;
+    otherwise it is deleted when closed.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        """
+        Create an empty spool file
+
+        Args:
+            directory: Upload directory (the spool is renamed within it)
+            max_bytes: Maximum file size
+        """
+        fd, name = tempfile.mkstemp(prefix='.upload_', suffix='.part', dir=directory)
+        self._file = os.fdopen(fd, 'w+b')
+        self.path = Path(name)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._committed = False
+
+    def write(self, data: bytes) -> int:
+        """Append data, enforcing the size limit"""
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.close()
+            raise RequestEntityTooLarge(
+                f"File too large. Maximum: {self.max_bytes // (1024 * 1024)}MB"
+            )
+        return self._file.write(data)
+
+    def commit(self, target: Path) -> Path:
+        """
+        Move the received file to its final path
+
+        The target is created exclusively first, so an existing file is
+        never replaced.
+
+        Args:
+            target: Destination on the same filesystem
+
+        Returns:
+            The destination path
+
+        Raises:
+            FileExistsError: If the target already exists
+        """
+        self._file.close()
+        os.close(os.open(target, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+        os.replace(self.path, target)
+        self._committed = True
+        return target
+
+    def close(self):
+        """Close the file, deleting it unless committed"""
+        if not self._file.closed:
+            self._file.close()
+        if not self._committed:
+            self.path.unlink(missing_ok=True)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
 class FileManager:
     """Manages file operations for the application"""
 
@@ -37,73 +113,67 @@ class FileManager:
     def save_uploaded_audio(
         self,
         file: FileStorage,
-        prefix: str = "ref"
+        prefix: str = "ref",
+        max_size_mb: int = 50,
+        max_duration_seconds: float = 60.0
     ) -> Tuple[bool, Optional[Path], Optional[str]]:
         """
-        Save uploaded audio file
+        Save uploaded audio file after checking its content
+
+        The format is identified from the file's leading bytes, not its name,
+        and the duration and sample rate are probed, so files the engine
+        can't use are rejected before reaching a synthesis worker. Uploads
+        streamed by UploadRequest are already on disk and are moved into
+        place; other streams are copied, enforcing the size limit.
 
         Args:
             file: Uploaded file from Flask request
             prefix: Filename prefix
+            max_size_mb: Maximum file size in MB
+            max_duration_seconds: Maximum duration in seconds
 
         Returns:
             Tuple of (success, file_path, error_message)
         """
-        # Validate file
-        is_valid, error_msg = validate_audio_file(file)
-        if not is_valid:
-            return False, None, error_msg
+        if not file or not file.filename:
+            return False, None, "No file provided"
 
+        spool = file.stream if isinstance(file.stream, UploadSpool) else None
         try:
-            # Generate safe filename
-            original_filename = sanitize_filename(file.filename)
-            extension = Path(original_filename).suffix.lstrip('.') or 'wav'
-            filename = generate_timestamp_filename(prefix=prefix, extension=extension)
-
-            # Save file
-            file_path = self.upload_folder / filename
-            file.save(str(file_path))
-
-            logger.info(f"Saved uploaded file: {filename} ({file_path.stat().st_size} bytes)")
+            if spool is None:
+                spool = UploadSpool(self.upload_folder, max_size_mb * 1024 * 1024)
+                try:
+                    shutil.copyfileobj(file.stream, spool)
+                except RequestEntityTooLarge as e:
+                    return False, None, e.description
+
+            spool.flush()
+            spool.seek(0)
+            container = sniff_audio_container(spool.read(SNIFF_BYTES))
+            if container is None:
+                return False, None, f"Unsupported audio format. Allowed: {', '.join(UPLOAD_CONTAINERS)}"
+
+            is_valid, error_msg = validate_audio_content(spool.path, container, max_duration_seconds)
+            if not is_valid:
+                return False, None, error_msg
+
+            # Name the file after its actual format (browsers label recordings freely)
+            filename = f"{prefix}_{uuid.uuid4().hex}.{container}"
+            file_path = sharded_path(self.upload_folder, filename)
+            file_path.parent.mkdir(exist_ok=True)
+            spool.commit(file_path)
+
+            logger.info(f"Saved uploaded file: {filename} ({spool.size} bytes)")
             return True, file_path, None
 
         except Exception as e:
             logger.error(f"Error saving uploaded file: {e}")
             return False, None, f"Failed to save file: {str(e)}"
 
-    def get_sample_path(self, sample_name: str) -> Optional[Path]:
-        """
-        Get path to sample audio file
-
-        Args:
-            sample_name: Name of sample (without extension)
-
-        Returns:
-            Path to sample WAV file or None if not found
-        """
-        sample_path = self.samples_folder / f"{sample_name}.wav"
-        if sample_path.exists():
-            return sample_path
-        return None
-
-    def get_sample_text(self, sample_name: str) -> Optional[str]:
-        """
-        Get text content for sample
-
-        Args:
-            sample_name: Name of sample (without extension)
-
-        Returns:
-            Text content or None if not found
-        """
-        text_path = self.samples_folder / f"{sample_name}.txt"
-        if text_path.exists():
-            try:
-                with open(text_path, 'r', encoding='utf-8') as f:
-                    return f.read().strip()
-            except Exception as e:
-                logger.error(f"Error reading sample text {text_path}: {e}")
-        return None
+        finally:
+            # Rejected uploads are deleted right away rather than at the end of the request
+            if spool is not None:
+                spool.close()
 
     def get_output_path(self, filename: str) -> Optional[Path]:
         """
@@ -123,6 +193,32 @@ class FileManager:
             return output_path
         return None
 
+    def get_output_variant(self, output_path: Path, audio_format: AudioFormat) -> Path:
+        """
+        Get an output file encoded in the given format, encoding and caching it if needed
+
+        Encoded variants are stored next to the output so repeat requests
+        don't re-encode.
+
+        Args:
+            output_path: Path to an existing output file
+            audio_format: Desired format
+
+        Returns:
+            Path to the file in the requested format
+        """
+        if format_for_path(output_path) == audio_format:
+            return output_path
+
+        target = variant_path(output_path, audio_format)
+        if target.exists():
+            return target
+
+        # Prefer the lossless master WAV as the encoding source
+        master = variant_path(output_path, AUDIO_FORMATS['wav'])
+        source = master if master.exists() else output_path
+        return transcode_file(source, target, audio_format)
+
     def cleanup_old_uploads(self, max_age_hours: int = 24) -> int:
         """
         Clean up old uploaded files
@@ -0,0 +1,306 @@
+"""
+Job Queue
+Bounded, cost-aware synthesis scheduler served by a fixed pool of worker threads
+"""
+import math
+import time
+from dataclasses import dataclass, field
+from itertools import count
+from threading import Condition, Thread
+from typing import Callable, Iterator, Optional
+from src.services.session_manager import SessionManager
+from src.utils.cancellation import CancellationToken, SynthesisCancelled
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Priority classes, most urgent first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_CLASSES = {
+    'interactive': PRIORITY_INTERACTIVE,
+    'batch': PRIORITY_BATCH,
+}
+
+# Tie-breaker so equal keys run in submission order
+_sequence = count()
+
+
+class QueueFullError(Exception):
+    """Raised when a job is rejected because the queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Synthesis queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class Job:
+    """
+    A unit of work waiting for a synthesis worker
+
+    ``run`` either does all of the work and returns None, or returns an
+    iterator whose every ``next()`` performs one step (e.g. one text chunk)
+    and yields the fraction of the job completed so far (or None if
+    unknown). Stepped jobs go back to the queue between steps so that long
+    jobs interleave with short ones.
+
+    ``cancel_token`` is shared with the work itself, which checks it while
+    running; the queue checks it between steps.
+    """
+
+    job_id: str
+    run: Callable[[], Optional[Iterator[Optional[float]]]]
+    session_id: Optional[str] = None
+    priority: int = PRIORITY_INTERACTIVE
+    cost: float = 1.0
+    cancel_token: CancellationToken = field(default_factory=CancellationToken)
+    enqueued_at: float = field(default_factory=time.time)
+    remaining_cost: float = field(init=False)
+    steps: Optional[Iterator[Optional[float]]] = field(default=None, init=False)
+    sequence: int = field(default_factory=lambda: next(_sequence), init=False)
+
+    def __post_init__(self):
+        self.remaining_cost = self.cost
+
+    @property
+    def started(self) -> bool:
+        """Whether the job has already run at least one step"""
+        return self.steps is not None
+
+
+class JobQueue:
+    """
+    Bounded synthesis scheduler served by a fixed number of workers
+
+    Waiting work is ordered by priority class, then by remaining estimated
+    cost (shortest job first). Waiting time ages both: every
+    ``aging_seconds`` a job is promoted one priority class and its
+    effective cost shrinks, so long and batch jobs cannot starve.
+
+    New jobs beyond ``max_queue_size`` are rejected with QueueFullError.
+    Every time the queue changes, waiting jobs with a session that have not
+    started yet get their queue position and estimated start time over the
+    session's progress channel.
+    """
+
+    def __init__(
+        self,
+        session_manager: SessionManager,
+        num_workers: int = 1,
+        max_queue_size: int = 32,
+        aging_seconds: float = 60.0,
+        initial_seconds_per_cost: float = 0.05
+    ):
+        """
+        Initialize job queue
+
+        Args:
+            session_manager: Session manager used to publish queue positions
+            num_workers: Number of synthesis worker threads
+            max_queue_size: Maximum number of waiting jobs
+            aging_seconds: Waiting time after which a job is promoted one priority class
+            initial_seconds_per_cost: Seconds per cost unit assumed until real jobs have been timed
+        """
+        self.session_manager = session_manager
+        self.num_workers = max(1, num_workers)
+        self.max_queue_size = max(1, max_queue_size)
+        self.aging_seconds = max(1.0, aging_seconds)
+
+        self._jobs: list[Job] = []
+        self._active: dict[str, Job] = {}
+        self._condition = Condition()
+        self._workers: list[Thread] = []
+        self._running_cost = 0.0
+        self._seconds_per_cost = initial_seconds_per_cost
+        self._running = False
+
+    def start(self):
+        """Start worker threads (idempotent)"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            for i in range(self.num_workers):
+                worker = Thread(target=self._worker_loop, name=f"synthesis-worker-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+        logger.info(f"Started {self.num_workers} synthesis worker(s), queue size {self.max_queue_size}")
+
+    def stop(self):
+        """Stop workers after their current step; queued jobs are dropped"""
+        with self._condition:
+            self._running = False
+            self._jobs.clear()
+            self._active.clear()
+            self._condition.notify_all()
+
+    def cancel(self, job_id: str, reason: str = "cancelled") -> bool:
+        """
+        Cancel a queued or running job
+
+        Waiting jobs are dropped immediately; running jobs stop at their next
+        cancellation check.
+
+        Args:
+            job_id: Job identifier
+            reason: Why the job was cancelled (for logs)
+
+        Returns:
+            True if the job was found, False if unknown or already finished
+        """
+        with self._condition:
+            job = self._active.get(job_id)
+            if job is None:
+                return False
+            job.cancel_token.cancel(reason)
+
+            waiting = job in self._jobs
+            if waiting:
+                self._jobs.remove(job)
+                del self._active[job_id]
+                self._publish_positions()
+
+        if waiting and job.steps is not None:
+            job.steps.close()
+        logger.info(f"Cancelled job {job_id} ({reason})")
+        return True
+
+    def submit(self, job: Job) -> int:
+        """
+        Enqueue a job
+
+        Args:
+            job: Job to run
+
+        Returns:
+            1-based queue position of the job
+
+        Raises:
+            QueueFullError: If the queue is full
+        """
+        self.start()
+        with self._condition:
+            waiting = sum(1 for queued in self._jobs if not queued.started)
+            if waiting >= self.max_queue_size:
+                raise QueueFullError(self.retry_after())
+            self._jobs.append(job)
+            self._active[job.job_id] = job
+            position = self._publish_positions(job)
+            self._condition.notify()
+
+        logger.info(
+            f"Queued job {job.job_id} (priority {job.priority}, cost {job.cost:.0f}) at position {position}"
+        )
+        return position
+
+    def active_job_ids(self) -> list[str]:
+        """IDs of the jobs waiting or running"""
+        with self._condition:
+            return list(self._active)
+
+    def __len__(self) -> int:
+        """Number of jobs waiting for a worker"""
+        with self._condition:
+            return len(self._jobs)
+
+    def estimate_wait(self, cost_ahead: float) -> float:
+        """
+        Estimate seconds until a job starts
+
+        Args:
+            cost_ahead: Remaining cost of the work scheduled before the job
+
+        Returns:
+            Estimated wait in seconds
+        """
+        return cost_ahead * self._seconds_per_cost / self.num_workers
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait before retrying"""
+        with self._condition:
+            backlog = self._running_cost + sum(job.remaining_cost for job in self._jobs)
+        return max(1, math.ceil(self.estimate_wait(backlog) / self.max_queue_size))
+
+    def _sort_key(self, job: Job, now: float) -> tuple:
+        """Scheduling key: aged priority class, then aged remaining cost"""
+        age = (now - job.enqueued_at) / self.aging_seconds
+        priority = max(PRIORITY_INTERACTIVE, job.priority - int(age))
+        return priority, job.remaining_cost / (1.0 + age), job.sequence
+
+    def _ordered_jobs(self) -> list[Job]:
+        """Waiting jobs in scheduling order (caller holds the lock)"""
+        now = time.time()
+        return sorted(self._jobs, key=lambda job: self._sort_key(job, now))
+
+    def _publish_positions(self, submitted: Optional[Job] = None) -> int:
+        """
+        Send queue position and ETA to every waiting job (caller holds the lock)
+
+        Args:
+            submitted: Newly submitted job whose position should be returned
+
+        Returns:
+            1-based position of ``submitted`` (0 if not given)
+        """
+        submitted_position = 0
+        cost_ahead = self._running_cost
+        for position, job in enumerate(self._ordered_jobs(), start=1):
+            if job is submitted:
+                submitted_position = position
+            if job.session_id is not None and not job.started:
+                self.session_manager.send_queue_status(
+                    job.session_id, position, self.estimate_wait(cost_ahead)
+                )
+            cost_ahead += job.remaining_cost
+        return submitted_position
+
+    def _worker_loop(self):
+        """Run one step of the best waiting job at a time until stopped"""
+        while True:
+            with self._condition:
+                while self._running and not self._jobs:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                job = self._ordered_jobs()[0]
+                self._jobs.remove(job)
+                self._running_cost += job.remaining_cost
+                self._publish_positions()
+
+            started = time.time()
+            if not job.started:
+                logger.info(f"Starting job {job.job_id} after {started - job.enqueued_at:.1f}s in queue")
+            cost_before = job.remaining_cost
+            finished = True
+            try:
+                if job.steps is None:
+                    job.steps = job.run() or iter(())
+                done_fraction = next(job.steps)
+                if done_fraction is not None:
+                    job.remaining_cost = job.cost * max(0.0, 1.0 - done_fraction)
+                finished = False
+            except StopIteration:
+                job.remaining_cost = 0.0
+            except SynthesisCancelled:
+                logger.info(f"Job {job.job_id} stopped after cancellation ({job.cancel_token.reason})")
+            except Exception as e:
+                logger.error(f"Job {job.job_id} failed: {e}", exc_info=True)
+            finally:
+                elapsed = time.time() - started
+                with self._condition:
+                    self._running_cost -= cost_before
+                    consumed = cost_before - job.remaining_cost if not finished else cost_before
+                    if consumed > 0:
+                        # Exponential moving average of throughput for ETAs
+                        self._seconds_per_cost = (
+                            0.8 * self._seconds_per_cost + 0.2 * elapsed / consumed
+                        )
+                    requeue = not finished and self._running and not job.cancel_token.cancelled
+                    if requeue:
+                        self._jobs.append(job)
+                        self._condition.notify()
+                    else:
+                        self._active.pop(job.job_id, None)
+                if not finished and not requeue:
+                    job.steps.close()
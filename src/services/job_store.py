@@ -0,0 +1,291 @@
+"""
+Job Store
+Durable record of file synthesis jobs for recovery after a restart
+
+Every queued job is stored with its request parameters and state, and its
+progress is journaled chunk by chunk: the number of text chunks written to
+the partial output file and the audio frames they occupy. After a crash or
+deploy, jobs that were queued or running are requeued and resume after the
+last journaled chunk.
+
+Each process holds an exclusive lock on an owner file for as long as it
+runs; jobs whose owner lock can be taken belong to a dead process and are
+claimed by the recovering process.
+"""
+import fcntl
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from src.models.synthesis_request import SynthesisRequest
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Job states
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+UNFINISHED_STATES = (JOB_QUEUED, JOB_RUNNING)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    request TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    state TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    output_file TEXT,
+    chunks_done INTEGER NOT NULL DEFAULT 0,
+    frames_done INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state);
+"""
+
+
+@dataclass
+class JobRecord:
+    """Stored state of a synthesis job"""
+    job_id: str
+    request: SynthesisRequest
+    priority: str
+    state: str
+    owner: str
+    output_file: Optional[str] = None
+    chunks_done: int = 0
+    frames_done: int = 0
+    error: Optional[str] = None
+
+
+def _encode_request(request: SynthesisRequest) -> str:
+    """Serialize a synthesis request"""
+    data = asdict(request)
+    data['ref_audio_path'] = str(request.ref_audio_path)
+    return json.dumps(data)
+
+
+def _decode_request(payload: str) -> SynthesisRequest:
+    """Deserialize a synthesis request"""
+    data = json.loads(payload)
+    data['ref_audio_path'] = Path(data['ref_audio_path'])
+    return SynthesisRequest(**data)
+
+
+class JobStore:
+    """SQLite-backed job table shared by all processes using the same file"""
+
+    def __init__(self, db_path: Path):
+        """
+        Open (and create if needed) the job database
+
+        Args:
+            db_path: SQLite database file; owner locks live in a
+                ``<name>.owners`` directory next to it
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        # Held until this process exits; tells other processes we are alive
+        self.owner = uuid.uuid4().hex
+        self._owner_dir = self.db_path.with_name(self.db_path.name + ".owners")
+        self._owner_dir.mkdir(exist_ok=True)
+        self._owner_lock = open(self._owner_dir / f"{self.owner}.lock", 'w')
+        fcntl.flock(self._owner_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection (autocommit; transactions are explicit)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction taking the database lock up front"""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _update(self, job_id: str, **fields):
+        """Update columns of a job"""
+        fields['updated_at'] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._transaction() as connection:
+            connection.execute(
+                f"UPDATE jobs SET {assignments} WHERE job_id = ?",
+                (*fields.values(), job_id)
+            )
+
+    def add(self, job_id: str, request: SynthesisRequest, priority: str) -> JobRecord:
+        """
+        Record a newly queued job
+
+        Args:
+            job_id: Job identifier
+            request: Synthesis request
+            priority: Scheduling class
+
+        Returns:
+            The stored job
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, request, priority, state, owner, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, _encode_request(request), priority, JOB_QUEUED, self.owner, now, now)
+            )
+        return JobRecord(job_id=job_id, request=request, priority=priority, state=JOB_QUEUED, owner=self.owner)
+
+    def delete(self, job_id: str):
+        """Forget a job (e.g. one rejected by the queue)"""
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def start(self, job_id: str, output_file: str):
+        """Mark a job running and record its output filename"""
+        self._update(job_id, state=JOB_RUNNING, output_file=output_file)
+
+    def record_chunk(self, job_id: str, chunks_done: int, frames_done: int):
+        """
+        Journal a chunk whose audio has been flushed to the partial output
+
+        Args:
+            job_id: Job identifier
+            chunks_done: Number of text chunks written so far
+            frames_done: Audio frames written so far
+        """
+        self._update(job_id, chunks_done=chunks_done, frames_done=frames_done)
+
+    def finish(self, job_id: str, state: str, error: Optional[str] = None):
+        """Mark a job completed, failed or cancelled"""
+        self._update(job_id, state=state, error=error)
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        """Get a job by ID"""
+        row = self._connection().execute(
+            "SELECT job_id, request, priority, state, owner, output_file, chunks_done, frames_done, error"
+            " FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        return self._record(row) if row else None
+
+    @staticmethod
+    def _record(row: tuple) -> JobRecord:
+        job_id, request, priority, state, owner, output_file, chunks_done, frames_done, error = row
+        return JobRecord(
+            job_id=job_id,
+            request=_decode_request(request),
+            priority=priority,
+            state=state,
+            owner=owner,
+            output_file=output_file,
+            chunks_done=chunks_done,
+            frames_done=frames_done,
+            error=error
+        )
+
+    def _owner_alive(self, owner: str) -> bool:
+        """Whether the process that owns a job is still running"""
+        if owner == self.owner:
+            return True
+        lock_path = self._owner_dir / f"{owner}.lock"
+        if not lock_path.exists():
+            return False
+        with open(lock_path, 'w') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+        lock_path.unlink(missing_ok=True)
+        return False
+
+    def claim_orphaned(self) -> list[JobRecord]:
+        """
+        Take over unfinished jobs whose owning process has died
+
+        Returns:
+            Claimed jobs, oldest first
+        """
+        rows = self._connection().execute(
+            "SELECT job_id, request, priority, state, owner, output_file, chunks_done, frames_done, error"
+            f" FROM jobs WHERE state IN ({', '.join('?' for _ in UNFINISHED_STATES)}) ORDER BY created_at",
+            UNFINISHED_STATES
+        ).fetchall()
+
+        claimed = []
+        for row in rows:
+            record = self._record(row)
+            if self._owner_alive(record.owner):
+                continue
+            with self._transaction() as connection:
+                # Another recovering process may have claimed it first
+                taken = connection.execute(
+                    "UPDATE jobs SET owner = ?, updated_at = ? WHERE job_id = ? AND owner = ?",
+                    (self.owner, time.time(), record.job_id, record.owner)
+                ).rowcount
+            if taken:
+                record.owner = self.owner
+                claimed.append(record)
+        return claimed
+
+    def prune(self, cutoff: float) -> int:
+        """
+        Delete finished jobs last updated before ``cutoff`` (epoch seconds)
+
+        Returns:
+            Number of jobs deleted
+        """
+        with self._transaction() as connection:
+            return connection.execute(
+                f"DELETE FROM jobs WHERE state NOT IN ({', '.join('?' for _ in UNFINISHED_STATES)})"
+                " AND updated_at < ?",
+                (*UNFINISHED_STATES, cutoff)
+            ).rowcount
+
+    def close(self):
+        """Release the owner lock (jobs of this process become recoverable)"""
+        fcntl.flock(self._owner_lock, fcntl.LOCK_UN)
+        self._owner_lock.close()
+
+
+# Global job store instance
+_job_store: Optional[JobStore] = None
+
+
+def get_job_store(db_path: Path) -> JobStore:
+    """
+    Get or create global job store instance
+
+    Args:
+        db_path: SQLite database file
+
+    Returns:
+        JobStore instance
+    """
+    global _job_store
+    if _job_store is None:
+        _job_store = JobStore(db_path)
+    return _job_store
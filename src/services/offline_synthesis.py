@@ -0,0 +1,386 @@
+"""
+Offline Synthesis
+Synthesizes a file of texts with one voice across local worker processes,
+without the web server
+
+Each worker process loads its own engine with a fixed number of compute
+threads (and optionally a dedicated set of CPU cores), encodes the voice
+once and then synthesizes groups of items with batched generation. Outputs,
+a result manifest and a timing summary are written to one directory.
+
+This module is imported by the spawned workers before they pin their
+thread counts, so the ML stack is only imported inside worker functions.
+"""
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.models.synthesis_request import BatchItem
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Per-process state of a worker, set up by _init_worker
+_worker: dict = {}
+
+
+@dataclass
+class Voice:
+    """Reference voice: audio to encode or precomputed codec codes, plus transcript"""
+    ref_text: str
+    ref_audio_path: Optional[Path] = None
+    ref_codes_path: Optional[Path] = None
+
+
+@dataclass
+class OfflineSummary:
+    """Timing summary of an offline synthesis run"""
+    items: int
+    completed: int
+    failed: int
+    workers: int
+    threads_per_worker: int
+    wall_seconds: float
+    audio_seconds: float
+    worker_stats: list[dict] = field(default_factory=list)
+
+    @property
+    def real_time_factor(self) -> float:
+        """Seconds of audio produced per second of wall time"""
+        return self.audio_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization"""
+        data = asdict(self)
+        data['real_time_factor'] = round(self.real_time_factor, 3)
+        return data
+
+
+def resolve_voice(voice: str, samples_dir: Path, ref_text: Optional[str] = None) -> tuple[Optional[Voice], Optional[str]]:
+    """
+    Resolve a voice given as a sample name, audio file or codes file
+
+    Samples are looked up by name in the samples directory (subdirectories
+    included); their precomputed codes (``<name>.pt``) are used when present
+    so the reference does not have to be encoded. Files use their sibling
+    ``.txt`` as transcript unless ``ref_text`` is given.
+
+    Args:
+        voice: Sample name, or path to reference audio or a ``.pt`` codes file
+        samples_dir: Directory containing samples
+        ref_text: Transcript of the reference (overrides the ``.txt`` file)
+
+    Returns:
+        Tuple of (voice, error_message); exactly one is None
+    """
+    path = Path(voice)
+    if path.is_file():
+        ref_audio_path, ref_codes_path = (None, path) if path.suffix == '.pt' else (path, None)
+    else:
+        if '/' in voice or '\\' in voice or '..' in voice:
+            return None, f"Voice file not found: {voice}"
+        matches = sorted(samples_dir.rglob(f"{voice}.wav")) + sorted(samples_dir.rglob(f"{voice}.pt"))
+        if not matches:
+            return None, f"Sample not found: {voice}"
+        path = matches[0].with_suffix('')
+        ref_audio_path = path.with_suffix('.wav') if path.with_suffix('.wav').exists() else None
+        ref_codes_path = path.with_suffix('.pt') if path.with_suffix('.pt').exists() else None
+
+    if not ref_text:
+        text_path = path.with_suffix('.txt')
+        if text_path.exists():
+            ref_text = text_path.read_text(encoding='utf-8').strip()
+    if not ref_text:
+        return None, f"Reference text is required for voice {voice} (no {path.with_suffix('.txt').name})"
+
+    return Voice(ref_text=ref_text, ref_audio_path=ref_audio_path, ref_codes_path=ref_codes_path), None
+
+
+def plan_workers(cpu_count: int, workers: Optional[int] = None, threads: Optional[int] = None) -> tuple[int, int]:
+    """
+    Split the available cores between worker processes
+
+    Args:
+        cpu_count: Number of usable CPU cores
+        workers: Requested number of worker processes (derived if None)
+        threads: Requested compute threads per worker (derived if None)
+
+    Returns:
+        Tuple of (workers, threads_per_worker)
+    """
+    cpu_count = max(1, cpu_count)
+    if workers is None and threads is None:
+        threads = min(4, cpu_count)
+    if workers is None:
+        workers = max(1, cpu_count // threads)
+    if threads is None:
+        threads = max(1, cpu_count // workers)
+    return max(1, workers), max(1, threads)
+
+
+def usable_cores() -> list[int]:
+    """CPU cores this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _init_worker(
+    threads: int,
+    core_sets,
+    engine_factory: Optional[Callable],
+    engine_kwargs: dict,
+    voice: Voice,
+    settings: dict
+):
+    """Pin thread counts (and cores), load the engine and encode the voice"""
+    if core_sets is not None and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, core_sets.get())
+
+    # Thread pools size themselves when the libraries load, so pin them first
+    from src.tts.utils import pin_compute_threads
+    pin_compute_threads(threads)
+    import torch
+
+    if engine_factory is None:
+        from src.tts.engine import NeuTTSAir
+        engine_factory = NeuTTSAir
+
+    start_time = time.perf_counter()
+    engine = engine_factory(**engine_kwargs)
+    if voice.ref_codes_path is not None:
+        ref_codes = torch.load(voice.ref_codes_path, weights_only=True)
+    else:
+        ref_codes = engine.encode_reference(voice.ref_audio_path)
+
+    _worker.update(
+        engine=engine,
+        ref_codes=ref_codes,
+        voice=voice,
+        settings=settings,
+        load_seconds=time.perf_counter() - start_time
+    )
+    logger.info(f"Worker {os.getpid()} ready ({threads} threads, {_worker['load_seconds']:.2f}s)")
+
+
+def _synthesize_items(items: list[tuple[int, BatchItem]]) -> dict:
+    """
+    Synthesize a group of items in the worker process
+
+    Returns:
+        Dictionary with the manifest entries of the items, the worker's pid,
+        engine load time and the time spent on the group
+    """
+    from src.services.batch_synthesis import generate_batch_passes
+    from src.utils.audio import AudioFileWriter, get_audio_format
+    from src.utils.text_processor import split_text_into_chunks
+
+    start_time = time.perf_counter()
+    settings = _worker['settings']
+    output_dir = Path(settings['output_dir'])
+    output_format = get_audio_format(settings['output_format'])
+    sample_rate = settings['sample_rate']
+
+    item_chunks = [
+        split_text_into_chunks(item.input_text, max_tokens=settings['max_tokens']) for _, item in items
+    ]
+    chunks_left = [len(chunks) for chunks in item_chunks]
+    entries: list[Optional[dict]] = [None] * len(items)
+    writers = {}
+
+    def finish(position: int, error: Optional[str] = None):
+        index, item = items[position]
+        entry = {'index': index, 'id': item.item_id, 'text': item.input_text}
+        writer = writers.pop(position, None)
+        if error is None:
+            path = writer.close()
+            entry.update(
+                status='completed',
+                file=path.name,
+                duration_seconds=writer.frames_written / sample_rate
+            )
+        else:
+            if writer is not None:
+                writer.abort()
+            entry.update(status='failed', error=error)
+        entries[position] = entry
+
+    try:
+        passes = generate_batch_passes(
+            _worker['engine'], _worker['ref_codes'], _worker['voice'].ref_text, item_chunks,
+            language=settings['language'],
+            generation_batch_size=settings['generation_batch_size'],
+            decode_batch_size=settings['decode_batch_size']
+        )
+        for _, events in passes:
+            for position, wav, error in events:
+                if error is not None:
+                    finish(position, error)
+                    continue
+                if position not in writers:
+                    writers[position] = AudioFileWriter(
+                        output_dir / f"{items[position][1].item_id}.{output_format.extension}",
+                        output_format, sample_rate
+                    )
+                writers[position].write(wav)
+                chunks_left[position] -= 1
+                if chunks_left[position] == 0:
+                    finish(position)
+    except BaseException:
+        for writer in writers.values():
+            writer.abort()
+        raise
+
+    return {
+        'entries': entries,
+        'pid': os.getpid(),
+        'load_seconds': _worker['load_seconds'],
+        'seconds': time.perf_counter() - start_time
+    }
+
+
+def run_offline_synthesis(
+    items: list[BatchItem],
+    voice: Voice,
+    output_dir: Path,
+    engine_kwargs: dict,
+    workers: int = 1,
+    threads_per_worker: int = 1,
+    output_format: str = "wav",
+    language: str = "en-us",
+    max_tokens: int = 1200,
+    generation_batch_size: int = 8,
+    decode_batch_size: int = 4,
+    pin_cores: bool = False,
+    engine_factory: Optional[Callable] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> OfflineSummary:
+    """
+    Synthesize items with one voice across worker processes
+
+    Items are handed out in groups of ``generation_batch_size`` so each
+    worker keeps its backbone passes full while faster workers take more
+    groups. Writes ``<id>.<format>`` per item, ``manifest.jsonl`` (one
+    entry per item, in input order) and ``summary.json`` to ``output_dir``.
+
+    Args:
+        items: Texts to synthesize
+        voice: Reference voice
+        output_dir: Directory for outputs, manifest and summary
+        engine_kwargs: Engine configuration (see NeuTTSAir)
+        workers: Number of worker processes, each loading its own engine
+        threads_per_worker: Compute threads per worker
+        output_format: Output encoding of every item
+        language: Language code for phonemization
+        max_tokens: Maximum tokens per text chunk
+        generation_batch_size: Chunks generated per backbone pass
+        decode_batch_size: Chunks decoded per codec pass
+        pin_cores: Give each worker its own ``threads_per_worker`` cores
+        engine_factory: Picklable engine constructor (default: NeuTTSAir)
+        on_progress: Called with (items_done, items_total) as groups finish
+
+    Returns:
+        Timing summary
+
+    Raises:
+        RuntimeError: If a worker process failed to start or died
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    settings = dict(
+        output_dir=str(output_dir),
+        output_format=output_format,
+        language=language,
+        max_tokens=max_tokens,
+        generation_batch_size=generation_batch_size,
+        decode_batch_size=decode_batch_size,
+        sample_rate=24000
+    )
+
+    # Spawned workers start without inherited torch thread pools
+    context = multiprocessing.get_context('spawn')
+    core_sets = None
+    if pin_cores:
+        cores = usable_cores()
+        core_sets = context.Queue()
+        for slot in range(workers):
+            core_sets.put(
+                set(cores[slot * threads_per_worker:(slot + 1) * threads_per_worker])
+                or set(cores)
+            )
+
+    indexed = list(enumerate(items))
+    group_size = max(1, generation_batch_size)
+    groups = [indexed[start:start + group_size] for start in range(0, len(indexed), group_size)]
+
+    start_time = time.perf_counter()
+    entries: list[Optional[dict]] = [None] * len(items)
+    worker_stats: dict[int, dict] = {}
+    items_done = 0
+    logger.info(
+        f"Synthesizing {len(items)} item(s) with {workers} worker(s) x {threads_per_worker} thread(s)"
+    )
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(threads_per_worker, core_sets, engine_factory, engine_kwargs, voice, settings)
+        ) as executor:
+            futures = [executor.submit(_synthesize_items, group) for group in groups]
+            for future in as_completed(futures):
+                result = future.result()
+                for entry in result['entries']:
+                    entries[entry['index']] = entry
+                stats = worker_stats.setdefault(result['pid'], {
+                    'pid': result['pid'],
+                    'load_seconds': round(result['load_seconds'], 3),
+                    'items': 0,
+                    'busy_seconds': 0.0,
+                    'audio_seconds': 0.0
+                })
+                stats['items'] += len(result['entries'])
+                stats['busy_seconds'] = round(stats['busy_seconds'] + result['seconds'], 3)
+                stats['audio_seconds'] = round(
+                    stats['audio_seconds'] + sum(entry.get('duration_seconds', 0.0) for entry in result['entries']),
+                    3
+                )
+                items_done += len(result['entries'])
+                if on_progress is not None:
+                    on_progress(items_done, len(items))
+    except BrokenProcessPool as e:
+        raise RuntimeError(f"A synthesis worker failed to start or died: {e}") from e
+
+    wall_seconds = time.perf_counter() - start_time
+    completed = sum(1 for entry in entries if entry['status'] == 'completed')
+    summary = OfflineSummary(
+        items=len(items),
+        completed=completed,
+        failed=len(items) - completed,
+        workers=workers,
+        threads_per_worker=threads_per_worker,
+        wall_seconds=round(wall_seconds, 3),
+        audio_seconds=round(sum(entry.get('duration_seconds', 0.0) for entry in entries), 3),
+        worker_stats=sorted(worker_stats.values(), key=lambda stats: stats['pid'])
+    )
+
+    with open(output_dir / "manifest.jsonl", 'w', encoding='utf-8') as manifest:
+        for entry in entries:
+            entry = {key: value for key, value in entry.items() if key != 'index'}
+            if 'duration_seconds' in entry:
+                entry['duration_seconds'] = round(entry['duration_seconds'], 3)
+            manifest.write(json.dumps(entry) + "\n")
+    (output_dir / "summary.json").write_text(json.dumps(summary.to_dict(), indent=2), encoding='utf-8')
+
+    logger.info(
+        f"Offline synthesis done: {completed}/{len(items)} item(s), "
+        f"{summary.audio_seconds:.1f}s audio in {wall_seconds:.1f}s"
+    )
+    return summary
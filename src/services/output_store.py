@@ -0,0 +1,273 @@
+"""
+Output Store
+Content-addressed storage of generated audio with a metadata index
+
+A finished output is named after the hash of its master WAV
+(``<digest>.wav``, encoded variants ``<digest>.<ext>`` next to it, in a
+shard subdirectory), so identical results are stored once and a filename
+always refers to the same bytes. A SQLite index records every stored
+output and, per job, which output it produced together with its voice,
+text hash and format.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from src.utils.audio import AUDIO_FORMATS, AudioFormat, format_for_path, variant_path
+from src.utils.helpers import sharded_path
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Hex characters of the SHA-256 digest used in output filenames (128 bits)
+DIGEST_LENGTH = 32
+
+# Served files' access times are refreshed at most this often, for LRU eviction
+TOUCH_INTERVAL_SECONDS = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS output_jobs (
+    job_id TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    voice TEXT,
+    text_hash TEXT,
+    format TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS output_jobs_by_digest ON output_jobs (digest);
+"""
+
+
+@dataclass
+class OutputRecord:
+    """Index entry of a job's output"""
+    job_id: str
+    digest: str
+    voice: Optional[str]
+    text_hash: Optional[str]
+    format: str
+    duration: float
+    size: int
+
+    @property
+    def filename(self) -> str:
+        """Filename of the output in the job's format"""
+        return f"{self.digest}.{AUDIO_FORMATS[self.format].extension}"
+
+
+def hash_text(text: str) -> str:
+    """Hash of an input text, stored instead of the text itself"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _file_digest(path: Path) -> str:
+    """Content address of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()[:DIGEST_LENGTH]
+
+
+class OutputStore:
+    """Content-addressed output folder with a SQLite index shared by all processes"""
+
+    def __init__(self, output_folder: Path, db_path: Path):
+        """
+        Open (and create if needed) the output index
+
+        Args:
+            output_folder: Directory holding the output files
+            db_path: SQLite index file
+        """
+        self.output_folder = Path(output_folder)
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection (autocommit; transactions are explicit)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction taking the database lock up front"""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def path_for(self, digest: str, audio_format: AudioFormat) -> Path:
+        """Location of an output in the given format"""
+        return sharded_path(self.output_folder, f"{digest}.{audio_format.extension}")
+
+    def add(
+        self,
+        master_path: Path,
+        job_id: str,
+        output_format: str = 'wav',
+        voice: Optional[str] = None,
+        text_hash: Optional[str] = None,
+        duration: float = 0.0
+    ) -> OutputRecord:
+        """
+        Move a finished output into the store under its content address
+
+        The master WAV and its encoded variant (if the job wrote one) are
+        moved to ``<digest>.<ext>``; if the same audio is already stored the
+        new copies are deleted instead.
+
+        Args:
+            master_path: Finished master WAV of the job
+            job_id: Job that produced the output
+            output_format: Format the client asked for
+            voice: Reference voice (file name)
+            text_hash: Hash of the input text (see hash_text)
+            duration: Audio duration in seconds
+
+        Returns:
+            Index entry of the job's output
+        """
+        master_path = Path(master_path)
+        digest = _file_digest(master_path)
+        size = master_path.stat().st_size
+
+        formats = {'wav', output_format}
+        self.path_for(digest, AUDIO_FORMATS['wav']).parent.mkdir(exist_ok=True)
+        for name in formats:
+            source = variant_path(master_path, AUDIO_FORMATS[name])
+            if not source.exists():
+                continue
+            target = self.path_for(digest, AUDIO_FORMATS[name])
+            if target.exists():
+                source.unlink()
+            else:
+                os.replace(source, target)
+
+        now = time.time()
+        with self._transaction() as connection:
+            stored = connection.execute(
+                "INSERT OR IGNORE INTO outputs (digest, size, duration, created_at) VALUES (?, ?, ?, ?)",
+                (digest, size, duration, now)
+            ).rowcount
+            connection.execute(
+                "INSERT OR REPLACE INTO output_jobs (job_id, digest, voice, text_hash, format, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, digest, voice, text_hash, output_format, now)
+            )
+
+        if stored:
+            logger.info(f"Stored output {digest} for job {job_id}")
+        else:
+            logger.info(f"Job {job_id} produced already stored output {digest}")
+        return OutputRecord(job_id, digest, voice, text_hash, output_format, duration, size)
+
+    def resolve(self, filename: str) -> Optional[Path]:
+        """
+        Find the stored file for an output filename
+
+        Args:
+            filename: ``<digest>.<ext>`` as returned to clients
+
+        Returns:
+            Path of the stored master WAV or requested variant (the caller
+            encodes missing variants), or None if the output is unknown
+        """
+        name = Path(filename)
+        if format_for_path(name) is None or name.name != filename:
+            return None
+
+        known = self._connection().execute(
+            "SELECT 1 FROM outputs WHERE digest = ?", (name.stem,)
+        ).fetchone()
+        if not known:
+            return None
+
+        path = sharded_path(self.output_folder, filename)
+        if not path.exists():
+            path = self.path_for(name.stem, AUDIO_FORMATS['wav'])
+            if not path.exists():
+                return None
+        self._touch(path)
+        return path
+
+    @staticmethod
+    def _touch(path: Path):
+        """Mark a file as recently used (keeps its mtime, which ETags depend on)"""
+        try:
+            stat = path.stat()
+            now = time.time()
+            if now - stat.st_atime > TOUCH_INTERVAL_SECONDS:
+                os.utime(path, ns=(int(now * 1e9), stat.st_mtime_ns))
+        except OSError:
+            pass
+
+    def discard(self, path: Path) -> bool:
+        """
+        Remove an output whose file was deleted: its index entries and the
+        remaining files in its other formats
+
+        Args:
+            path: Deleted file of the output
+
+        Returns:
+            True if the file belonged to a stored output
+        """
+        digest = Path(path).stem
+        with self._transaction() as connection:
+            removed = connection.execute("DELETE FROM outputs WHERE digest = ?", (digest,)).rowcount
+            connection.execute("DELETE FROM output_jobs WHERE digest = ?", (digest,))
+        if not removed:
+            return False
+
+        for audio_format in AUDIO_FORMATS.values():
+            self.path_for(digest, audio_format).unlink(missing_ok=True)
+        logger.info(f"Removed output {digest}")
+        return True
+
+
+# Global output store instance
+_output_store: Optional[OutputStore] = None
+
+
+def get_output_store(output_folder: Path, db_path: Path) -> OutputStore:
+    """
+    Get or create global output store instance
+
+    Args:
+        output_folder: Directory holding the output files
+        db_path: SQLite index file
+
+    Returns:
+        OutputStore instance
+    """
+    global _output_store
+    if _output_store is None:
+        _output_store = OutputStore(output_folder, db_path)
+    return _output_store
@@ -0,0 +1,194 @@
+"""
+Sample Catalog
+In-memory list of the demo voice samples
+
+The samples directory (subdirectories included) is scanned once: names,
+transcripts, durations and the location of precomputed reference codes
+(``<name>.pt``) are kept in memory and served without touching the
+filesystem. The catalog is reloaded when the modification time of any
+directory or file in the tree changes, checked at most every
+``check_interval`` seconds.
+"""
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+import soundfile as sf
+
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class Sample:
+    """Voice sample"""
+    name: str
+    audio_path: Path
+    transcript: Optional[str] = None
+    duration: Optional[float] = None
+
+    # Precomputed reference codes, used instead of encoding the audio
+    codes_path: Optional[Path] = None
+
+    @property
+    def reference_path(self) -> Path:
+        """Reference to synthesize with: the codes if precomputed, else the audio"""
+        return self.codes_path or self.audio_path
+
+    def to_dict(self) -> dict:
+        """Public description (the /api/samples entry)"""
+        return {
+            'name': self.name,
+            'wav': str(self.audio_path),
+            'txt': self.transcript,
+            'duration': self.duration,
+            'precomputed': self.codes_path is not None,
+        }
+
+
+class SampleCatalog:
+    """Samples of a directory, reloaded when the directory tree changes"""
+
+    def __init__(self, samples_dir: Path, check_interval: float = 2.0):
+        """
+        Initialize sample catalog (loaded on first use)
+
+        Args:
+            samples_dir: Directory containing samples
+            check_interval: Minimum seconds between checks for changes
+        """
+        self.samples_dir = Path(samples_dir)
+        self.check_interval = check_interval
+        self._lock = Lock()
+        self._samples: dict[str, Sample] = {}
+        self._listing: tuple[dict, str] = ({'samples': []}, '')
+        self._signature: Optional[tuple] = None
+        self._checked_at = float('-inf')
+
+    def _tree_signature(self) -> tuple:
+        """Modification times of every directory and file of the samples tree"""
+        signature = []
+        pending = [self.samples_dir]
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            stat = entry.stat(follow_symlinks=False)
+                        except FileNotFoundError:
+                            continue
+                        signature.append((entry.path, stat.st_mtime_ns, stat.st_size))
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(Path(entry.path))
+            except FileNotFoundError:
+                continue
+        return tuple(sorted(signature))
+
+    def _refresh(self):
+        """Reload the catalog if the samples tree changed"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            signature = self._tree_signature()
+            if signature == self._signature:
+                return
+            self._signature = signature
+            self._load()
+
+    def _load(self):
+        """Scan the samples tree"""
+        samples = {}
+        if not self.samples_dir.exists():
+            logger.warning(f"Samples directory does not exist: {self.samples_dir}")
+
+        for audio_path in sorted(self.samples_dir.rglob('*.wav')):
+            name = audio_path.stem
+            if name in samples:
+                logger.warning(f"Ignoring duplicate sample {audio_path}")
+                continue
+
+            transcript = None
+            text_path = audio_path.with_suffix('.txt')
+            if text_path.exists():
+                try:
+                    transcript = text_path.read_text(encoding='utf-8').strip() or None
+                except Exception as e:
+                    logger.error(f"Error reading {text_path}: {e}")
+
+            try:
+                duration = round(sf.info(str(audio_path)).duration, 3)
+            except Exception as e:
+                logger.error(f"Error reading {audio_path}: {e}")
+                duration = None
+
+            codes_path = audio_path.with_suffix('.pt')
+            samples[name] = Sample(
+                name=name,
+                audio_path=audio_path,
+                transcript=transcript,
+                duration=duration,
+                codes_path=codes_path if codes_path.exists() else None
+            )
+
+        payload = {'samples': [sample.to_dict() for sample in samples.values()]}
+        etag = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:32]
+        self._samples = samples
+        self._listing = (payload, etag)
+        logger.info(f"Loaded {len(samples)} samples from {self.samples_dir}")
+
+    def get(self, name: str) -> Optional[Sample]:
+        """
+        Look up a sample by name
+
+        Args:
+            name: Sample name (without extension)
+
+        Returns:
+            Sample or None if unknown
+        """
+        self._refresh()
+        return self._samples.get(name)
+
+    def listing(self) -> tuple[dict, str]:
+        """
+        Get the /api/samples payload
+
+        Returns:
+            Tuple of (payload, etag)
+        """
+        self._refresh()
+        return self._listing
+
+    def invalidate(self):
+        """Reload on next use, e.g. after adding samples programmatically"""
+        with self._lock:
+            self._signature = None
+            self._checked_at = float('-inf')
+
+
+# Global sample catalog instance
+_sample_catalog: Optional[SampleCatalog] = None
+
+
+def get_sample_catalog(samples_dir: Path) -> SampleCatalog:
+    """
+    Get or create global sample catalog instance
+
+    Args:
+        samples_dir: Directory containing samples
+
+    Returns:
+        SampleCatalog instance
+    """
+    global _sample_catalog
+    if _sample_catalog is None:
+        _sample_catalog = SampleCatalog(samples_dir)
+    return _sample_catalog
@@ -0,0 +1,485 @@
+"""
+Session Backends
+Storage and delivery of session progress updates
+
+The in-memory backend serves a single web process. The SQLite backend
+shares sessions between processes on one host: updates are stored in a
+WAL-mode database, and readers wait on a Unix datagram socket that
+publishers signal after each write, so blocked readers cost no CPU and
+wake immediately.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from queue import Queue, Empty
+from typing import Any, Dict, Optional
+
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SESSION_BACKENDS = ('memory', 'sqlite')
+
+# Unix socket paths are limited to about 100 bytes
+_MAX_SOCKET_DIR_LENGTH = 60
+
+
+def _wake(future: asyncio.Future):
+    """Resolve a waiter future (runs on the waiter's event loop)"""
+    if not future.done():
+        future.set_result(None)
+
+
+class ProgressQueue(Queue):
+    """
+    Session progress queue that can also be awaited from asyncio code
+
+    Synthesis workers put updates from their threads as usual; async
+    readers park a future instead of a thread and are woken on put().
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        with self.mutex:
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    async def get_async(self, timeout: float):
+        """
+        Wait for the next item without blocking the event loop
+
+        Args:
+            timeout: Timeout in seconds
+
+        Returns:
+            Next queued item
+
+        Raises:
+            Empty: If no item arrived before the timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            future = loop.create_future()
+            with self.mutex:
+                if self._qsize():
+                    item = self._get()
+                    self.not_full.notify()
+                    return item
+                self._waiters.append((loop, future))
+
+            remaining = deadline - loop.time()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(future, remaining)
+            except asyncio.TimeoutError:
+                with self.mutex:
+                    if (loop, future) in self._waiters:
+                        self._waiters.remove((loop, future))
+                raise Empty
+
+
+class SessionBackend(ABC):
+    """Storage for sessions and their queued progress updates"""
+
+    @abstractmethod
+    def create(self, session_id: str):
+        """Create (or reset) a session"""
+
+    @abstractmethod
+    def exists(self, session_id: str) -> bool:
+        """Whether a session exists"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Delete a session; returns False if it did not exist"""
+
+    @abstractmethod
+    def publish(self, session_id: str, update: Dict[str, Any]) -> bool:
+        """Queue an update for a session; returns False if it does not exist"""
+
+    @abstractmethod
+    def get(self, session_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait for the next update of a session; None on timeout"""
+
+    @abstractmethod
+    async def get_async(self, session_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Await the next update of a session without holding a thread; None on timeout"""
+
+    @abstractmethod
+    def touch(self, session_ids: list[str]):
+        """Mark sessions as active now (unknown IDs are ignored)"""
+
+    @abstractmethod
+    def expire(self, cutoff: float) -> list[str]:
+        """Delete sessions inactive since before ``cutoff`` (epoch seconds); returns their IDs"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of sessions"""
+
+
+class MemorySessionBackend(SessionBackend):
+    """Sessions held in this process (single web process only)"""
+
+    def __init__(self):
+        self._queues: Dict[str, ProgressQueue] = {}
+        # Last time each session was created, published to or read
+        self._active_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _queue(self, session_id: str) -> Optional[ProgressQueue]:
+        """Queue of a session, marking the session as active"""
+        with self._lock:
+            queue = self._queues.get(session_id)
+            if queue is not None:
+                self._active_at[session_id] = time.time()
+            return queue
+
+    def create(self, session_id: str):
+        with self._lock:
+            self._queues[session_id] = ProgressQueue()
+            self._active_at[session_id] = time.time()
+
+    def exists(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._queues
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id not in self._queues:
+                return False
+            del self._queues[session_id]
+            del self._active_at[session_id]
+            return True
+
+    def publish(self, session_id: str, update: Dict[str, Any]) -> bool:
+        queue = self._queue(session_id)
+        if queue is None:
+            return False
+        queue.put(update)
+        return True
+
+    def get(self, session_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        queue = self._queue(session_id)
+        if queue is None:
+            return None
+        try:
+            return queue.get(timeout=timeout)
+        except Empty:
+            return None
+
+    async def get_async(self, session_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        queue = self._queue(session_id)
+        if queue is None:
+            return None
+        try:
+            return await queue.get_async(timeout)
+        except Empty:
+            return None
+
+    def touch(self, session_ids: list[str]):
+        now = time.time()
+        with self._lock:
+            for session_id in session_ids:
+                if session_id in self._queues:
+                    self._active_at[session_id] = now
+
+    def expire(self, cutoff: float) -> list[str]:
+        with self._lock:
+            expired = [session_id for session_id, active in self._active_at.items() if active < cutoff]
+            for session_id in expired:
+                del self._queues[session_id]
+                del self._active_at[session_id]
+        return expired
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._queues)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    -- Last time the session was created, published to or read
+    active_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS updates (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS updates_by_session ON updates (session_id, seq);
+CREATE TABLE IF NOT EXISTS waiters (
+    address TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS waiters_by_session ON waiters (session_id);
+"""
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    Sessions shared by all processes using the same database file
+
+    Any process may publish and any process may read. A reader registers a
+    datagram socket in the ``waiters`` table, then checks for queued
+    updates, then blocks on the socket; a publisher inserts its update,
+    then signals the registered sockets. Either the reader sees the update
+    or the publisher sees the reader, so no wakeup is lost.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Open (and create if needed) the session database
+
+        Args:
+            db_path: SQLite database file; reader sockets live in a
+                ``<name>.sockets`` directory next to it (or in the temp
+                directory if that path is too long for socket addresses)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._socket_dir = self._socket_directory(self.db_path)
+        self._socket_dir.mkdir(exist_ok=True)
+        self._local = threading.local()
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+        self._migrate()
+        logger.info(f"Using shared session store: {self.db_path}")
+
+    @staticmethod
+    def _socket_directory(db_path: Path) -> Path:
+        """Directory for reader sockets, shared by all users of the database"""
+        socket_dir = db_path.resolve().with_name(db_path.name + ".sockets")
+        if len(str(socket_dir)) <= _MAX_SOCKET_DIR_LENGTH:
+            return socket_dir
+        # Too long for socket addresses: use a per-database temp directory
+        digest = hashlib.sha256(str(socket_dir).encode()).hexdigest()[:16]
+        return Path(tempfile.gettempdir()) / f"sessions-{digest}"
+
+    def _migrate(self):
+        """Add the activity time to databases created before it was tracked"""
+        with self._transaction() as connection:
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(sessions)")}
+            if 'active_at' not in columns:
+                connection.execute("ALTER TABLE sessions ADD COLUMN active_at REAL NOT NULL DEFAULT 0")
+                connection.execute("UPDATE sessions SET active_at = created_at")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection (autocommit; transactions are explicit)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction taking the database lock up front"""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def create(self, session_id: str):
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM updates WHERE session_id = ?", (session_id,))
+            now = time.time()
+            connection.execute(
+                "INSERT OR REPLACE INTO sessions (id, created_at, active_at) VALUES (?, ?, ?)",
+                (session_id, now, now)
+            )
+
+    def exists(self, session_id: str) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        return row is not None
+
+    def delete(self, session_id: str) -> bool:
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM updates WHERE session_id = ?", (session_id,))
+            deleted = connection.execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount
+        return deleted > 0
+
+    def publish(self, session_id: str, update: Dict[str, Any]) -> bool:
+        with self._transaction() as connection:
+            if not self._mark_active(connection, [session_id]):
+                return False
+            connection.execute(
+                "INSERT INTO updates (session_id, payload) VALUES (?, ?)",
+                (session_id, json.dumps(update))
+            )
+            addresses = [
+                row[0] for row in connection.execute(
+                    "SELECT address FROM waiters WHERE session_id = ?", (session_id,)
+                )
+            ]
+        self._signal(addresses)
+        return True
+
+    @staticmethod
+    def _mark_active(connection: sqlite3.Connection, session_ids: list[str]) -> int:
+        """Set the activity time of sessions; returns how many exist"""
+        now = time.time()
+        return connection.executemany(
+            "UPDATE sessions SET active_at = ? WHERE id = ?", [(now, session_id) for session_id in session_ids]
+        ).rowcount
+
+    def touch(self, session_ids: list[str]):
+        if session_ids:
+            with self._transaction() as connection:
+                self._mark_active(connection, session_ids)
+
+    def _signal(self, addresses: list[str]):
+        """Wake readers blocked on their sockets, forgetting dead ones"""
+        if not addresses:
+            return
+        stale = []
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+            sender.setblocking(False)
+            for address in addresses:
+                try:
+                    sender.sendto(b"\x01", address)
+                except BlockingIOError:
+                    # Reader already has pending wakeups
+                    pass
+                except (FileNotFoundError, ConnectionRefusedError):
+                    stale.append(address)
+        if stale:
+            with self._transaction() as connection:
+                connection.executemany("DELETE FROM waiters WHERE address = ?", [(a,) for a in stale])
+
+    def _pop(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Remove and return the oldest queued update, if any"""
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT seq, payload FROM updates WHERE session_id = ? ORDER BY seq LIMIT 1",
+                (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("DELETE FROM updates WHERE seq = ?", (row[0],))
+        return json.loads(row[1])
+
+    @contextmanager
+    def _waiter(self, session_id: str):
+        """Register a datagram socket to be signalled on new updates (marks the session active)"""
+        address = str(self._socket_dir / f"{uuid.uuid4().hex[:16]}.sock")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.bind(address)
+            with self._transaction() as connection:
+                self._mark_active(connection, [session_id])
+                connection.execute(
+                    "INSERT INTO waiters (address, session_id) VALUES (?, ?)", (address, session_id)
+                )
+            yield sock
+        finally:
+            sock.close()
+            with self._transaction() as connection:
+                connection.execute("DELETE FROM waiters WHERE address = ?", (address,))
+            try:
+                os.unlink(address)
+            except FileNotFoundError:
+                pass
+
+    def get(self, session_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + timeout
+        with self._waiter(session_id) as sock:
+            while True:
+                update = self._pop(session_id)
+                if update is not None:
+                    return update
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                sock.settimeout(remaining)
+                try:
+                    sock.recv(64)
+                except socket.timeout:
+                    pass
+
+    async def get_async(self, session_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        waiter = self._waiter(session_id)
+        # Database calls may wait for the write lock, so they run off the loop
+        sock = await asyncio.to_thread(waiter.__enter__)
+        try:
+            sock.setblocking(False)
+            while True:
+                update = await asyncio.to_thread(self._pop, session_id)
+                if update is not None:
+                    return update
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+                try:
+                    await asyncio.wait_for(loop.sock_recv(sock, 64), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await asyncio.to_thread(waiter.__exit__, None, None, None)
+
+    def expire(self, cutoff: float) -> list[str]:
+        with self._transaction() as connection:
+            expired = [
+                row[0] for row in connection.execute(
+                    "SELECT id FROM sessions WHERE active_at < ?", (cutoff,)
+                )
+            ]
+            connection.execute("DELETE FROM sessions WHERE active_at < ?", (cutoff,))
+            connection.execute("DELETE FROM updates WHERE session_id NOT IN (SELECT id FROM sessions)")
+        return expired
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+def create_session_backend(name: str = 'memory', db_path: Optional[Path] = None) -> SessionBackend:
+    """
+    Create a session backend by name
+
+    Args:
+        name: 'memory' or 'sqlite'
+        db_path: Database file for the sqlite backend
+
+    Returns:
+        Session backend
+
+    Raises:
+        ValueError: If the backend is unknown or misconfigured
+    """
+    if name == 'memory':
+        return MemorySessionBackend()
+    if name == 'sqlite':
+        if db_path is None:
+            raise ValueError("The sqlite session backend needs a database path")
+        return SQLiteSessionBackend(db_path)
+    raise ValueError(f"Unknown session backend: {name} (expected one of {', '.join(SESSION_BACKENDS)})")
@@ -2,10 +2,11 @@
 Session Manager
 Manages synthesis sessions and progress tracking
 """
-from queue import Queue, Empty
-from threading import Thread, Lock
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+import asyncio
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Any
+from src.services.session_backends import SessionBackend, create_session_backend
 from src.config.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -14,47 +15,38 @@ logger = get_logger(__name__)
 class SessionManager:
     """Manages synthesis sessions and progress tracking"""
 
-    def __init__(self, timeout_seconds: int = 300):
+    def __init__(self, timeout_seconds: int = 300, backend: Optional[SessionBackend] = None):
         """
         Initialize session manager
 
         Args:
             timeout_seconds: Timeout for inactive sessions
+            backend: Session storage (default: in-memory, this process only)
         """
         self.timeout_seconds = timeout_seconds
-        self._sessions: Dict[str, Queue] = {}
-        self._session_timestamps: Dict[str, datetime] = {}
-        self._lock = Lock()
+        self._backend = backend or create_session_backend('memory')
 
-    def create_session(self, session_id: str) -> Queue:
+    def create_session(self, session_id: str):
         """
         Create a new session
 
         Args:
             session_id: Unique session identifier
-
-        Returns:
-            Progress queue for the session
         """
-        with self._lock:
-            queue = Queue()
-            self._sessions[session_id] = queue
-            self._session_timestamps[session_id] = datetime.now()
-            logger.info(f"Created session: {session_id}")
-            return queue
+        self._backend.create(session_id)
+        logger.info(f"Created session: {session_id}")
 
-    def get_session(self, session_id: str) -> Optional[Queue]:
+    def has_session(self, session_id: str) -> bool:
         """
-        Get session queue
+        Check whether a session exists
 
         Args:
             session_id: Session identifier
 
         Returns:
-            Queue if session exists, None otherwise
+            True if the session exists (in any process sharing the backend)
         """
-        with self._lock:
-            return self._sessions.get(session_id)
+        return self._backend.exists(session_id)
 
     def delete_session(self, session_id: str) -> bool:
         """
@@ -66,13 +58,10 @@ class SessionManager:
         Returns:
             True if session was deleted, False if not found
         """
-        with self._lock:
-            if session_id in self._sessions:
-                del self._sessions[session_id]
-                del self._session_timestamps[session_id]
-                logger.info(f"Deleted session: {session_id}")
-                return True
-            return False
+        if self._backend.delete(session_id):
+            logger.info(f"Deleted session: {session_id}")
+            return True
+        return False
 
     def send_progress(
         self,
@@ -93,18 +82,41 @@ class SessionManager:
         Returns:
             True if sent successfully, False if session not found
         """
-        queue = self.get_session(session_id)
-        if queue is None:
-            logger.warning(f"Attempted to send progress to non-existent session: {session_id}")
-            return False
-
-        queue.put({
+        if not self._backend.publish(session_id, {
             'step': step,
             'message': message,
             'progress': progress
-        })
+        }):
+            logger.warning(f"Attempted to send progress to non-existent session: {session_id}")
+            return False
         return True
 
+    def send_queue_status(
+        self,
+        session_id: str,
+        position: int,
+        eta_seconds: float
+    ) -> bool:
+        """
+        Send queue position and estimated start time to session
+
+        Args:
+            session_id: Session identifier
+            position: 1-based position in the synthesis queue
+            eta_seconds: Estimated seconds until synthesis starts
+
+        Returns:
+            True if sent successfully, False if session not found
+        """
+        eta = round(eta_seconds)
+        return self._backend.publish(session_id, {
+            'queued': True,
+            'position': position,
+            'eta_seconds': eta,
+            'progress': 5,
+            'message': f'Waiting in queue (position {position}, starts in ~{eta}s)...'
+        })
+
     def send_completion(
         self,
         session_id: str,
@@ -122,16 +134,79 @@ class SessionManager:
         Returns:
             True if sent successfully, False if session not found
         """
-        queue = self.get_session(session_id)
-        if queue is None:
-            logger.warning(f"Attempted to send completion to non-existent session: {session_id}")
-            return False
-
-        queue.put({
+        if not self._backend.publish(session_id, {
             'complete': True,
             'output_file': output_file,
             'message': f'Speech synthesized successfully! ({chunks_processed} chunk{"s" if chunks_processed > 1 else ""})'
+        }):
+            logger.warning(f"Attempted to send completion to non-existent session: {session_id}")
+            return False
+        logger.info(f"Session completed: {session_id}")
+        return True
+
+    def send_item_result(
+        self,
+        session_id: str,
+        item: Dict[str, Any],
+        items_done: int,
+        items_total: int,
+        progress: int
+    ) -> bool:
+        """
+        Send the outcome of one item of a batch job to session
+
+        Failed items are reported under ``item`` only, so a progress stream
+        keeps following the rest of the batch.
+
+        Args:
+            session_id: Session identifier
+            item: Manifest entry of the finished item (id, status, file or error)
+            items_done: Number of items finished so far
+            items_total: Number of items in the batch
+            progress: Progress percentage (0-100)
+
+        Returns:
+            True if sent successfully, False if session not found
+        """
+        return self._backend.publish(session_id, {
+            'item': item,
+            'items_done': items_done,
+            'items_total': items_total,
+            'progress': progress,
+            'message': f"Item {item['id']} {item['status']} ({items_done}/{items_total})"
         })
+
+    def send_batch_completion(
+        self,
+        session_id: str,
+        archive_file: str,
+        manifest_file: str,
+        completed: int,
+        failed: int
+    ) -> bool:
+        """
+        Send completion message of a batch job to session
+
+        Args:
+            session_id: Session identifier
+            archive_file: Archive of the generated outputs
+            manifest_file: Result manifest listing every item
+            completed: Number of items synthesized
+            failed: Number of items that failed
+
+        Returns:
+            True if sent successfully, False if session not found
+        """
+        if not self._backend.publish(session_id, {
+            'complete': True,
+            'output_file': archive_file,
+            'manifest_file': manifest_file,
+            'items_completed': completed,
+            'items_failed': failed,
+            'message': f'Batch finished: {completed} item(s) synthesized, {failed} failed'
+        }):
+            logger.warning(f"Attempted to send completion to non-existent session: {session_id}")
+            return False
         logger.info(f"Session completed: {session_id}")
         return True
 
@@ -146,15 +221,12 @@ class SessionManager:
         Returns:
             True if sent successfully, False if session not found
         """
-        queue = self.get_session(session_id)
-        if queue is None:
-            logger.warning(f"Attempted to send error to non-existent session: {session_id}")
-            return False
-
-        queue.put({
+        if not self._backend.publish(session_id, {
             'error': True,
             'message': error_message
-        })
+        }):
+            logger.warning(f"Attempted to send error to non-existent session: {session_id}")
+            return False
         logger.error(f"Session error: {session_id} - {error_message}")
         return True
 
@@ -169,34 +241,52 @@ class SessionManager:
         Returns:
             Progress update dict or None if timeout
         """
-        queue = self.get_session(session_id)
-        if queue is None:
+        if not self._backend.exists(session_id):
             return {"error": "Invalid session ID"}
 
-        try:
-            return queue.get(timeout=timeout)
-        except Empty:
+        update = self._backend.get(session_id, timeout)
+        if update is None:
             # Timeout - send keepalive
             return {"keepalive": True}
+        return update
 
-    def cleanup_old_sessions(self) -> int:
+    async def get_progress_async(self, session_id: str, timeout: int = 30) -> Optional[Dict[str, Any]]:
         """
-        Clean up old/inactive sessions
+        Await next progress update from session without holding a thread
+
+        Args:
+            session_id: Session identifier
+            timeout: Timeout in seconds
 
         Returns:
-            Number of sessions cleaned up
+            Progress update dict, or a keepalive dict on timeout
+        """
+        # The backend may wait on its database, which must not block the loop
+        if not await asyncio.to_thread(self._backend.exists, session_id):
+            return {"error": "Invalid session ID"}
+
+        update = await self._backend.get_async(session_id, timeout)
+        if update is None:
+            # Timeout - send keepalive
+            return {"keepalive": True}
+        return update
+
+    def cleanup_old_sessions(self, active_session_ids: Iterable[str] = ()) -> int:
         """
-        cutoff_time = datetime.now() - timedelta(seconds=self.timeout_seconds)
-        cleaned = 0
+        Clean up sessions without activity for the session timeout
 
-        with self._lock:
-            session_ids = list(self._session_timestamps.keys())
-            for session_id in session_ids:
-                if self._session_timestamps[session_id] < cutoff_time:
-                    del self._sessions[session_id]
-                    del self._session_timestamps[session_id]
-                    cleaned += 1
-                    logger.info(f"Cleaned up inactive session: {session_id}")
+        Args:
+            active_session_ids: Sessions of queued or running jobs, kept
+                however long the job takes
+
+        Returns:
+            Number of sessions cleaned up
+        """
+        self._backend.touch(list(active_session_ids))
+        expired = self._backend.expire(time.time() - self.timeout_seconds)
+        for session_id in expired:
+            logger.info(f"Cleaned up inactive session: {session_id}")
+        cleaned = len(expired)
 
         if cleaned > 0:
             logger.info(f"Cleaned up {cleaned} inactive sessions")
@@ -205,25 +295,30 @@ class SessionManager:
 
     def get_active_session_count(self) -> int:
         """Get number of active sessions"""
-        with self._lock:
-            return len(self._sessions)
+        return self._backend.count()
 
 
 # Global session manager instance
 _session_manager: Optional[SessionManager] = None
 
 
-def get_session_manager(timeout_seconds: int = 300) -> SessionManager:
+def get_session_manager(
+    timeout_seconds: int = 300,
+    backend: str = 'memory',
+    db_path: Optional[Path] = None
+) -> SessionManager:
     """
     Get or create global session manager instance
 
     Args:
         timeout_seconds: Session timeout
+        backend: Session backend name ('memory' or 'sqlite')
+        db_path: Database file for the sqlite backend
 
     Returns:
         SessionManager instance
     """
     global _session_manager
     if _session_manager is None:
-        _session_manager = SessionManager(timeout_seconds)
+        _session_manager = SessionManager(timeout_seconds, create_session_backend(backend, db_path))
     return _session_manager
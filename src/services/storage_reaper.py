@@ -0,0 +1,220 @@
+"""
+Storage Reaper
+Background maintenance of the upload and output folders and of sessions
+
+Inactive sessions are expired every session interval, except those of
+queued or running jobs. Every storage
+interval each managed directory is swept: files older than its age limit
+are deleted, then the least recently used files until the directory fits
+its byte quota. Hidden files (partial outputs of running or resumable
+jobs) are only subject to the age limit, and files used within the grace
+period are never evicted for the quota.
+"""
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Event, Thread
+from typing import Callable, Iterable, Optional
+
+from src.services.session_manager import SessionManager
+from src.utils.helpers import StoredFile, scan_files
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class StoragePolicy:
+    """Limits of one managed directory"""
+    path: Path
+
+    # Byte quota (0 = unlimited)
+    max_bytes: int = 0
+
+    # Files not modified for this long are deleted (0 = no age limit)
+    max_age_seconds: float = 0
+
+    # Files used more recently than this are kept even over quota
+    grace_seconds: float = 600
+
+    # Called with the path of every deleted file
+    on_delete: Optional[Callable[[Path], None]] = None
+
+
+@dataclass
+class SweepStats:
+    """Result of sweeping one directory"""
+    files: int = 0
+    deleted: int = 0
+    freed_bytes: int = 0
+    used_bytes: int = 0
+
+
+class StorageReaper:
+    """Background thread enforcing storage policies and expiring sessions"""
+
+    def __init__(
+        self,
+        policies: list[StoragePolicy],
+        session_manager: Optional[SessionManager] = None,
+        session_interval: float = 60,
+        storage_interval: float = 300,
+        active_sessions: Optional[Callable[[], Iterable[str]]] = None
+    ):
+        """
+        Initialize storage reaper
+
+        Args:
+            policies: Managed directories
+            session_manager: Session manager whose inactive sessions expire
+            session_interval: Seconds between session expiry runs
+            storage_interval: Seconds between directory sweeps (0 disables them)
+            active_sessions: Returns the sessions of this process's queued and
+                running jobs, which never expire
+        """
+        self.policies = policies
+        self.session_manager = session_manager
+        self.active_sessions = active_sessions
+        self.session_interval = max(1.0, session_interval)
+        self.storage_interval = storage_interval
+        self._stopped = Event()
+        self._thread: Optional[Thread] = None
+
+    def sweep(self, policy: StoragePolicy, now: Optional[float] = None) -> SweepStats:
+        """
+        Enforce one directory's age limit and quota
+
+        Args:
+            policy: Directory and limits
+            now: Current time (epoch seconds)
+
+        Returns:
+            Sweep statistics
+        """
+        now = now if now is not None else time.time()
+        files = scan_files(policy.path)
+        stats = SweepStats(files=len(files), used_bytes=sum(f.size for f in files))
+
+        expired, kept = [], []
+        for stored in files:
+            if policy.max_age_seconds and now - stored.modified > policy.max_age_seconds:
+                expired.append(stored)
+            elif not stored.path.name.startswith('.'):
+                kept.append(stored)
+        for stored in expired:
+            self._delete(stored, policy, stats)
+
+        if policy.max_bytes and stats.used_bytes > policy.max_bytes:
+            kept.sort(key=lambda f: f.last_used)
+            for stored in kept:
+                if stats.used_bytes <= policy.max_bytes or now - stored.last_used < policy.grace_seconds:
+                    break
+                self._delete(stored, policy, stats)
+            if stats.used_bytes > policy.max_bytes:
+                logger.warning(
+                    f"{policy.path} uses {stats.used_bytes} bytes, over its {policy.max_bytes} byte "
+                    f"quota, but the remaining files were used recently"
+                )
+
+        if stats.deleted:
+            logger.info(f"Deleted {stats.deleted} files ({stats.freed_bytes} bytes) from {policy.path}")
+        return stats
+
+    @staticmethod
+    def _delete(stored: StoredFile, policy: StoragePolicy, stats: SweepStats):
+        """Delete a file and account for it"""
+        try:
+            stored.path.unlink()
+        except FileNotFoundError:
+            pass
+        stats.deleted += 1
+        stats.freed_bytes += stored.size
+        stats.used_bytes -= stored.size
+        if policy.on_delete is not None:
+            policy.on_delete(stored.path)
+
+    def run_once(self, sweep_storage: bool = True):
+        """Expire sessions and (optionally) sweep every directory"""
+        if self.session_manager is not None:
+            try:
+                active = self.active_sessions() if self.active_sessions is not None else ()
+                self.session_manager.cleanup_old_sessions(active)
+            except Exception as e:
+                logger.error(f"Session cleanup failed: {e}")
+
+        if sweep_storage:
+            for policy in self.policies:
+                try:
+                    self.sweep(policy)
+                except Exception as e:
+                    logger.error(f"Storage sweep of {policy.path} failed: {e}", exc_info=True)
+
+    def _run(self):
+        """Reaper thread main loop"""
+        next_sweep = time.monotonic()
+        while True:
+            due = self.storage_interval > 0 and time.monotonic() >= next_sweep
+            self.run_once(sweep_storage=due)
+            if due:
+                next_sweep = time.monotonic() + self.storage_interval
+            if self._stopped.wait(self.session_interval):
+                return
+
+    def start(self):
+        """Start the background thread"""
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name="storage-reaper", daemon=True)
+            self._thread.start()
+            logger.info(
+                f"Storage reaper started (sessions every {self.session_interval:.0f}s, "
+                f"storage every {self.storage_interval:.0f}s)"
+            )
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Global storage reaper instance
+_storage_reaper: Optional[StorageReaper] = None
+
+
+def start_storage_reaper(
+    policies: list[StoragePolicy],
+    session_manager: Optional[SessionManager] = None,
+    session_interval: float = 60,
+    storage_interval: float = 300,
+    active_sessions: Optional[Callable[[], Iterable[str]]] = None
+) -> StorageReaper:
+    """
+    Start the global storage reaper (once per process)
+
+    Args:
+        policies: Managed directories
+        session_manager: Session manager whose inactive sessions expire
+        session_interval: Seconds between session expiry runs
+        storage_interval: Seconds between directory sweeps (0 disables them)
+        active_sessions: Returns the sessions of this process's queued and
+            running jobs, which never expire
+
+    Returns:
+        StorageReaper instance
+    """
+    global _storage_reaper
+    if _storage_reaper is None:
+        _storage_reaper = StorageReaper(
+            policies, session_manager, session_interval, storage_interval, active_sessions
+        )
+        _storage_reaper.start()
+    return _storage_reaper
+
+
+def stop_storage_reaper():
+    """Stop the global storage reaper"""
+    global _storage_reaper
+    if _storage_reaper is not None:
+        _storage_reaper.stop()
+        _storage_reaper = None
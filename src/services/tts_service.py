@@ -2,23 +2,61 @@
 TTS Service
 Business logic for text-to-speech synthesis
 """
+import asyncio
+import json
+import os
+import shutil
 import time
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from threading import Thread
-from typing import Optional
+from queue import Queue
+from threading import Event, Lock, Thread
+from typing import TYPE_CHECKING, AsyncGenerator, Callable, Generator, Optional, Union
 import numpy as np
 import soundfile as sf
 
-from src.tts.engine import NeuTTSAir
-from src.models.synthesis_request import SynthesisRequest
+from src.models.synthesis_request import BatchSynthesisRequest, SynthesisRequest
 from src.models.synthesis_response import SynthesisResult
 from src.services.session_manager import SessionManager
+from src.services.job_queue import Job, JobQueue, PRIORITY_CLASSES, QueueFullError
+from src.services.engine_pool import EngineProcessPool
+from src.services.batch_synthesis import generate_batch_passes
+from src.services.offline_synthesis import usable_cores
+from src.services.output_store import OutputStore, hash_text
+from src.services.job_store import (
+    JOB_CANCELLED, JOB_COMPLETED, JOB_FAILED, JobRecord, JobStore
+)
 from src.utils.text_processor import split_text_into_chunks
-from src.utils.helpers import generate_timestamp_filename
+from src.utils.helpers import generate_session_id
+from src.utils.audio import (
+    AUDIO_FORMATS, AudioFileWriter, CrossfadeJoiner, get_audio_format, variant_path
+)
+from src.utils.cancellation import CancellationToken, SynthesisCancelled, raise_if_cancelled
 from src.config.logging_config import get_logger
 
+if TYPE_CHECKING:
+    from src.tts.engine import NeuTTSAir
+
 logger = get_logger(__name__)
 
+# Marks the end of a queued streaming job's audio
+_STREAM_END = object()
+
+# Fixed per-chunk cost (prompt prefill, codec pass) in character-equivalents
+CHUNK_OVERHEAD_COST = 20.0
+
+# Chunks synthesized ahead of the next one to write, per engine process, in
+# long-document mode (bounds the reorder buffer)
+PARALLEL_LOOKAHEAD_PER_PROCESS = 4
+
+# Encoded references kept in memory (sample voices are reused across requests)
+REFERENCE_CACHE_SIZE = 32
+
+# Finished jobs are kept in the job store for this long
+FINISHED_JOB_RETENTION_SECONDS = 24 * 3600
+
 
 class TTSService:
     """Service for managing text-to-speech synthesis"""
@@ -30,7 +68,19 @@ class TTSService:
         backbone_repo: str = "neuphonic/neutts-air",
         backbone_device: str = "cpu",
         codec_repo: str = "neuphonic/neucodec",
-        codec_device: str = "cpu"
+        codec_device: str = "cpu",
+        decode_batch_size: int = 4,
+        generation_batch_size: int = 8,
+        num_workers: int = 1,
+        max_queue_size: int = 32,
+        aging_seconds: float = 60.0,
+        engine_processes: int = 0,
+        engine_threads: int = 0,
+        long_document_chunks: int = 4,
+        crossfade_ms: float = 20.0,
+        weights_cache_dir: Optional[Path] = None,
+        job_store: Optional[JobStore] = None,
+        output_store: Optional[OutputStore] = None
     ):
         """
         Initialize TTS service
@@ -42,30 +92,189 @@ class TTSService:
             backbone_device: Device for backbone model
             codec_repo: Codec model repository
             codec_device: Device for codec model
+            decode_batch_size: Number of chunks decoded per batched codec pass
+            generation_batch_size: Number of batch-job chunks generated per backbone pass
+            num_workers: Number of synthesis worker threads
+            max_queue_size: Maximum number of jobs waiting for a worker
+            aging_seconds: Waiting time after which a queued job is promoted one priority class
+            engine_processes: Run the engine in this many dedicated processes
+                (0 loads it in this process)
+            engine_threads: Compute threads per engine process (0 splits the
+                cores evenly between the processes)
+            long_document_chunks: Texts with at least this many chunks are
+                synthesized on all engine processes at once (0 disables)
+            crossfade_ms: Crossfade between chunks synthesized in parallel
+            weights_cache_dir: Local pre-converted weight cache
+            job_store: Durable job table for restart recovery (None disables it)
+            output_store: Content-addressed output index (None keeps outputs
+                under their per-job working names)
         """
         self.session_manager = session_manager
         self.output_folder = output_folder
-        self._tts_engine: Optional[NeuTTSAir] = None
+        self._tts_engine: Optional[Union['NeuTTSAir', EngineProcessPool]] = None
         self._backbone_repo = backbone_repo
         self._backbone_device = backbone_device
         self._codec_repo = codec_repo
         self._codec_device = codec_device
+        self._weights_cache_dir = weights_cache_dir
+        self.job_store = job_store
+        self.output_store = output_store
+        self.decode_batch_size = max(1, decode_batch_size)
+        self.generation_batch_size = max(1, generation_batch_size)
+        self._engine_processes = engine_processes
+        self._engine_threads = engine_threads
+        self.long_document_chunks = long_document_chunks
+        self.crossfade_ms = crossfade_ms
+        self._parallel_executor: Optional[ThreadPoolExecutor] = None
+        self._engine_lock = Lock()
+        self._ready = Event()
+        self.warm_up_error: Optional[str] = None
+        self.job_queue = JobQueue(
+            session_manager,
+            num_workers=num_workers,
+            max_queue_size=max_queue_size,
+            aging_seconds=aging_seconds
+        )
+        self._reference_cache: OrderedDict = OrderedDict()
+        self._reference_lock = Lock()
 
         # Ensure output folder exists
         self.output_folder.mkdir(parents=True, exist_ok=True)
 
-    def get_tts_engine(self) -> NeuTTSAir:
-        """Get or create TTS engine instance (lazy loading)"""
+    def get_tts_engine(self) -> Union['NeuTTSAir', EngineProcessPool]:
+        """
+        Get or create TTS engine instance
+
+        Loaded on first use unless warm_up() ran at startup. Concurrent first
+        callers wait for a single load instead of each loading the models.
+        """
         if self._tts_engine is None:
-            logger.info("Initializing TTS engine (first use)")
-            self._tts_engine = NeuTTSAir(
-                backbone_repo=self._backbone_repo,
-                backbone_device=self._backbone_device,
-                codec_repo=self._codec_repo,
-                codec_device=self._codec_device
-            )
+            with self._engine_lock:
+                if self._tts_engine is None:
+                    logger.info("Initializing TTS engine")
+                    engine_kwargs = dict(
+                        backbone_repo=self._backbone_repo,
+                        backbone_device=self._backbone_device,
+                        codec_repo=self._codec_repo,
+                        codec_device=self._codec_device,
+                        weights_cache_dir=self._weights_cache_dir
+                    )
+                    if self._engine_processes > 0:
+                        threads = self._engine_threads or max(
+                            1, len(usable_cores()) // self._engine_processes
+                        )
+                        self._tts_engine = EngineProcessPool(
+                            self._engine_processes, threads_per_process=threads, **engine_kwargs
+                        )
+                    else:
+                        # Deferred: the ML stack is only imported where the model runs
+                        from src.tts.engine import NeuTTSAir
+                        self._tts_engine = NeuTTSAir(**engine_kwargs)
         return self._tts_engine
 
+    @property
+    def is_ready(self) -> bool:
+        """Whether the engine is loaded and warmed up"""
+        return self._ready.is_set()
+
+    def warm_up(self, ref_audio_path: Optional[Path] = None, ref_text: Optional[str] = None):
+        """
+        Load the engine and run a short warm-up synthesis
+
+        Marks the service ready when done. Without a reference sample the
+        engine is only loaded.
+
+        Args:
+            ref_audio_path: Reference audio for the warm-up synthesis
+            ref_text: Transcript of the reference audio
+        """
+        start_time = time.time()
+        tts = self.get_tts_engine()
+        logger.info(f"TTS engine loaded ({time.time() - start_time:.2f}s)")
+
+        if ref_audio_path is not None and ref_text:
+            warm_up_start = time.time()
+            tts.warm_up(ref_audio_path, ref_text)
+            logger.info(f"TTS engine warmed up ({time.time() - warm_up_start:.2f}s)")
+        else:
+            logger.warning("No reference sample for warm-up; engine loaded without a warm-up pass")
+
+        self._ready.set()
+
+    def start_warm_up(self, ref_audio_path: Optional[Path] = None, ref_text: Optional[str] = None) -> Thread:
+        """
+        Run warm_up() on a background thread
+
+        Failures are logged and kept in ``warm_up_error``; the service then
+        stays not ready.
+
+        Returns:
+            The warm-up thread
+        """
+        def run():
+            try:
+                self.warm_up(ref_audio_path, ref_text)
+            except Exception as e:
+                logger.error(f"TTS engine warm-up failed: {e}", exc_info=True)
+                self.warm_up_error = str(e)
+
+        thread = Thread(target=run, name="tts-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self):
+        """Stop synthesis workers and close the engine (or its processes)"""
+        self.job_queue.stop()
+        if self._parallel_executor is not None:
+            self._parallel_executor.shutdown(wait=False, cancel_futures=True)
+            self._parallel_executor = None
+        if self._tts_engine is not None:
+            self._tts_engine.close()
+            self._tts_engine = None
+
+    def estimate_cost(self, request: SynthesisRequest) -> float:
+        """
+        Estimate the scheduling cost of a request
+
+        Backbone time grows with the number of phonemes to speak, which the
+        number of non-space characters approximates well enough for
+        scheduling, plus a fixed overhead per text chunk.
+
+        Args:
+            request: Synthesis request
+
+        Returns:
+            Estimated cost in character-equivalents
+        """
+        chunks = split_text_into_chunks(request.input_text, max_tokens=request.max_tokens)
+        characters = sum(len(chunk) - chunk.count(" ") for chunk in chunks)
+        return characters + CHUNK_OVERHEAD_COST * len(chunks)
+
+    def _reference_codes(self, tts, ref_audio_path: Path):
+        """
+        Encode a reference, reusing the codes of a recently encoded unchanged file
+
+        Args:
+            tts: TTS engine
+            ref_audio_path: Reference audio or precomputed codes (``.pt``)
+
+        Returns:
+            Reference codes
+        """
+        stat = os.stat(ref_audio_path)
+        key = (str(ref_audio_path), stat.st_mtime_ns, stat.st_size)
+        with self._reference_lock:
+            if key in self._reference_cache:
+                self._reference_cache.move_to_end(key)
+                return self._reference_cache[key]
+
+        ref_codes = tts.encode_reference(ref_audio_path)
+        with self._reference_lock:
+            self._reference_cache[key] = ref_codes
+            while len(self._reference_cache) > REFERENCE_CACHE_SIZE:
+                self._reference_cache.popitem(last=False)
+        return ref_codes
+
     def synthesize(self, request: SynthesisRequest) -> SynthesisResult:
         """
         Synthesize speech from text
@@ -73,6 +282,37 @@ class TTSService:
         Args:
             request: Synthesis request with all parameters
 
+        Returns:
+            Synthesis result with output file or error
+        """
+        steps = self._synthesis_steps(request)
+        while True:
+            try:
+                next(steps)
+            except StopIteration as stop:
+                return stop.value
+
+    def _synthesis_steps(
+        self,
+        request: SynthesisRequest,
+        cancel_token: Optional[CancellationToken] = None,
+        record: Optional[JobRecord] = None
+    ) -> Generator[float, None, SynthesisResult]:
+        """
+        Synthesize speech one text chunk at a time
+
+        Yields after each chunk so the scheduler can interleave other jobs.
+        With a job record, every written chunk is journaled in the job store
+        and a recovered job continues after its last journaled chunk.
+
+        Args:
+            request: Synthesis request with all parameters
+            cancel_token: Optional token checked before each chunk and by the backbone
+            record: Stored job to journal progress to (requires a job store)
+
+        Yields:
+            Fraction of the input text synthesized so far
+
         Returns:
             Synthesis result with output file or error
         """
@@ -84,6 +324,7 @@ class TTSService:
             is_valid, error_msg = request.validate()
             if not is_valid:
                 logger.error(f"Invalid request: {error_msg}")
+                self._finish_job(record, JOB_FAILED, error_msg)
                 return SynthesisResult.error_result(session_id, error_msg)
 
             # Step 1: Initialize TTS
@@ -92,7 +333,7 @@ class TTSService:
 
             # Step 2: Encode reference
             self.session_manager.send_progress(session_id, 2, 'Encoding reference audio...', 20)
-            ref_codes = tts.encode_reference(request.ref_audio_path)
+            ref_codes = self._reference_codes(tts, request.ref_audio_path)
             logger.info(f"Reference encoded: {ref_codes.shape}")
 
             # Step 3: Split text into chunks
@@ -107,35 +348,107 @@ class TTSService:
                     35
                 )
 
-            # Step 4: Generate speech for each chunk
-            all_wavs = []
-            for i, chunk in enumerate(chunks):
-                progress = 40 + (i / total_chunks) * 40  # Progress from 40% to 80%
-                self.session_manager.send_progress(
-                    session_id, 4,
-                    f'Generating speech (chunk {i+1}/{total_chunks})...',
-                    int(progress)
+            # Output files: the master WAV plus the requested encoding are opened
+            # up front and every chunk is appended as soon as it is ready, so memory
+            # stays bounded by one decode batch regardless of document length
+            output_format = get_audio_format(request.output_format)
+            if output_format is None:
+                raise ValueError(f"Unsupported output format: {request.output_format}")
+            journaled = record is not None and self.job_store is not None
+            output_filename = (
+                record.output_file if journaled and record.output_file
+                else f"output_{session_id or generate_session_id()}.wav"
+            )
+            output_path = self.output_folder / output_filename
+            # Journaled jobs keep their partial master WAV at a fixed path to resume from
+            partial_path = output_path.with_name(f".{output_filename}.job.part") if journaled else None
+            resume_path = self._prepare_resume(record, partial_path) if journaled else None
+
+            writers = [AudioFileWriter(output_path, AUDIO_FORMATS['wav'], 24000, tmp_path=partial_path)]
+            if output_format.name != 'wav':
+                writers.append(
+                    AudioFileWriter(variant_path(output_path, output_format), output_format, 24000)
                 )
-                wav = tts.infer(chunk, ref_codes, request.ref_text, language=request.language)
-                all_wavs.append(wav)
 
-            # Step 5: Combine audio chunks
-            self.session_manager.send_progress(session_id, 5, 'Combining audio chunks...', 85)
-            if len(all_wavs) > 1:
-                final_wav = np.concatenate(all_wavs)
-            else:
-                final_wav = all_wavs[0]
+            chunks_written = 0
+            if journaled:
+                self.job_store.start(record.job_id, output_filename)
+                if resume_path is not None:
+                    # Restore the journaled chunks instead of synthesizing them again
+                    self._restore_frames(resume_path, record.frames_done, writers)
+                    resume_path.unlink(missing_ok=True)
+                    chunks_written = record.chunks_done
+                    logger.info(f"Resuming job {record.job_id} at chunk {chunks_written + 1}/{total_chunks}")
 
-            # Step 6: Save output
-            self.session_manager.send_progress(session_id, 6, 'Saving audio file...', 95)
-            output_filename = generate_timestamp_filename(prefix="output", extension="wav")
-            output_path = self.output_folder / output_filename
-            sf.write(str(output_path), final_wav, 24000)
+            def append(wav: np.ndarray):
+                nonlocal chunks_written
+                self._append_chunk(wav, writers)
+                chunks_written += 1
+                if journaled:
+                    self.job_store.record_chunk(record.job_id, chunks_written, writers[0].frames_written)
+
+            resumed_chunks = chunks_written
+            try:
+                if self._runs_in_parallel(tts, total_chunks - resumed_chunks):
+                    # Step 4 (long documents): synthesize chunks on all engine
+                    # processes at once and join them in order with crossfades.
+                    # The crossfade tail of the last journaled chunk is not
+                    # journaled, so a resumed job joins it without a fade.
+                    joiner = CrossfadeJoiner(int(24000 * self.crossfade_ms / 1000))
+                    yield from self._parallel_chunk_steps(
+                        tts, chunks, resumed_chunks, ref_codes, request, cancel_token,
+                        lambda wav: append(joiner.push(wav))
+                    )
+
+                    # Step 5: Write the end of the last chunk
+                    self.session_manager.send_progress(session_id, 5, 'Combining audio chunks...', 85)
+                    self._append_chunk(joiner.flush(), writers)
+                else:
+                    # Step 4: Generate speech for each chunk, decoding chunks in batches
+                    yield from self._sequential_chunk_steps(
+                        tts, chunks, resumed_chunks, ref_codes, request, cancel_token, append
+                    )
+
+                # Step 6: Finalize output headers and move files into place
+                self.session_manager.send_progress(session_id, 6, 'Saving audio file...', 95)
+                for writer in writers:
+                    output_path = writer.close()
+                output_filename = output_path.name
+            except GeneratorExit:
+                # The scheduler dropped the job: cancelled, or shutting down
+                cancelled = cancel_token is not None and cancel_token.cancelled
+                for writer in writers:
+                    if journaled and not cancelled and writer is writers[0]:
+                        # Keep the journaled audio; the job resumes after a restart
+                        writer.release()
+                    else:
+                        writer.abort()
+                if cancelled:
+                    self._finish_job(record, JOB_CANCELLED)
+                raise
+            except BaseException:
+                for writer in writers:
+                    writer.abort()
+                raise
+
+            if self.output_store is not None:
+                # Rename to the content address (or drop the copy of a stored output)
+                stored = self.output_store.add(
+                    writers[0].path,
+                    job_id=session_id or output_filename,
+                    output_format=output_format.name,
+                    voice=request.ref_audio_path.name,
+                    text_hash=hash_text(request.input_text),
+                    duration=writers[0].frames_written / 24000
+                )
+                output_filename = stored.filename
+                output_path = self.output_store.path_for(stored.digest, output_format)
 
             # Calculate duration
             duration_seconds = time.time() - start_time
 
             # Complete
+            self._finish_job(record, JOB_COMPLETED)
             self.session_manager.send_progress(session_id, 7, 'Complete!', 100)
             self.session_manager.send_completion(session_id, output_filename, total_chunks)
 
@@ -149,25 +462,688 @@ class TTSService:
                 duration_seconds=duration_seconds
             )
 
+        except SynthesisCancelled as e:
+            logger.info(f"Synthesis cancelled for session {session_id}: {e}")
+            self._finish_job(record, JOB_CANCELLED)
+            return SynthesisResult.error_result(session_id, 'Synthesis cancelled')
+
         except Exception as e:
             import traceback
             error_msg = f"{str(e)}\n{traceback.format_exc()}"
             logger.error(f"Synthesis error: {error_msg}")
+            self._finish_job(record, JOB_FAILED, str(e))
             self.session_manager.send_error(session_id, str(e))
 
             return SynthesisResult.error_result(session_id, str(e))
 
-    def synthesize_async(self, request: SynthesisRequest):
+    def _runs_in_parallel(self, tts, remaining_chunks: int) -> bool:
+        """Whether a text is long enough to spread over several engine processes"""
+        return (
+            self.long_document_chunks > 0
+            and remaining_chunks >= self.long_document_chunks
+            and getattr(tts, 'num_processes', 1) > 1
+        )
+
+    def _sequential_chunk_steps(
+        self,
+        tts: Union['NeuTTSAir', EngineProcessPool],
+        chunks: list[str],
+        first_chunk: int,
+        ref_codes: np.ndarray,
+        request: SynthesisRequest,
+        cancel_token: Optional[CancellationToken],
+        write: Callable[[np.ndarray], None]
+    ) -> Generator[float, None, None]:
         """
-        Start asynchronous synthesis in background thread
+        Generate chunks one at a time, decoding them in batches
+
+        Each decoded chunk is watermarked exactly once on the engine's watermark
+        worker while the backbone moves on to the next chunk. Chunks are
+        watermarked separately rather than the joined waveform, which is never
+        held in memory: every chunk is written out as soon as it is ready.
 
         Args:
+            tts: TTS engine
+            chunks: Text chunks of the request
+            first_chunk: Index of the first chunk to synthesize (earlier ones are written)
+            ref_codes: Encoded reference
             request: Synthesis request
+            cancel_token: Optional token checked before each chunk and by the backbone
+            write: Called with each chunk's audio, in order
+
+        Yields:
+            Fraction of the input text synthesized so far
         """
-        thread = Thread(target=self.synthesize, args=(request,))
-        thread.daemon = True
-        thread.start()
-        logger.info(f"Started async synthesis for session: {request.session_id}")
+        session_id = request.session_id
+        total_chunks = len(chunks)
+        pending_codes = []
+        watermarked = deque()
+        chars_done, total_chars = 0, max(1, sum(len(chunk) for chunk in chunks))
+        for i, chunk in enumerate(chunks):
+            if i < first_chunk:
+                chars_done += len(chunk)
+                continue
+            raise_if_cancelled(cancel_token)
+            progress = 40 + (i / total_chunks) * 40  # Progress from 40% to 80%
+            self.session_manager.send_progress(
+                session_id, 4,
+                f'Generating speech (chunk {i+1}/{total_chunks})...',
+                int(progress)
+            )
+            pending_codes.append(
+                tts.generate_codes(
+                    chunk, ref_codes, request.ref_text,
+                    language=request.language, cancel_token=cancel_token
+                )
+            )
+            if len(pending_codes) >= self.decode_batch_size or i == total_chunks - 1:
+                watermarked.extend(tts.watermark_async(wav) for wav in tts.decode_batch(pending_codes))
+                pending_codes = []
+
+            # Write finished chunks in order as soon as they are ready
+            while watermarked and watermarked[0].done():
+                write(watermarked.popleft().result())
+
+            chars_done += len(chunk)
+            yield chars_done / total_chars
+
+        # Step 5: Write remaining audio chunks
+        self.session_manager.send_progress(session_id, 5, 'Combining audio chunks...', 85)
+        while watermarked:
+            write(watermarked.popleft().result())
+
+    def _parallel_chunk_steps(
+        self,
+        tts: EngineProcessPool,
+        chunks: list[str],
+        first_chunk: int,
+        ref_codes: np.ndarray,
+        request: SynthesisRequest,
+        cancel_token: Optional[CancellationToken],
+        write: Callable[[np.ndarray], None]
+    ) -> Generator[float, None, None]:
+        """
+        Synthesize chunks on all engine processes at once
+
+        Every chunk is one infer() call (generation, decoding and watermarking
+        in an engine process). Up to one call per process runs at a time;
+        results arrive out of order and are written in order, with at most
+        PARALLEL_LOOKAHEAD_PER_PROCESS chunks per process buffered ahead of
+        the next one to write.
+
+        Args:
+            tts: Engine process pool
+            chunks: Text chunks of the request
+            first_chunk: Index of the first chunk to synthesize (earlier ones are written)
+            ref_codes: Encoded reference
+            request: Synthesis request
+            cancel_token: Optional token checked between chunks and by the backbone
+            write: Called with each chunk's audio, in order
+
+        Yields:
+            Fraction of the input text written so far
+        """
+        session_id = request.session_id
+        total_chunks = len(chunks)
+        parallel = tts.num_processes
+        lookahead = parallel * PARALLEL_LOOKAHEAD_PER_PROCESS
+        executor = self._get_parallel_executor(parallel)
+        total_chars = max(1, sum(len(chunk) for chunk in chunks))
+        chars_done = sum(len(chunk) for chunk in chunks[:first_chunk])
+
+        futures = {}
+        next_submit = next_write = first_chunk
+        try:
+            while next_write < total_chunks:
+                raise_if_cancelled(cancel_token)
+                running = [future for future in futures.values() if not future.done()]
+                while (
+                    next_submit < total_chunks
+                    and len(running) < parallel
+                    and next_submit - next_write < lookahead
+                ):
+                    future = executor.submit(
+                        tts.infer, chunks[next_submit], ref_codes, request.ref_text,
+                        language=request.language, cancel_token=cancel_token
+                    )
+                    futures[next_submit] = future
+                    running.append(future)
+                    next_submit += 1
+
+                if not futures[next_write].done():
+                    wait(running, return_when=FIRST_COMPLETED)
+
+                finished = next_write + sum(1 for future in futures.values() if future.done())
+                in_flight = sum(1 for future in futures.values() if not future.done())
+                self.session_manager.send_progress(
+                    session_id, 4,
+                    f'Generating speech ({finished}/{total_chunks} chunks, {in_flight} in parallel)...',
+                    int(40 + (finished / total_chunks) * 40)
+                )
+
+                # Write finished chunks in order; later ones wait in the buffer
+                while next_write in futures and futures[next_write].done():
+                    write(futures.pop(next_write).result())
+                    chars_done += len(chunks[next_write])
+                    next_write += 1
+                yield chars_done / total_chars
+        finally:
+            for future in futures.values():
+                future.cancel()
+
+    def _get_parallel_executor(self, max_workers: int) -> ThreadPoolExecutor:
+        """Threads waiting on engine process calls in long-document mode"""
+        with self._engine_lock:
+            if self._parallel_executor is None:
+                self._parallel_executor = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="tts-parallel"
+                )
+            return self._parallel_executor
+
+    def _finish_job(self, record: Optional[JobRecord], state: str, error: Optional[str] = None):
+        """Record the final state of a journaled job"""
+        if record is not None and self.job_store is not None:
+            self.job_store.finish(record.job_id, state, error)
+
+    @staticmethod
+    def _prepare_resume(record: JobRecord, partial_path: Path) -> Optional[Path]:
+        """
+        Move a recovered job's partial output aside so it can be copied back
+
+        Returns:
+            Path of the partial audio to restore, or None to start from the
+            first chunk (nothing journaled, or the partial file is missing or
+            shorter than the journal)
+        """
+        if record.chunks_done == 0 or not partial_path.exists():
+            return None
+        try:
+            frames = sf.info(str(partial_path)).frames
+        except Exception as e:
+            logger.warning(f"Unreadable partial output for job {record.job_id}: {e}")
+            frames = 0
+        if frames < record.frames_done:
+            logger.warning(f"Partial output of job {record.job_id} is incomplete, starting over")
+            partial_path.unlink(missing_ok=True)
+            return None
+
+        resume_path = partial_path.with_name(partial_path.name + ".resume")
+        os.replace(partial_path, resume_path)
+        return resume_path
+
+    @staticmethod
+    def _restore_frames(source: Path, frames: int, writers: list[AudioFileWriter], block_size: int = 65536):
+        """Copy the first ``frames`` frames of a partial output into new writers"""
+        for block in sf.blocks(str(source), blocksize=block_size, dtype='float32', frames=frames):
+            for writer in writers:
+                writer.write(block)
+        for writer in writers:
+            writer.flush()
+
+    @staticmethod
+    def _append_chunk(wav: np.ndarray, writers: list[AudioFileWriter]):
+        """Append a finished chunk to every output file and sync it to disk"""
+        for writer in writers:
+            writer.write(wav)
+            writer.flush()
+
+    def _batch_steps(
+        self,
+        batch: BatchSynthesisRequest,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Generator[float, None, SynthesisResult]:
+        """
+        Synthesize every item of a batch with one reference voice
+
+        The reference is encoded once. The text chunks of all items are
+        generated ``generation_batch_size`` at a time in a single backbone
+        pass and decoded in batched codec passes; each item is moved into
+        the output archive as soon as its last chunk is written and reported
+        over the session. An item whose generation fails is recorded as
+        failed without stopping the batch.
+
+        Args:
+            batch: Batch synthesis request
+            cancel_token: Optional token checked before each backbone pass
+
+        Yields:
+            Fraction of the batch's text chunks synthesized so far
+
+        Returns:
+            Synthesis result with the archive as output file, or error
+        """
+        start_time = time.time()
+        session_id = batch.session_id
+
+        try:
+            is_valid, error_msg = batch.validate()
+            if not is_valid:
+                logger.error(f"Invalid batch request: {error_msg}")
+                return SynthesisResult.error_result(session_id, error_msg)
+
+            output_format = get_audio_format(batch.output_format)
+            if output_format is None:
+                raise ValueError(f"Unsupported output format: {batch.output_format}")
+
+            # Step 1: Initialize TTS
+            self.session_manager.send_progress(session_id, 1, 'Initializing TTS engine...', 10)
+            tts = self.get_tts_engine()
+
+            # Step 2: Encode reference once for all items
+            self.session_manager.send_progress(session_id, 2, 'Encoding reference audio...', 20)
+            ref_codes = self._reference_codes(tts, batch.ref_audio_path)
+
+            # Step 3: Split every item into chunks
+            self.session_manager.send_progress(session_id, 3, 'Processing text...', 30)
+            items = batch.items
+            item_chunks = [
+                split_text_into_chunks(item.input_text, max_tokens=batch.max_tokens) for item in items
+            ]
+            chunks_left = [len(chunks) for chunks in item_chunks]
+
+            archive_name = f"batch_{session_id or generate_session_id()}.zip"
+            archive_path = self.output_folder / archive_name
+            manifest_path = archive_path.with_suffix('.json')
+            staging_dir = self.output_folder / f".{archive_name}.items"
+            staging_dir.mkdir(exist_ok=True)
+            archive_tmp = archive_path.with_name(f".{archive_name}.part")
+            # Audio is already compressed (or PCM that barely deflates)
+            archive = zipfile.ZipFile(archive_tmp, 'w', compression=zipfile.ZIP_STORED)
+
+            entries: list[Optional[dict]] = [None] * len(items)
+            writers: dict[int, AudioFileWriter] = {}
+            items_done = 0
+
+            def finish_item(index: int, error: Optional[str] = None):
+                nonlocal items_done
+                item = items[index]
+                entry = {'id': item.item_id, 'text': item.input_text}
+                writer = writers.pop(index, None)
+                if error is None:
+                    path = writer.close()
+                    archive.write(path, arcname=path.name)
+                    path.unlink()
+                    entry.update(
+                        status='completed',
+                        file=path.name,
+                        duration_seconds=round(writer.frames_written / 24000, 3)
+                    )
+                else:
+                    if writer is not None:
+                        writer.abort()
+                    entry.update(status='failed', error=error)
+                    logger.warning(f"Batch {session_id} item {item.item_id} failed: {error}")
+                entries[index] = entry
+                items_done += 1
+                self.session_manager.send_item_result(
+                    session_id, entry, items_done, len(items),
+                    int(40 + items_done / len(items) * 50)
+                )
+
+            # Step 4: Generate chunks of all items in batched backbone passes
+            try:
+                passes = generate_batch_passes(
+                    tts, ref_codes, batch.ref_text, item_chunks,
+                    language=batch.language,
+                    generation_batch_size=self.generation_batch_size,
+                    decode_batch_size=self.decode_batch_size,
+                    cancel_token=cancel_token
+                )
+                self.session_manager.send_progress(session_id, 4, 'Generating speech...', 40)
+                for done_fraction, events in passes:
+                    for index, wav, error in events:
+                        if error is not None:
+                            finish_item(index, error)
+                            continue
+                        writer = writers.get(index)
+                        if writer is None:
+                            writer = writers[index] = AudioFileWriter(
+                                staging_dir / f"{items[index].item_id}.{output_format.extension}",
+                                output_format, 24000
+                            )
+                        writer.write(wav)
+                        chunks_left[index] -= 1
+                        if chunks_left[index] == 0:
+                            finish_item(index)
+                    yield done_fraction
+
+                # Step 5: Write the manifest and move the archive into place
+                self.session_manager.send_progress(session_id, 5, 'Saving archive...', 95)
+                manifest = json.dumps({'session_id': session_id, 'items': entries}, indent=2)
+                archive.writestr('manifest.json', manifest)
+                archive.close()
+                os.replace(archive_tmp, archive_path)
+                manifest_path.write_text(manifest, encoding='utf-8')
+            except BaseException:
+                for writer in writers.values():
+                    writer.abort()
+                archive.close()
+                archive_tmp.unlink(missing_ok=True)
+                raise
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
+            completed = sum(1 for entry in entries if entry['status'] == 'completed')
+            duration_seconds = time.time() - start_time
+            self.session_manager.send_batch_completion(
+                session_id, archive_name, manifest_path.name, completed, len(items) - completed
+            )
+            logger.info(
+                f"Batch complete: {archive_name} ({completed}/{len(items)} items, {duration_seconds:.2f}s)"
+            )
+
+            return SynthesisResult.success_result(
+                session_id=session_id,
+                output_file=archive_name,
+                output_path=archive_path,
+                chunks_processed=sum(len(chunks) for chunks in item_chunks),
+                duration_seconds=duration_seconds
+            )
+
+        except SynthesisCancelled as e:
+            logger.info(f"Batch cancelled for session {session_id}: {e}")
+            return SynthesisResult.error_result(session_id, 'Synthesis cancelled')
+
+        except Exception as e:
+            logger.error(f"Batch synthesis error: {e}", exc_info=True)
+            self.session_manager.send_error(session_id, str(e))
+            return SynthesisResult.error_result(session_id, str(e))
+
+    def synthesize_stream(
+        self,
+        request: SynthesisRequest,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Generator[np.ndarray, None, None]:
+        """
+        Synthesize speech, yielding audio as soon as it is generated
+
+        Uses the engine's streaming inference when available and falls back
+        to yielding each text chunk's waveform as it completes.
+
+        Args:
+            request: Synthesis request with all parameters
+            cancel_token: Optional token checked before each chunk and by the backbone
+
+        Yields:
+            Watermarked audio chunks at 24 kHz
+
+        Raises:
+            ValueError: If the request is invalid
+        """
+        is_valid, error_msg = request.validate()
+        if not is_valid:
+            raise ValueError(error_msg)
+
+        tts = self.get_tts_engine()
+        ref_codes = self._reference_codes(tts, request.ref_audio_path)
+        chunks = split_text_into_chunks(request.input_text, max_tokens=request.max_tokens)
+        logger.info(f"Streaming synthesis of {len(chunks)} chunk(s)")
+
+        for chunk in chunks:
+            raise_if_cancelled(cancel_token)
+            if tts.supports_streaming:
+                yield from tts.infer_stream(
+                    chunk, ref_codes, request.ref_text,
+                    language=request.language, cancel_token=cancel_token
+                )
+            else:
+                yield tts.infer(
+                    chunk, ref_codes, request.ref_text,
+                    language=request.language, cancel_token=cancel_token
+                )
+
+    def synthesize_stream_async(
+        self,
+        request: SynthesisRequest,
+        priority: str = 'interactive',
+        job_id: Optional[str] = None
+    ) -> Generator[np.ndarray, None, None]:
+        """
+        Queue streaming synthesis and return a generator over its audio chunks
+
+        The synthesis runs on a queue worker; chunks are handed over as they
+        are produced and worker errors are re-raised in the consumer. Closing
+        the generator early (client disconnect) cancels the job.
+
+        Args:
+            request: Synthesis request
+            priority: Scheduling class (see PRIORITY_CLASSES)
+            job_id: Job identifier for cancel(); generated if omitted
+
+        Returns:
+            Generator yielding audio chunks
+
+        Raises:
+            QueueFullError: If the synthesis queue is full
+        """
+        chunks: Queue = Queue()
+        cancel_token = self._submit_stream(request, priority, job_id, chunks.put)
+        return self._drain_stream(chunks, cancel_token)
+
+    def synthesize_stream_aiter(
+        self,
+        request: SynthesisRequest,
+        loop: asyncio.AbstractEventLoop,
+        priority: str = 'interactive',
+        job_id: Optional[str] = None
+    ) -> AsyncGenerator[np.ndarray, None]:
+        """
+        Queue streaming synthesis and return an async generator over its audio
+
+        Like synthesize_stream_async, but chunks are handed to ``loop`` so an
+        async server can wait for them without holding a thread.
+
+        Args:
+            request: Synthesis request
+            loop: Event loop the returned generator is consumed on
+            priority: Scheduling class (see PRIORITY_CLASSES)
+            job_id: Job identifier for cancel(); generated if omitted
+
+        Returns:
+            Async generator yielding audio chunks
+
+        Raises:
+            QueueFullError: If the synthesis queue is full
+        """
+        chunks: asyncio.Queue = asyncio.Queue()
+        cancel_token = self._submit_stream(
+            request, priority, job_id,
+            lambda item: loop.call_soon_threadsafe(chunks.put_nowait, item)
+        )
+        return self._adrain_stream(chunks, cancel_token)
+
+    def _submit_stream(
+        self,
+        request: SynthesisRequest,
+        priority: str,
+        job_id: Optional[str],
+        put: Callable[[object], None]
+    ) -> CancellationToken:
+        """
+        Queue a streaming job that hands its output to ``put``
+
+        Audio chunks are followed by _STREAM_END, or by the exception that
+        ended the job.
+
+        The job runs to completion on its worker instead of stepping: a
+        suspended stream would keep its engine process checked out, or leave
+        the in-process backbone's generation (and its KV cache) half done
+        while other jobs use it.
+
+        Returns:
+            The job's cancellation token
+        """
+        cancel_token = CancellationToken()
+
+        def run():
+            try:
+                for wav in self.synthesize_stream(request, cancel_token=cancel_token):
+                    put(wav)
+                put(_STREAM_END)
+            except Exception as e:
+                put(e)
+
+        self.job_queue.submit(Job(
+            job_id=job_id or request.session_id or generate_session_id(),
+            run=run,
+            session_id=request.session_id,
+            priority=PRIORITY_CLASSES[priority],
+            cost=self.estimate_cost(request),
+            cancel_token=cancel_token
+        ))
+        return cancel_token
+
+    @staticmethod
+    def _drain_stream(
+        chunks: Queue,
+        cancel_token: CancellationToken
+    ) -> Generator[np.ndarray, None, None]:
+        """Yield chunks handed over by a streaming job until it ends"""
+        try:
+            while True:
+                item = chunks.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # No-op once the job has finished; stops it if the consumer went away
+            cancel_token.cancel("stream consumer disconnected")
+
+    @staticmethod
+    async def _adrain_stream(
+        chunks: asyncio.Queue,
+        cancel_token: CancellationToken
+    ) -> AsyncGenerator[np.ndarray, None]:
+        """Async variant of _drain_stream"""
+        try:
+            while True:
+                item = await chunks.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancel_token.cancel("stream consumer disconnected")
+
+    def synthesize_async(self, request: SynthesisRequest, priority: str = 'interactive') -> int:
+        """
+        Queue synthesis to run on a synthesis worker
+
+        Args:
+            request: Synthesis request
+            priority: Scheduling class (see PRIORITY_CLASSES)
+
+        Returns:
+            1-based position in the synthesis queue
+
+        Raises:
+            QueueFullError: If the synthesis queue is full
+        """
+        record = None
+        if self.job_store is not None:
+            record = self.job_store.add(request.session_id, request, priority)
+        try:
+            position = self._submit_file_job(request, priority, record)
+        except QueueFullError:
+            if record is not None:
+                self.job_store.delete(record.job_id)
+            raise
+        logger.info(f"Queued async synthesis for session: {request.session_id}")
+        return position
+
+    def synthesize_batch_async(self, batch: BatchSynthesisRequest, priority: str = 'batch') -> int:
+        """
+        Queue a batch of texts to run on a synthesis worker
+
+        The whole batch is one job that yields between backbone passes, so
+        interactive requests still interleave with it. Batch jobs are not
+        journaled for restart recovery.
+
+        Args:
+            batch: Batch synthesis request
+            priority: Scheduling class (see PRIORITY_CLASSES)
+
+        Returns:
+            1-based position in the synthesis queue
+
+        Raises:
+            QueueFullError: If the synthesis queue is full
+        """
+        cancel_token = CancellationToken()
+        position = self.job_queue.submit(Job(
+            job_id=batch.session_id,
+            run=lambda: self._batch_steps(batch, cancel_token),
+            session_id=batch.session_id,
+            priority=PRIORITY_CLASSES[priority],
+            cost=sum(self.estimate_cost(batch.item_request(item)) for item in batch.items),
+            cancel_token=cancel_token
+        ))
+        logger.info(f"Queued batch of {len(batch.items)} items for session: {batch.session_id}")
+        return position
+
+    def _submit_file_job(self, request: SynthesisRequest, priority: str, record: Optional[JobRecord]) -> int:
+        """Queue a file synthesis job, journaled to the job store if a record is given"""
+        cancel_token = CancellationToken()
+        return self.job_queue.submit(Job(
+            job_id=request.session_id,
+            run=lambda: self._synthesis_steps(request, cancel_token, record),
+            session_id=request.session_id,
+            priority=PRIORITY_CLASSES[priority],
+            cost=self.estimate_cost(request),
+            cancel_token=cancel_token
+        ))
+
+    def recover_jobs(self) -> int:
+        """
+        Requeue file synthesis jobs left unfinished by a process that died
+
+        Each job gets its session back, so a client reconnecting to its
+        progress stream follows the resumed job, and continues after its
+        last journaled chunk.
+
+        Returns:
+            Number of jobs requeued
+        """
+        if self.job_store is None:
+            return 0
+
+        self.job_store.prune(time.time() - FINISHED_JOB_RETENTION_SECONDS)
+
+        recovered = 0
+        for record in self.job_store.claim_orphaned():
+            request = record.request
+            if not self.session_manager.has_session(record.job_id):
+                self.session_manager.create_session(record.job_id)
+            try:
+                self._submit_file_job(request, record.priority, record)
+            except QueueFullError:
+                logger.warning(f"Queue full, could not recover job {record.job_id}")
+                self.job_store.finish(record.job_id, JOB_FAILED, 'Queue full during recovery')
+                self.session_manager.send_error(record.job_id, 'Synthesis was interrupted, please retry')
+                continue
+            recovered += 1
+            logger.info(f"Recovered job {record.job_id} ({record.chunks_done} chunk(s) already written)")
+        return recovered
+
+    def cancel(self, job_id: str, reason: str = "cancelled") -> bool:
+        """
+        Cancel a queued or running synthesis job
+
+        Args:
+            job_id: Job identifier (the session ID for file synthesis)
+            reason: Why the job was cancelled (for logs)
+
+        Returns:
+            True if the job was found, False if unknown or already finished
+        """
+        found = self.job_queue.cancel(job_id, reason)
+        if found and self.job_store is not None:
+            # Waiting jobs never run again, so they cannot record this themselves
+            self.job_store.finish(job_id, JOB_CANCELLED)
+        return found
 
 
 # Global TTS service instance
@@ -194,3 +1170,16 @@ def get_tts_service(
     if _tts_service is None:
         _tts_service = TTSService(session_manager, output_folder, **kwargs)
     return _tts_service
+
+
+def active_synthesis_jobs() -> list[str]:
+    """IDs of the jobs waiting or running in the global TTS service"""
+    if _tts_service is None:
+        return []
+    return _tts_service.job_queue.active_job_ids()
+
+
+def shutdown_tts_service():
+    """Shut down the global TTS service, if it was created"""
+    if _tts_service is not None:
+        _tts_service.shutdown()
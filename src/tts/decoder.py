@@ -3,6 +3,7 @@ Speech Token Decoder
 Decodes neural codec tokens back to audio
 """
 import re
+from typing import Optional
 import torch
 import numpy as np
 from src.config.logging_config import get_logger
@@ -37,57 +38,124 @@ class SpeechDecoder:
         Raises:
             ValueError: If no valid speech tokens found
         """
-        # Extract speech token IDs using regex
-        speech_ids = [int(num) for num in re.findall(r"<\|speech_(\d+)\|>", token_string)]
+        speech_ids = self.parse_codes(token_string)
 
         if len(speech_ids) == 0:
             raise ValueError("No valid speech tokens found in the output.")
 
         logger.debug(f"Decoding {len(speech_ids)} speech tokens")
 
+        audio = self.decode_tokens(speech_ids)
+        logger.debug(f"Decoded to {len(audio)} audio samples")
+        return audio
+
+    @staticmethod
+    def parse_codes(token_string: str) -> list[int]:
+        """
+        Extract codec codes from a generated token string
+
+        Args:
+            token_string: String containing speech tokens (e.g., "<|speech_0|><|speech_1|>...")
+
+        Returns:
+            List of codec codes (may be empty)
+        """
+        return [int(num) for num in re.findall(r"<\|speech_(\d+)\|>", token_string)]
+
+    def _decode_codes(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Run the codec decoder on a code array
+
+        Args:
+            codes: Integer codes of shape [B, 1, T]
+
+        Returns:
+            Audio of shape [B, 1, S]
+        """
         # ONNX decode
         if self.is_onnx:
-            codes = np.array(speech_ids, dtype=np.int32)[np.newaxis, np.newaxis, :]
-            recon = self.codec.decode_code(codes)
+            return self.codec.decode_code(codes.astype(np.int32, copy=False))
 
         # Torch decode
-        else:
-            with torch.no_grad():
-                codes = torch.tensor(speech_ids, dtype=torch.long)[None, None, :].to(
-                    self.codec.device
-                )
-                recon = self.codec.decode_code(codes).cpu().numpy()
-
-        audio = recon[0, 0, :]
-        logger.debug(f"Decoded to {len(audio)} audio samples")
-        return audio
+        with torch.no_grad():
+            codes = torch.as_tensor(codes, dtype=torch.long).to(self.codec.device)
+            return self.codec.decode_code(codes).cpu().numpy()
 
-    def decode_tokens(self, token_ids: list[int]) -> np.ndarray:
+    def decode_tokens(self, token_ids: list[int] | np.ndarray) -> np.ndarray:
         """
         Decode token IDs directly to audio
 
         Args:
-            token_ids: List of token IDs
+            token_ids: List or 1-D array of codec token IDs
 
         Returns:
             Audio waveform as numpy array
         """
-        if not token_ids:
+        if len(token_ids) == 0:
             raise ValueError("No token IDs provided")
 
         logger.debug(f"Decoding {len(token_ids)} token IDs")
 
-        # ONNX decode
-        if self.is_onnx:
-            codes = np.array(token_ids, dtype=np.int32)[np.newaxis, np.newaxis, :]
-            recon = self.codec.decode_code(codes)
+        codes = np.asarray(token_ids, dtype=np.int64)[np.newaxis, np.newaxis, :]
+        return self._decode_codes(codes)[0, 0, :]
 
-        # Torch decode
-        else:
-            with torch.no_grad():
-                codes = torch.tensor(token_ids, dtype=torch.long)[None, None, :].to(
-                    self.codec.device
-                )
-                recon = self.codec.decode_code(codes).cpu().numpy()
-
-        return recon[0, 0, :]
+    def decode_batch(
+        self,
+        code_sequences: list[list[int] | np.ndarray],
+        max_batch_size: int = 8,
+        max_pad_ratio: float = 0.1
+    ) -> list[np.ndarray]:
+        """
+        Decode several code sequences with as few codec forward passes as possible
+
+        Sequences are sorted by length and grouped into buckets whose lengths
+        differ by at most ``max_pad_ratio``; each bucket is padded (by repeating
+        the last code) to a common length, decoded in a single batch, and every
+        waveform is sliced back to its true length. The codec sees the padded
+        frames, so keeping buckets tight keeps results close to unbatched decoding.
+
+        Args:
+            code_sequences: Codec code sequences, one per chunk
+            max_batch_size: Maximum number of sequences per forward pass
+            max_pad_ratio: Maximum padding relative to the shortest sequence in a bucket
+
+        Returns:
+            Audio waveforms in the same order as ``code_sequences``
+
+        Raises:
+            ValueError: If any sequence is empty
+        """
+        sequences = [np.asarray(seq, dtype=np.int64).reshape(-1) for seq in code_sequences]
+        if any(len(seq) == 0 for seq in sequences):
+            raise ValueError("No token IDs provided")
+
+        order = sorted(range(len(sequences)), key=lambda i: len(sequences[i]))
+        buckets: list[list[int]] = []
+        for i in order:
+            bucket = buckets[-1] if buckets else None
+            if (
+                bucket is None
+                or len(bucket) >= max_batch_size
+                or len(sequences[i]) > len(sequences[bucket[0]]) * (1 + max_pad_ratio)
+            ):
+                buckets.append([i])
+            else:
+                bucket.append(i)
+
+        results: list[Optional[np.ndarray]] = [None] * len(sequences)
+        for bucket in buckets:
+            max_len = len(sequences[bucket[-1]])
+            codes = np.empty((len(bucket), 1, max_len), dtype=np.int64)
+            for row, i in enumerate(bucket):
+                seq = sequences[i]
+                codes[row, 0, :len(seq)] = seq
+                codes[row, 0, len(seq):] = seq[-1]
+
+            logger.debug(f"Decoding batch of {len(bucket)} sequences padded to {max_len} tokens")
+            recon = self._decode_codes(codes)
+            samples_per_frame = recon.shape[-1] // max_len
+
+            for row, i in enumerate(bucket):
+                results[i] = recon[row, 0, :len(sequences[i]) * samples_per_frame].copy()
+
+        return results
@@ -2,22 +2,37 @@
 NeuTTS-Air TTS Engine
 Main orchestrator for text-to-speech synthesis
 """
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Generator, Optional
 import torch
 import numpy as np
 import perth
-from neucodec import NeuCodec, DistillNeuCodec
 
 from src.tts.phonemizer import Phonemizer
 from src.tts.encoder import ReferenceEncoder
 from src.tts.decoder import SpeechDecoder
 from src.tts.inference import TorchInference, GGMLInference
 from src.tts.streaming import StreamingProcessor
+from src.tts import weights
+from src.utils.cancellation import CancellationToken
 from src.config.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# transformers builds models under init_empty_weights() and no_init_weights(),
+# which patch nn.Module and torch.nn.init for the whole process: a module
+# constructed on another thread meanwhile would get meta-device or
+# uninitialized parameters. Torch modules are therefore constructed one at a
+# time; downloads and weight reads happen outside the lock.
+_MODEL_CONSTRUCTION_LOCK = threading.Lock()
+
+# Codec repos NeuTTSAir can load
+_CODEC_REPOS = ("neuphonic/neucodec", "neuphonic/distill-neucodec", "neuphonic/neucodec-onnx-decoder")
+
 
 class NeuTTSAir:
     """
@@ -31,15 +46,24 @@ class NeuTTSAir:
         backbone_device: str = "cpu",
         codec_repo: str = "neuphonic/neucodec",
         codec_device: str = "cpu",
+        weights_cache_dir: Optional[str | Path] = None,
     ):
         """
         Initialize TTS engine
 
+        The backbone, codec and watermarker load on concurrent threads, but
+        torch modules are constructed one at a time. Per-component load times
+        are logged and kept in ``load_timings``, along with the part of each
+        spent waiting for another component's construction
+        (``<component>_lock_wait``).
+
         Args:
             backbone_repo: HuggingFace repo or GGUF file path for backbone model
             backbone_device: Device for backbone (cpu/cuda)
             codec_repo: HuggingFace repo for codec
             codec_device: Device for codec (cpu/cuda)
+            weights_cache_dir: Local pre-converted weight cache (see
+                src.tts.weights); cached models load without Hub resolution
         """
         # Configuration
         self.sample_rate = 24_000
@@ -63,19 +87,31 @@ class NeuTTSAir:
         # Initialize phonemizers cache
         self.phonemizers = {}
 
-        # Load backbone model
-        self._load_backbone(backbone_repo, backbone_device)
-
-        # Load codec
-        self._load_codec(codec_repo, codec_device)
+        # Load backbone, codec and watermarker concurrently: a GGUF backbone
+        # loads in native code alongside the torch models (see
+        # _MODEL_CONSTRUCTION_LOCK)
+        self._weights_cache_dir = weights_cache_dir
+        self.load_timings: dict[str, float] = {}
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="engine-load") as executor:
+            loads = [
+                executor.submit(self._timed_load, "backbone", self._load_backbone, backbone_repo, backbone_device),
+                executor.submit(self._timed_load, "codec", self._load_codec, codec_repo, codec_device),
+                executor.submit(self._timed_load, "watermarker", self._load_watermarker),
+            ]
+            for load in loads:
+                load.result()
+        self.load_timings["total"] = time.perf_counter() - start_time
+        logger.info(
+            "Engine startup: "
+            + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.load_timings.items())
+        )
 
         # Initialize encoder and decoder
         self.encoder = ReferenceEncoder(self.codec, sample_rate=16000)
         self.decoder = SpeechDecoder(self.codec, is_onnx=self._is_onnx_codec)
 
-        # Load watermarker
-        logger.info("Loading audio watermarker")
-        self.watermarker = perth.PerthImplicitWatermarker()
+        self._watermark_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="watermark")
 
         # Initialize streaming processor
         self.streaming_processor = StreamingProcessor(
@@ -91,6 +127,11 @@ class NeuTTSAir:
 
         logger.info("NeuTTS-Air engine initialized successfully")
 
+    @property
+    def supports_streaming(self) -> bool:
+        """Whether infer_stream is available for the loaded backbone"""
+        return self._is_quantized_model
+
     def get_phonemizer(self, language: str) -> Phonemizer:
         """Get or create phonemizer for specific language"""
         if language not in self.phonemizers:
@@ -98,6 +139,27 @@ class NeuTTSAir:
             self.phonemizers[language] = Phonemizer(language=language)
         return self.phonemizers[language]
 
+    def _timed_load(self, name: str, load, *args):
+        """Run a component loader and record how long it took"""
+        start_time = time.perf_counter()
+        load(*args)
+        self.load_timings[name] = time.perf_counter() - start_time
+
+    @contextmanager
+    def _constructing(self, name: str):
+        """Hold _MODEL_CONSTRUCTION_LOCK, recording the wait for it in load_timings"""
+        start_time = time.perf_counter()
+        with _MODEL_CONSTRUCTION_LOCK:
+            self.load_timings[f"{name}_lock_wait"] = time.perf_counter() - start_time
+            yield
+
+    def _load_watermarker(self):
+        """Load the audio watermarker"""
+        logger.info("Loading audio watermarker")
+        # Its weights are a small checkpoint shipped with the package
+        with self._constructing("watermarker"):
+            self.watermarker = perth.PerthImplicitWatermarker()
+
     def _load_backbone(self, backbone_repo: str, backbone_device: str):
         """Load backbone model (transformer or GGUF)"""
         logger.info(f"Loading backbone from: {backbone_repo} on {backbone_device}")
@@ -113,26 +175,52 @@ class NeuTTSAir:
                     "    pip install llama-cpp-python"
                 ) from e
 
-            self.backbone = Llama.from_pretrained(
-                repo_id=backbone_repo,
-                filename="*.gguf",
+            llama_kwargs = dict(
                 verbose=False,
                 n_gpu_layers=-1 if backbone_device == "gpu" else 0,
                 n_ctx=self.max_context,
                 mlock=True,
                 flash_attn=True if backbone_device == "gpu" else False,
             )
+            cached = weights.find_backbone(self._weights_cache_dir, backbone_repo)
+            if cached is not None:
+                logger.info(f"Using cached backbone weights: {cached}")
+                self.backbone = Llama(model_path=str(cached), **llama_kwargs)
+            else:
+                self.backbone = Llama.from_pretrained(
+                    repo_id=backbone_repo,
+                    filename="*.gguf",
+                    **llama_kwargs
+                )
             self._is_quantized_model = True
             self.inference_engine = GGMLInference(self.backbone, self.max_context)
             self.tokenizer = None
 
         else:
-            from transformers import AutoTokenizer, AutoModelForCausalLM
-
-            self.tokenizer = AutoTokenizer.from_pretrained(backbone_repo)
-            self.backbone = AutoModelForCausalLM.from_pretrained(backbone_repo).to(
-                torch.device(backbone_device)
-            )
+            from transformers import AutoConfig, AutoTokenizer, AutoModelForCausalLM
+            from transformers.modeling_utils import no_init_weights
+
+            source = weights.find_backbone(self._weights_cache_dir, backbone_repo)
+            if source is not None:
+                logger.info(f"Using cached backbone weights: {source}")
+            else:
+                source = weights.download_backbone(backbone_repo)
+
+            self.tokenizer = AutoTokenizer.from_pretrained(source)
+            config = AutoConfig.from_pretrained(source)
+            state_dict = weights.read_backbone_weights(source)
+            # The modules are allocated without the random initialization the
+            # checkpoint overwrites anyway
+            with self._constructing("backbone"), no_init_weights():
+                backbone = AutoModelForCausalLM.from_config(config)
+            loaded = backbone.load_state_dict(state_dict, strict=False)
+            del state_dict
+            backbone.tie_weights()
+            tied = set(backbone._tied_weights_keys or ()) if config.tie_word_embeddings else set()
+            missing = set(loaded.missing_keys) - tied
+            if missing:
+                raise ValueError(f"Backbone weights in {source} are missing: {sorted(missing)}")
+            self.backbone = backbone.eval().to(torch.device(backbone_device))
             self.inference_engine = TorchInference(
                 self.backbone, self.tokenizer, self.max_context
             )
@@ -141,67 +229,86 @@ class NeuTTSAir:
         """Load neural codec model"""
         logger.info(f"Loading codec from: {codec_repo} on {codec_device}")
 
-        match codec_repo:
-            case "neuphonic/neucodec":
-                self.codec = NeuCodec.from_pretrained(codec_repo)
-                self.codec.eval().to(codec_device)
-
-            case "neuphonic/distill-neucodec":
-                self.codec = DistillNeuCodec.from_pretrained(codec_repo)
-                self.codec.eval().to(codec_device)
-
-            case "neuphonic/neucodec-onnx-decoder":
-                if codec_device != "cpu":
-                    raise ValueError("ONNX decoder only currently runs on CPU.")
-
-                try:
-                    from neucodec import NeuCodecOnnxDecoder
-                except ImportError as e:
-                    raise ImportError(
-                        "Failed to import the onnx decoder."
-                        " Ensure you have onnxruntime installed as well as neucodec >= 0.0.4."
-                    ) from e
-
-                self.codec = NeuCodecOnnxDecoder.from_pretrained(codec_repo)
-                self._is_onnx_codec = True
-
-            case _:
-                raise ValueError(
-                    "Invalid codec repo! Must be one of:"
-                    " 'neuphonic/neucodec', 'neuphonic/distill-neucodec',"
-                    " 'neuphonic/neucodec-onnx-decoder'."
-                )
+        if codec_repo not in _CODEC_REPOS:
+            raise ValueError(
+                "Invalid codec repo! Must be one of:"
+                " 'neuphonic/neucodec', 'neuphonic/distill-neucodec',"
+                " 'neuphonic/neucodec-onnx-decoder'."
+            )
+
+        if codec_repo == "neuphonic/neucodec-onnx-decoder":
+            if codec_device != "cpu":
+                raise ValueError("ONNX decoder only currently runs on CPU.")
+
+            try:
+                from neucodec import NeuCodecOnnxDecoder
+            except ImportError as e:
+                raise ImportError(
+                    "Failed to import the onnx decoder."
+                    " Ensure you have onnxruntime installed as well as neucodec >= 0.0.4."
+                ) from e
+
+            # An ONNX Runtime session, no torch modules
+            self.codec = NeuCodecOnnxDecoder.from_pretrained(codec_repo)
+            self._is_onnx_codec = True
+            return
+
+        cached = weights.find_codec(self._weights_cache_dir, codec_repo)
+        if cached is not None:
+            logger.info(f"Using cached codec weights: {cached}")
+        else:
+            state_dict = weights.read_codec_checkpoint(codec_repo, weights.download_codec(codec_repo))
+
+        # The codec builds its own torch (and transformers) modules
+        with self._constructing("codec"):
+            codec = weights.build_codec(codec_repo)
+
+        if cached is not None:
+            weights.load_codec_weights(codec, cached)
+        else:
+            # As in neucodec's from_pretrained, the checkpoints hold unused entries
+            codec.load_state_dict(state_dict, strict=False)
+        self.codec = codec.eval().to(codec_device)
 
     def encode_reference(self, ref_audio_path: str | Path) -> np.ndarray | torch.Tensor:
         """
         Encode reference audio
 
         Args:
-            ref_audio_path: Path to reference audio file
+            ref_audio_path: Path to reference audio file, or to precomputed
+                reference codes (``.pt``), which are loaded instead
 
         Returns:
             Encoded reference codes
         """
+        if Path(ref_audio_path).suffix == '.pt':
+            return torch.load(ref_audio_path, weights_only=True)
         return self.encoder.encode(ref_audio_path)
 
-    def infer(
+    def generate_codes(
         self,
         text: str,
         ref_codes: np.ndarray | torch.Tensor,
         ref_text: str,
-        language: str = "en-us"
-    ) -> np.ndarray:
+        language: str = "en-us",
+        cancel_token: Optional[CancellationToken] = None
+    ) -> list[int]:
         """
-        Perform inference to generate speech from text
+        Run the backbone to generate codec codes for text, without decoding
 
         Args:
             text: Input text to be converted to speech
             ref_codes: Encoded reference audio
             ref_text: Reference text for reference audio
             language: Language code for phonemization (default: en-us)
+            cancel_token: Optional token that stops generation early
 
         Returns:
-            Generated speech waveform
+            Generated codec codes
+
+        Raises:
+            ValueError: If no valid speech tokens were generated
+            SynthesisCancelled: If the token was cancelled during generation
         """
         logger.info(f"Running TTS inference for text: '{text[:50]}...' in {language}")
 
@@ -214,18 +321,143 @@ class NeuTTSAir:
 
         # Generate tokens
         if self._is_quantized_model:
-            output_str = self.inference_engine.infer(ref_codes, ref_text_phones, input_text_phones)
+            output_str = self.inference_engine.infer(
+                ref_codes, ref_text_phones, input_text_phones, cancel_token=cancel_token
+            )
         else:
             prompt_ids = self.inference_engine.apply_chat_template(
                 ref_codes, ref_text_phones, input_text_phones
             )
-            output_str = self.inference_engine.infer(prompt_ids)
+            output_str = self.inference_engine.infer(prompt_ids, cancel_token=cancel_token)
+
+        codes = self.decoder.parse_codes(output_str)
+        if len(codes) == 0:
+            raise ValueError("No valid speech tokens found in the output.")
+        return codes
+
+    def generate_codes_batch(
+        self,
+        texts: list[str],
+        ref_codes: np.ndarray | torch.Tensor,
+        ref_text: str,
+        language: str = "en-us",
+        cancel_token: Optional[CancellationToken] = None
+    ) -> list[list[int]]:
+        """
+        Run the backbone once for several texts spoken by the same voice
+
+        The torch backend generates all texts in a single padded batch; the
+        GGML backend runs them one after another with a shared voice prompt.
+
+        Args:
+            texts: Input texts to be converted to speech
+            ref_codes: Encoded reference audio
+            ref_text: Reference text for reference audio
+            language: Language code for phonemization (default: en-us)
+            cancel_token: Optional token that stops generation early
+
+        Returns:
+            Generated codec codes per text, in order; empty for a text that
+            produced no valid speech tokens
+
+        Raises:
+            SynthesisCancelled: If the token was cancelled during generation
+        """
+        logger.info(f"Running batched TTS inference for {len(texts)} texts in {language}")
+
+        phonemizer = self.get_phonemizer(language)
+        ref_text_phones = phonemizer.phonemize(ref_text)
+        input_text_phones = [phonemizer.phonemize(text) for text in texts]
+
+        if self._is_quantized_model:
+            output_strs = self.inference_engine.infer_batch(
+                ref_codes, ref_text_phones, input_text_phones, cancel_token=cancel_token
+            )
+        else:
+            prompts = [
+                self.inference_engine.apply_chat_template(ref_codes, ref_text_phones, phones)
+                for phones in input_text_phones
+            ]
+            output_strs = self.inference_engine.infer_batch(prompts, cancel_token=cancel_token)
+
+        return [self.decoder.parse_codes(output_str) for output_str in output_strs]
+
+    def decode_batch(self, code_sequences: list[list[int]]) -> list[np.ndarray]:
+        """
+        Decode several chunks' codes in batched codec passes
+
+        The waveforms are not watermarked; callers watermark each one with
+        watermark() or watermark_async() before writing it out.
+
+        Args:
+            code_sequences: Codec codes per chunk, as returned by generate_codes
+
+        Returns:
+            Waveforms in the same order as ``code_sequences``
+        """
+        return self.decoder.decode_batch(code_sequences)
+
+    def watermark(self, wav: np.ndarray) -> np.ndarray:
+        """
+        Apply the audio watermark to a waveform
+
+        Args:
+            wav: Audio waveform at the engine sample rate
+
+        Returns:
+            Watermarked waveform
+        """
+        return self.watermarker.apply_watermark(wav, sample_rate=self.sample_rate)
+
+    def watermark_async(self, wav: np.ndarray) -> Future:
+        """
+        Watermark a waveform on the dedicated watermark worker thread
+
+        Lets the calling thread hand off the final waveform without holding
+        up backbone generation for other jobs.
+
+        Args:
+            wav: Audio waveform at the engine sample rate
+
+        Returns:
+            Future resolving to the watermarked waveform
+        """
+        return self._watermark_executor.submit(self.watermark, wav)
+
+    def close(self):
+        """Stop the watermark worker thread once pending waveforms are done"""
+        self._watermark_executor.shutdown(wait=True)
+
+    def infer(
+        self,
+        text: str,
+        ref_codes: np.ndarray | torch.Tensor,
+        ref_text: str,
+        language: str = "en-us",
+        cancel_token: Optional[CancellationToken] = None
+    ) -> np.ndarray:
+        """
+        Perform inference to generate speech from text
+
+        Args:
+            text: Input text to be converted to speech
+            ref_codes: Encoded reference audio
+            ref_text: Reference text for reference audio
+            language: Language code for phonemization (default: en-us)
+            cancel_token: Optional token that stops generation early
+
+        Returns:
+            Generated speech waveform
+        """
+        codes = self.generate_codes(
+            text, ref_codes, ref_text, language=language, cancel_token=cancel_token
+        )
 
         # Decode to audio
-        wav = self.decoder.decode(output_str)
+        wav = self.decoder.decode_tokens(codes)
 
         # Apply watermark
-        watermarked_wav = self.watermarker.apply_watermark(wav, sample_rate=self.sample_rate)
+        watermarked_wav = self.watermark(wav)
 
         logger.info(f"Generated {len(watermarked_wav)} audio samples")
         return watermarked_wav
@@ -235,7 +467,8 @@ class NeuTTSAir:
         text: str,
         ref_codes: np.ndarray | torch.Tensor,
         ref_text: str,
-        language: str = "en-us"
+        language: str = "en-us",
+        cancel_token: Optional[CancellationToken] = None
     ) -> Generator[np.ndarray, None, None]:
         """
         Perform streaming inference to generate speech
@@ -245,6 +478,7 @@ class NeuTTSAir:
             ref_codes: Encoded reference audio
             ref_text: Reference text for reference audio
             language: Language code for phonemization (default: en-us)
+            cancel_token: Optional token that stops generation early
 
         Yields:
             Audio chunks as numpy arrays
@@ -261,10 +495,43 @@ class NeuTTSAir:
         ref_text_phones = phonemizer.phonemize(ref_text)
         input_text_phones = phonemizer.phonemize(text)
 
-        # Get streaming token generator
-        token_generator = self.inference_engine.infer_stream(
-            ref_codes, ref_text_phones, input_text_phones
+        # Get streaming codec code generator
+        code_generator = self.inference_engine.infer_stream(
+            ref_codes, ref_text_phones, input_text_phones, cancel_token=cancel_token
         )
 
         # Process stream
-        yield from self.streaming_processor.process_stream(token_generator, ref_codes)
+        yield from self.streaming_processor.process_stream(code_generator, ref_codes)
+
+    def warm_up(
+        self,
+        ref_audio_path: str | Path,
+        ref_text: str,
+        text: str = "Hello, this is a warm-up.",
+        language: str = "en-us"
+    ):
+        """
+        Run one short synthesis through every code path used in serving
+
+        Loads the phonemizer and triggers lazy initialization and kernel
+        selection in the encoder, backbone, codec (single and batched
+        decode), watermarker and, for GGUF backbones, the streaming path, so
+        the first real request does not pay for them.
+
+        Args:
+            ref_audio_path: Reference audio file
+            ref_text: Transcript of the reference audio
+            text: Text to synthesize
+            language: Language code for phonemization
+        """
+        ref_codes = self.encode_reference(ref_audio_path)
+        codes = self.generate_codes(text, ref_codes, ref_text, language=language)
+
+        # Two sequences of different length also exercise batch padding
+        wavs = self.decode_batch([codes, codes[:max(1, len(codes) // 2)]])
+        self.watermark_async(wavs[0]).result()
+        self.watermark(self.decoder.decode_tokens(codes))
+
+        if self.supports_streaming:
+            for _ in self.infer_stream(text, ref_codes, ref_text, language=language):
+                pass
@@ -2,13 +2,40 @@
 TTS Inference Engine
 Handles inference with torch and GGML backends
 """
+import re
+from collections import OrderedDict
+import numpy as np
 import torch
-from typing import Generator
+from typing import Generator, Optional
+from src.tts.utils import to_code_array
+from src.utils.cancellation import CancellationToken, raise_if_cancelled
 from src.config.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
+def _cancellation_criteria(cancel_token: CancellationToken):
+    """
+    Build a transformers stopping criterion that ends generation on cancel
+
+    Args:
+        cancel_token: Token checked after every generated token
+
+    Returns:
+        StoppingCriteriaList for ``generate``
+    """
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class CancellationCriteria(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return torch.full(
+                (input_ids.shape[0],), cancel_token.cancelled,
+                dtype=torch.bool, device=input_ids.device
+            )
+
+    return StoppingCriteriaList([CancellationCriteria()])
+
+
 class TorchInference:
     """Inference using PyTorch backend"""
 
@@ -77,15 +104,19 @@ class TorchInference:
 
         return ids
 
-    def infer(self, prompt_ids: list[int]) -> str:
+    def infer(self, prompt_ids: list[int], cancel_token: Optional[CancellationToken] = None) -> str:
         """
         Run inference to generate speech tokens
 
         Args:
             prompt_ids: Input token IDs
+            cancel_token: Optional token checked after every generated token
 
         Returns:
             Generated token string
+
+        Raises:
+            SynthesisCancelled: If the token was cancelled during generation
         """
         prompt_tensor = torch.tensor(prompt_ids).unsqueeze(0).to(self.backbone.device)
         speech_end_id = self.tokenizer.convert_tokens_to_ids("<|SPEECH_GENERATION_END|>")
@@ -102,7 +133,9 @@ class TorchInference:
                 top_k=50,
                 use_cache=True,
                 min_new_tokens=50,
+                stopping_criteria=_cancellation_criteria(cancel_token) if cancel_token else None,
             )
+        raise_if_cancelled(cancel_token)
 
         input_length = prompt_tensor.shape[-1]
         output_str = self.tokenizer.decode(
@@ -113,10 +146,70 @@ class TorchInference:
         logger.debug(f"Generated {len(output_str)} characters of tokens")
         return output_str
 
+    def infer_batch(
+        self,
+        prompts: list[list[int]],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> list[str]:
+        """
+        Generate speech tokens for several prompts in one batched pass
+
+        Prompts are left-padded to a common length so every row continues
+        from its own last token; rows that finish early are padded until the
+        longest one ends.
+
+        Args:
+            prompts: Input token IDs per prompt
+            cancel_token: Optional token checked after every generated token
+
+        Returns:
+            Generated token string per prompt, in order
+
+        Raises:
+            SynthesisCancelled: If the token was cancelled during generation
+        """
+        speech_end_id = self.tokenizer.convert_tokens_to_ids("<|SPEECH_GENERATION_END|>")
+        pad_id = self.tokenizer.pad_token_id
+        if pad_id is None:
+            pad_id = speech_end_id
+
+        width = max(len(ids) for ids in prompts)
+        input_ids = torch.full((len(prompts), width), pad_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(prompts), width), dtype=torch.long)
+        for row, ids in enumerate(prompts):
+            input_ids[row, width - len(ids):] = torch.tensor(ids)
+            attention_mask[row, width - len(ids):] = 1
+
+        logger.debug(f"Running batched torch inference on {len(prompts)} prompts of up to {width} tokens")
+
+        with torch.no_grad():
+            output_tokens = self.backbone.generate(
+                input_ids.to(self.backbone.device),
+                attention_mask=attention_mask.to(self.backbone.device),
+                max_length=self.max_context,
+                eos_token_id=speech_end_id,
+                pad_token_id=pad_id,
+                do_sample=True,
+                temperature=1.0,
+                top_k=50,
+                use_cache=True,
+                min_new_tokens=50,
+                stopping_criteria=_cancellation_criteria(cancel_token) if cancel_token else None,
+            )
+        raise_if_cancelled(cancel_token)
+
+        return [
+            self.tokenizer.decode(row[width:].cpu().numpy().tolist(), add_special_tokens=False)
+            for row in output_tokens
+        ]
+
 
 class GGMLInference:
     """Inference using GGML/llama.cpp backend"""
 
+    # Number of voices whose prompt tokens are kept cached
+    max_cached_voices = 32
+
     def __init__(self, backbone, max_context: int = 2048):
         """
         Initialize GGML inference
@@ -127,15 +220,72 @@ class GGMLInference:
         """
         self.backbone = backbone
         self.max_context = max_context
+        self._code_for_token: np.ndarray | None = None
+        self._template_tokens: tuple[list[int], list[int]] | None = None
+        self._voice_prompts: OrderedDict = OrderedDict()
+
+    def _voice_prompt(self, ref_codes: list[int], ref_text: str) -> tuple[list[int], list[int]]:
+        """
+        Get the cached voice-specific parts of the prompt as token IDs
+
+        Args:
+            ref_codes: Reference audio codes
+            ref_text: Phonemized reference text
+
+        Returns:
+            Tuple of (head, tail) token IDs: the instruction template up to and
+            including the reference text, and the template after the input
+            text followed by the reference speech tokens
+        """
+        codes = to_code_array(ref_codes)
+        key = (codes.tobytes(), ref_text)
+
+        if key in self._voice_prompts:
+            self._voice_prompts.move_to_end(key)
+            return self._voice_prompts[key]
+
+        if self._template_tokens is None:
+            self._template_tokens = (
+                self.backbone.tokenize(
+                    b"user: Convert the text to speech:<|TEXT_PROMPT_START|>",
+                    add_bos=True, special=True
+                ),
+                self.backbone.tokenize(
+                    b"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>",
+                    add_bos=False, special=True
+                ),
+            )
+        template_head, template_tail = self._template_tokens
+
+        code_table = self._speech_code_table()
+        speech_ids = np.flatnonzero(code_table >= 0)
+        token_for_code = np.full(int(code_table.max()) + 1, -1, dtype=np.int64)
+        token_for_code[code_table[speech_ids]] = speech_ids
+        ref_tokens = token_for_code[codes]
+        if (ref_tokens < 0).any():
+            raise ValueError("Reference codes contain values without a matching speech token")
+
+        head = template_head + self.backbone.tokenize(
+            ref_text.encode("utf-8"), add_bos=False, special=False
+        )
+        tail = template_tail + ref_tokens.tolist()
+
+        self._voice_prompts[key] = (head, tail)
+        if len(self._voice_prompts) > self.max_cached_voices:
+            self._voice_prompts.popitem(last=False)
+        return head, tail
 
-    def create_prompt(
+    def create_prompt_tokens(
         self,
         ref_codes: list[int],
         ref_text: str,
         input_text: str
-    ) -> str:
+    ) -> list[int]:
         """
-        Create prompt for GGML inference
+        Create prompt token IDs for GGML inference
+
+        Only the input text is tokenized per call; the instruction template
+        and reference tokens are cached per voice.
 
         Args:
             ref_codes: Reference audio codes
@@ -143,16 +293,21 @@ class GGMLInference:
             input_text: Phonemized input text
 
         Returns:
-            Formatted prompt string
+            Prompt token IDs
         """
-        codes_str = "".join([f"<|speech_{idx}|>" for idx in ref_codes])
-        prompt = (
-            f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_text} {input_text}"
-            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{codes_str}"
+        head, tail = self._voice_prompt(ref_codes, ref_text)
+        input_tokens = self.backbone.tokenize(
+            f" {input_text}".encode("utf-8"), add_bos=False, special=False
         )
-        return prompt
+        return head + input_tokens + tail
 
-    def infer(self, ref_codes: list[int], ref_text: str, input_text: str) -> str:
+    def infer(
+        self,
+        ref_codes: list[int],
+        ref_text: str,
+        input_text: str,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> str:
         """
         Run GGML inference
 
@@ -160,52 +315,130 @@ class GGMLInference:
             ref_codes: Reference audio codes
             ref_text: Phonemized reference text
             input_text: Phonemized input text
+            cancel_token: Optional token checked after every generated token
 
         Returns:
             Generated token string
+
+        Raises:
+            SynthesisCancelled: If the token was cancelled during generation
         """
-        prompt = self.create_prompt(ref_codes, ref_text, input_text)
-        logger.debug(f"Running GGML inference with prompt length: {len(prompt)}")
+        prompt_tokens = self.create_prompt_tokens(ref_codes, ref_text, input_text)
+        logger.debug(f"Running GGML inference with prompt length: {len(prompt_tokens)}")
 
         output = self.backbone(
-            prompt,
+            prompt_tokens,
             max_tokens=self.max_context,
             temperature=1.0,
             top_k=50,
             stop=["<|SPEECH_GENERATION_END|>"],
+            stopping_criteria=(lambda input_ids, logits: cancel_token.cancelled) if cancel_token else None,
         )
+        raise_if_cancelled(cancel_token)
 
         output_str = output["choices"][0]["text"]
         logger.debug(f"Generated {len(output_str)} characters of tokens")
         return output_str
 
+    def infer_batch(
+        self,
+        ref_codes: list[int],
+        ref_text: str,
+        input_texts: list[str],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> list[str]:
+        """
+        Run GGML inference for several input texts with the same voice
+
+        llama.cpp decodes one sequence at a time here, so the texts run
+        back to back; the voice prompt is tokenized once and reused.
+
+        Args:
+            ref_codes: Reference audio codes
+            ref_text: Phonemized reference text
+            input_texts: Phonemized input texts
+            cancel_token: Optional token checked after every generated token
+
+        Returns:
+            Generated token string per input text, in order
+        """
+        return [
+            self.infer(ref_codes, ref_text, input_text, cancel_token=cancel_token)
+            for input_text in input_texts
+        ]
+
+    def _speech_code_table(self) -> np.ndarray:
+        """
+        Build (once) a lookup table from vocabulary token ID to speech code
+
+        Returns:
+            Array of length n_vocab holding the codec code for each
+            ``<|speech_N|>`` token and -1 for every other token
+        """
+        if self._code_for_token is None:
+            pattern = re.compile(rb"<\|speech_(\d+)\|>")
+            n_vocab = self.backbone.n_vocab()
+            table = np.full(n_vocab, -1, dtype=np.int64)
+
+            for token_id in range(n_vocab):
+                match = pattern.fullmatch(self.backbone.detokenize([token_id], special=True))
+                if match:
+                    table[token_id] = int(match.group(1))
+
+            self._code_for_token = table
+            logger.debug(f"Mapped {int((table >= 0).sum())} speech tokens from vocabulary")
+        return self._code_for_token
+
     def infer_stream(
         self,
         ref_codes: list[int],
         ref_text: str,
-        input_text: str
-    ) -> Generator[str, None, None]:
+        input_text: str,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Generator[int, None, None]:
         """
-        Run streaming GGML inference
+        Run streaming GGML inference at token level
+
+        Drives llama.cpp's token generator directly and maps each sampled
+        token to its codec code, so no per-token detokenization is done.
 
         Args:
             ref_codes: Reference audio codes
             ref_text: Phonemized reference text
             input_text: Phonemized input text
+            cancel_token: Optional token checked after every generated token
 
         Yields:
-            Generated token strings
+            Generated codec codes, one per speech token
+
+        Raises:
+            SynthesisCancelled: If the token is cancelled during generation
         """
-        prompt = self.create_prompt(ref_codes, ref_text, input_text)
-        logger.debug(f"Running streaming GGML inference")
+        code_table = self._speech_code_table()
+        prompt_tokens = self.create_prompt_tokens(ref_codes, ref_text, input_text)
 
-        for item in self.backbone(
-            prompt,
-            max_tokens=self.max_context,
-            temperature=1.0,
-            top_k=50,
-            stop=["<|SPEECH_GENERATION_END|>"],
-            stream=True
+        if len(prompt_tokens) >= self.max_context:
+            raise ValueError(
+                f"Prompt ({len(prompt_tokens)} tokens) exceeds context window of {self.max_context}"
+            )
+
+        stop_ids = {
+            self.backbone.token_eos(),
+            *self.backbone.tokenize(b"<|SPEECH_GENERATION_END|>", add_bos=False, special=True),
+        }
+        max_new_tokens = self.max_context - len(prompt_tokens)
+        logger.debug(f"Running streaming GGML inference with {len(prompt_tokens)} prompt tokens")
+
+        for n_generated, token_id in enumerate(
+            self.backbone.generate(prompt_tokens, top_k=50, temp=1.0, reset=True)
         ):
-            output_str = item["choices"][0]["text"]
-            yield output_str
+            raise_if_cancelled(cancel_token)
+            if token_id in stop_ids:
+                break
+
+            code = code_table[token_id]
+            if code >= 0:
+                yield int(code)
+
+            if n_generated + 1 >= max_new_tokens:
+                break
@@ -3,13 +3,79 @@ Streaming TTS Processing
 Handles streaming inference for real-time generation
 """
 import numpy as np
-from typing import Generator
-from src.tts.utils import linear_overlap_add
+from typing import Generator, Iterable
+from src.tts.utils import linear_overlap_add, to_code_array
 from src.config.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
+class CodeRingBuffer:
+    """
+    Fixed-capacity ring buffer of integer codec codes
+
+    Every code is written twice (at ``i % capacity`` and ``i % capacity + capacity``),
+    so any window of up to ``capacity`` most recent codes is a contiguous view
+    of the backing array and can be handed to the decoder without copying.
+    """
+
+    def __init__(self, capacity: int, dtype=np.int64):
+        """
+        Initialize ring buffer
+
+        Args:
+            capacity: Maximum number of codes retained
+            dtype: Integer dtype of stored codes
+        """
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+        self.capacity = capacity
+        self._buffer = np.zeros(2 * capacity, dtype=dtype)
+        self._total = 0
+
+    def __len__(self) -> int:
+        """Total number of codes ever appended (absolute position of the next code)"""
+        return self._total
+
+    def append(self, code: int):
+        """Append a single code, overwriting the oldest one when full"""
+        idx = self._total % self.capacity
+        self._buffer[idx] = code
+        self._buffer[idx + self.capacity] = code
+        self._total += 1
+
+    def extend(self, codes: Iterable[int]):
+        """Append many codes; only the last ``capacity`` are actually stored"""
+        codes = to_code_array(codes, dtype=self._buffer.dtype)
+        skipped = max(len(codes) - self.capacity, 0)
+        self._total += skipped
+        for code in codes[skipped:]:
+            self.append(code)
+
+    def window(self, start: int, end: int) -> np.ndarray:
+        """
+        Get codes in absolute range [start, end) as a contiguous view
+
+        Args:
+            start: Absolute start position (inclusive)
+            end: Absolute end position (exclusive), clipped to what has been appended
+
+        Returns:
+            View into the backing array (valid until the next append)
+
+        Raises:
+            IndexError: If the window reaches codes that were already overwritten
+        """
+        end = min(end, self._total)
+        if start < self._total - self.capacity or start > end:
+            raise IndexError(
+                f"Window [{start}, {end}) outside retained range "
+                f"[{max(self._total - self.capacity, 0)}, {self._total})"
+            )
+        offset = start % self.capacity
+        return self._buffer[offset : offset + (end - start)]
+
+
 class StreamingProcessor:
     """Processes streaming TTS generation"""
 
@@ -47,100 +113,112 @@ class StreamingProcessor:
         self.sample_rate = sample_rate
         self.stride_samples = frames_per_chunk * hop_length
 
+        # Largest decode window: lookback + chunk + lookforward, plus overlap on both sides
+        self.window_frames = lookback + frames_per_chunk + lookforward + 2 * overlap_frames
+
+    def _overlap_add(self, prev_recon: np.ndarray | None, recon: np.ndarray) -> np.ndarray:
+        """
+        Overlap-add a decoded chunk onto the previous one
+
+        Only the previous chunk overlaps the current one, so the samples
+        from ``stride_samples`` onwards are identical to overlap-adding
+        the whole stream history.
+        """
+        if prev_recon is None:
+            return linear_overlap_add([recon], stride=self.stride_samples)
+        return linear_overlap_add(
+            [prev_recon, recon], stride=self.stride_samples
+        )[self.stride_samples:]
+
+    def _watermark(self, samples: np.ndarray) -> np.ndarray:
+        """Watermark exactly the samples about to be emitted"""
+        return self.watermarker.apply_watermark(samples, sample_rate=self.sample_rate)
+
     def process_stream(
         self,
-        token_generator: Generator[str, None, None],
+        code_generator: Iterable[int],
         ref_codes: list[int]
     ) -> Generator[np.ndarray, None, None]:
         """
         Process streaming token generation
 
+        A chunk is decoded as soon as exactly ``frames_per_chunk + lookforward``
+        new codes are available.
+
         Args:
-            token_generator: Generator yielding speech tokens
+            code_generator: Generator yielding one codec code per generated frame
             ref_codes: Reference audio codes
 
         Yields:
             Audio chunks as numpy arrays
         """
-        audio_cache: list[np.ndarray] = []
-        token_cache: list[str] = [f"<|speech_{idx}|>" for idx in ref_codes]
-        n_decoded_samples: int = 0
-        n_decoded_tokens: int = len(ref_codes)
+        codes = CodeRingBuffer(self.window_frames)
+        codes.extend(ref_codes)
+        prev_recon: np.ndarray | None = None
+        n_decoded_tokens: int = len(codes)
 
         logger.info("Starting streaming TTS processing")
 
-        for output_str in token_generator:
-            token_cache.append(output_str)
+        for code in code_generator:
+            codes.append(code)
 
             # Check if we have enough tokens for a chunk
-            if len(token_cache[n_decoded_tokens:]) >= self.frames_per_chunk + self.lookforward:
-
-                # Decode chunk
-                tokens_start = max(
-                    n_decoded_tokens
-                    - self.lookback
-                    - self.overlap_frames,
-                    0
-                )
-                tokens_end = (
-                    n_decoded_tokens
-                    + self.frames_per_chunk
-                    + self.lookforward
-                    + self.overlap_frames
-                )
-                sample_start = (
-                    n_decoded_tokens - tokens_start
-                ) * self.hop_length
-                sample_end = (
-                    sample_start
-                    + (self.frames_per_chunk + 2 * self.overlap_frames) * self.hop_length
-                )
-
-                # Get current codes and decode
-                curr_codes = token_cache[tokens_start:tokens_end]
-                recon = self.decoder.decode("".join(curr_codes))
-                recon = self.watermarker.apply_watermark(recon, sample_rate=self.sample_rate)
-                recon = recon[sample_start:sample_end]
-                audio_cache.append(recon)
-
-                # Postprocess with overlap-add
-                processed_recon = linear_overlap_add(
-                    audio_cache, stride=self.stride_samples
-                )
-                new_samples_end = len(audio_cache) * self.stride_samples
-                processed_recon = processed_recon[
-                    n_decoded_samples:new_samples_end
-                ]
-                n_decoded_samples = new_samples_end
-                n_decoded_tokens += self.frames_per_chunk
-
-                yield processed_recon
+            if len(codes) - n_decoded_tokens < self.frames_per_chunk + self.lookforward:
+                continue
+
+            # Decode chunk
+            tokens_start = max(
+                n_decoded_tokens
+                - self.lookback
+                - self.overlap_frames,
+                0
+            )
+            tokens_end = (
+                n_decoded_tokens
+                + self.frames_per_chunk
+                + self.lookforward
+                + self.overlap_frames
+            )
+            sample_start = (
+                n_decoded_tokens - tokens_start
+            ) * self.hop_length
+            sample_end = (
+                sample_start
+                + (self.frames_per_chunk + 2 * self.overlap_frames) * self.hop_length
+            )
+
+            # Decode the current window straight from the ring buffer
+            recon = self.decoder.decode_tokens(codes.window(tokens_start, tokens_end))
+            recon = recon[sample_start:sample_end]
+
+            # Postprocess with overlap-add
+            processed_recon = self._overlap_add(prev_recon, recon)
+            prev_recon = recon
+            n_decoded_tokens += self.frames_per_chunk
+
+            # Watermark only the samples that are emitted
+            yield self._watermark(processed_recon[:self.stride_samples])
 
         # Final decoding for remaining tokens
-        remaining_tokens = len(token_cache) - n_decoded_tokens
+        remaining_tokens = len(codes) - n_decoded_tokens
         if remaining_tokens > 0:
             logger.debug(f"Processing {remaining_tokens} remaining tokens")
 
             tokens_start = max(
-                len(token_cache)
+                len(codes)
                 - (self.lookback + self.overlap_frames + remaining_tokens),
                 0
             )
             sample_start = (
-                len(token_cache)
+                len(codes)
                 - tokens_start
                 - remaining_tokens
                 - self.overlap_frames
             ) * self.hop_length
 
-            curr_codes = token_cache[tokens_start:]
-            recon = self.decoder.decode("".join(curr_codes))
-            recon = self.watermarker.apply_watermark(recon, sample_rate=self.sample_rate)
+            recon = self.decoder.decode_tokens(codes.window(tokens_start, len(codes)))
             recon = recon[sample_start:]
-            audio_cache.append(recon)
 
-            processed_recon = linear_overlap_add(audio_cache, stride=self.stride_samples)
-            processed_recon = processed_recon[n_decoded_samples:]
-            yield processed_recon
+            yield self._watermark(self._overlap_add(prev_recon, recon))
 
         logger.info("Streaming TTS processing complete")
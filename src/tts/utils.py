@@ -2,6 +2,7 @@
 TTS Utility Functions
 Helper functions for TTS processing
 """
+import os
 import numpy as np
 
 
@@ -41,3 +42,46 @@ def linear_overlap_add(frames: list[np.ndarray], stride: int) -> np.ndarray:
 
     assert sum_weight.min() > 0
     return out / sum_weight
+
+
+def to_code_array(codes, dtype=np.int64) -> np.ndarray:
+    """
+    Convert codec codes to a flat numpy integer array
+
+    Args:
+        codes: Codes as a list, numpy array or torch tensor (any device)
+        dtype: Integer dtype of the returned array
+
+    Returns:
+        1-D numpy array of codes
+    """
+    if hasattr(codes, "detach"):
+        codes = codes.detach().cpu().numpy()
+    return np.asarray(codes, dtype=dtype).reshape(-1)
+
+
+# Thread pool sizes read by torch, OpenMP and BLAS libraries when they load
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+
+def pin_compute_threads(threads: int):
+    """
+    Limit this process's compute thread pools to a fixed size
+
+    Call in a fresh worker process before the engine loads, so several
+    processes can share the cores without oversubscribing them.
+
+    Args:
+        threads: Number of compute threads
+    """
+    # Read by OpenMP and BLAS when they load, so set before importing torch
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+
+    import torch
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Fixed once torch has run parallel work in this process
+        pass
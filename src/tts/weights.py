@@ -0,0 +1,265 @@
+"""
+Model Weight Cache
+Local, pre-converted model weights for fast engine startup
+
+Each model repo gets a directory ``<cache_dir>/<owner>--<name>`` holding
+weights in a format that loads without Hub resolution:
+
+- transformers backbones: ``save_pretrained`` output with safetensors weights
+- GGUF backbones: the ``.gguf`` file
+- neucodec codecs: ``model.safetensors`` with the full codec state dict
+"""
+from pathlib import Path
+from typing import Optional
+
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CODEC_WEIGHTS_FILE = "model.safetensors"
+
+# Hub files a transformers backbone loads from (config, tokenizer, weights)
+BACKBONE_FILE_PATTERNS = ["*.json", "*.txt", "*.model", "*.safetensors"]
+
+# Pretrained semantic model each codec's constructor loads with transformers
+CODEC_SEMANTIC_MODELS = {
+    "neuphonic/neucodec": "facebook/w2v-bert-2.0",
+    "neuphonic/distill-neucodec": "ntu-spml/distilhubert",
+}
+
+# Checkpoint entries neucodec's from_pretrained leaves out
+CODEC_IGNORED_KEYS = {
+    "neuphonic/neucodec": ("fc_post_s", "SemanticDecoder"),
+    "neuphonic/distill-neucodec": (),
+}
+
+
+def cache_path(cache_dir: str | Path, repo: str) -> Path:
+    """
+    Directory holding the cached weights of a model repo
+
+    Args:
+        cache_dir: Weight cache root
+        repo: HuggingFace repo ID
+
+    Returns:
+        Cache directory for the repo (may not exist)
+    """
+    return Path(cache_dir) / repo.replace("/", "--")
+
+
+def find_backbone(cache_dir: Optional[str | Path], repo: str) -> Optional[Path]:
+    """
+    Find a cached backbone
+
+    Args:
+        cache_dir: Weight cache root, or None if caching is disabled
+        repo: Backbone repo ID
+
+    Returns:
+        The .gguf file for GGUF repos, the model directory for transformers
+        repos, or None if the backbone is not cached
+    """
+    if cache_dir is None:
+        return None
+    path = cache_path(cache_dir, repo)
+    if repo.endswith("gguf"):
+        return next(iter(sorted(path.glob("*.gguf"))), None)
+    if (path / "config.json").exists():
+        return path
+    return None
+
+
+def find_codec(cache_dir: Optional[str | Path], repo: str) -> Optional[Path]:
+    """
+    Find cached codec weights
+
+    Args:
+        cache_dir: Weight cache root, or None if caching is disabled
+        repo: Codec repo ID
+
+    Returns:
+        Path to the safetensors file, or None if the codec is not cached
+    """
+    if cache_dir is None:
+        return None
+    path = cache_path(cache_dir, repo) / CODEC_WEIGHTS_FILE
+    return path if path.exists() else None
+
+
+def download_backbone(repo: str) -> Path:
+    """
+    Download a transformers backbone into the Hub cache
+
+    Args:
+        repo: Backbone repo ID
+
+    Returns:
+        Local directory with the backbone's config, tokenizer and weights
+    """
+    from huggingface_hub import snapshot_download
+
+    return Path(snapshot_download(repo_id=repo, allow_patterns=BACKBONE_FILE_PATTERNS))
+
+
+def read_backbone_weights(path: Path) -> dict:
+    """
+    Read the state dict of a transformers backbone directory
+
+    Args:
+        path: Backbone directory (see download_backbone or find_backbone)
+
+    Returns:
+        State dict of all safetensors shards
+
+    Raises:
+        FileNotFoundError: If the directory holds no safetensors weights
+    """
+    from safetensors.torch import load_file
+
+    shards = sorted(Path(path).glob("*.safetensors"))
+    if not shards:
+        raise FileNotFoundError(
+            f"No safetensors weights in {path}; cache the backbone with scripts/convert_weights.py"
+        )
+    state_dict = {}
+    for shard in shards:
+        state_dict.update(load_file(str(shard)))
+    return state_dict
+
+
+def export_backbone(repo: str, cache_dir: str | Path) -> Path:
+    """
+    Download a backbone and store it in the weight cache
+
+    Args:
+        repo: Backbone repo ID
+        cache_dir: Weight cache root
+
+    Returns:
+        Cache directory of the backbone
+    """
+    path = cache_path(cache_dir, repo)
+    path.mkdir(parents=True, exist_ok=True)
+
+    if repo.endswith("gguf"):
+        from huggingface_hub import snapshot_download
+        snapshot_download(repo_id=repo, allow_patterns=["*.gguf"], local_dir=path)
+    else:
+        from transformers import AutoTokenizer, AutoModelForCausalLM
+        AutoTokenizer.from_pretrained(repo).save_pretrained(path)
+        model = AutoModelForCausalLM.from_pretrained(repo, low_cpu_mem_usage=True)
+        model.save_pretrained(path, safe_serialization=True)
+
+    logger.info(f"Cached backbone {repo} in {path}")
+    return path
+
+
+def export_codec(repo: str, cache_dir: str | Path) -> Path:
+    """
+    Download a neucodec codec and store its weights in the weight cache
+
+    Args:
+        repo: Codec repo ID (neuphonic/neucodec or neuphonic/distill-neucodec)
+        cache_dir: Weight cache root
+
+    Returns:
+        Path to the cached safetensors file
+    """
+    from safetensors.torch import save_model
+
+    codec = codec_class(repo).from_pretrained(repo)
+    path = cache_path(cache_dir, repo) / CODEC_WEIGHTS_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    save_model(codec, str(path))
+
+    logger.info(f"Cached codec {repo} in {path}")
+    return path
+
+
+def codec_class(repo: str):
+    """
+    neucodec model class for a codec repo
+
+    Raises:
+        ValueError: If the repo is not a PyTorch neucodec model
+    """
+    from neucodec import NeuCodec, DistillNeuCodec
+
+    classes = {
+        "neuphonic/neucodec": NeuCodec,
+        "neuphonic/distill-neucodec": DistillNeuCodec,
+    }
+    if repo not in classes:
+        raise ValueError(f"No cacheable weights for codec: {repo}")
+    return classes[repo]
+
+
+def build_codec(repo: str):
+    """
+    Construct a codec without its own weights
+
+    This is the construction step of neucodec's from_pretrained; the
+    constructor loads the pretrained semantic model with transformers.
+
+    Args:
+        repo: Codec repo ID
+
+    Returns:
+        Codec model (weights still to be loaded, see load_codec_weights)
+    """
+    return codec_class(repo)(24_000, 480)
+
+
+def download_codec(repo: str) -> Path:
+    """
+    Download a neucodec checkpoint and its semantic model into the Hub cache
+
+    Args:
+        repo: Codec repo ID
+
+    Returns:
+        Path to the codec checkpoint
+    """
+    from huggingface_hub import hf_hub_download, snapshot_download
+
+    codec_class(repo)
+    snapshot_download(repo_id=CODEC_SEMANTIC_MODELS[repo], allow_patterns=["*.json", "*.safetensors"])
+    return Path(hf_hub_download(repo_id=repo, filename="pytorch_model.bin"))
+
+
+def read_codec_checkpoint(repo: str, checkpoint_path: Path) -> dict:
+    """
+    Read a downloaded neucodec checkpoint as neucodec's from_pretrained does
+
+    Args:
+        repo: Codec repo ID
+        checkpoint_path: Checkpoint returned by download_codec
+
+    Returns:
+        State dict without the entries the codec does not use
+    """
+    import torch
+
+    state_dict = torch.load(checkpoint_path, map_location="cpu")
+    ignored = CODEC_IGNORED_KEYS[repo]
+    return {
+        key: value for key, value in state_dict.items()
+        if not any(part in key for part in ignored)
+    }
+
+
+def load_codec_weights(codec, weights_path: Path):
+    """
+    Load cached weights into a codec built with build_codec
+
+    The safetensors file is memory-mapped, so weights are paged in as they
+    are copied into the model instead of being unpickled in one go.
+
+    Args:
+        codec: Codec model
+        weights_path: Cached safetensors file
+    """
+    from safetensors.torch import load_model
+
+    load_model(codec, str(weights_path))
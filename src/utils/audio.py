@@ -0,0 +1,456 @@
+"""
+Audio Encoding Utilities
+Output formats, format negotiation and incremental audio encoding
+"""
+import os
+import struct
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Generator, Iterable, Optional
+import numpy as np
+import soundfile as sf
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Data size used in streamed WAV headers when the final length is unknown
+WAV_UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    """Output audio format supported by libsndfile"""
+
+    name: str
+    extension: str
+    container: str
+    subtype: str
+    mimetype: str
+
+    # Whether the encoded bytes can be sent while encoding is still in progress
+    streamable: bool = False
+
+    @property
+    def available(self) -> bool:
+        """Whether the installed libsndfile can encode this format"""
+        return self.subtype in sf.available_subtypes(self.container)
+
+
+# Output formats in order of preference for content negotiation
+AUDIO_FORMATS = {
+    'wav': AudioFormat('wav', 'wav', 'WAV', 'PCM_16', 'audio/wav', streamable=True),
+    'opus': AudioFormat('opus', 'opus', 'OGG', 'OPUS', 'audio/ogg', streamable=True),
+    'flac': AudioFormat('flac', 'flac', 'FLAC', 'PCM_16', 'audio/flac'),
+    'mp3': AudioFormat('mp3', 'mp3', 'MP3', 'MPEG_LAYER_III', 'audio/mpeg'),
+}
+
+# Alternative names accepted in the request ``format`` field
+_FORMAT_ALIASES = {'ogg': 'opus', 'pcm': 'wav', 'pcm16': 'wav', 'mpeg': 'mp3'}
+
+
+def get_audio_format(name: str) -> Optional[AudioFormat]:
+    """
+    Look up an available output format by name
+
+    Args:
+        name: Format name or alias (e.g., 'opus', 'ogg', 'flac')
+
+    Returns:
+        AudioFormat or None if unknown or not supported by libsndfile
+    """
+    name = name.strip().lower()
+    audio_format = AUDIO_FORMATS.get(_FORMAT_ALIASES.get(name, name))
+    if audio_format is None or not audio_format.available:
+        return None
+    return audio_format
+
+
+def negotiate_format(
+    requested: Optional[str] = None,
+    accept_mimetypes=None,
+    default: str = 'wav'
+) -> Optional[AudioFormat]:
+    """
+    Choose an output format from a request field or the Accept header
+
+    Args:
+        requested: Explicit format name from the request, takes precedence
+        accept_mimetypes: werkzeug MIMEAccept from the request, if any
+        default: Preferred format when the client accepts several (or anything)
+
+    Returns:
+        Chosen AudioFormat, or None if the explicitly requested format is unsupported
+    """
+    if requested:
+        return get_audio_format(requested)
+
+    preferred = AUDIO_FORMATS[default]
+    if accept_mimetypes:
+        candidates = [preferred] + [
+            fmt for fmt in AUDIO_FORMATS.values() if fmt.available and fmt is not preferred
+        ]
+        best = accept_mimetypes.best_match([fmt.mimetype for fmt in candidates])
+        for fmt in candidates:
+            if fmt.mimetype == best:
+                return fmt
+
+    return preferred
+
+
+def format_for_path(path: Path) -> Optional[AudioFormat]:
+    """
+    Get the output format matching a file's extension
+
+    Args:
+        path: Audio file path
+
+    Returns:
+        AudioFormat or None if the extension is not an output format
+    """
+    extension = Path(path).suffix.lstrip('.').lower()
+    for audio_format in AUDIO_FORMATS.values():
+        if audio_format.extension == extension:
+            return audio_format
+    return None
+
+
+def variant_path(path: Path, audio_format: AudioFormat) -> Path:
+    """
+    Get the path of an encoded variant stored next to an output file
+
+    Args:
+        path: Path of the original output file
+        audio_format: Format of the variant
+
+    Returns:
+        Path with the format's extension
+    """
+    return path.with_suffix(f".{audio_format.extension}")
+
+
+class AudioFileWriter:
+    """
+    Incrementally encodes audio chunks into a file
+
+    Samples are converted to the format's subtype as they are written. The
+    file is written under a temporary name and moved into place on close(),
+    so readers never see a partially encoded file; flush() rewrites the
+    header so the partial file stays valid if the process dies.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        audio_format: AudioFormat,
+        sample_rate: int,
+        channels: int = 1,
+        tmp_path: Optional[Path] = None
+    ):
+        """
+        Open the output file for writing
+
+        Args:
+            path: Final output path
+            audio_format: Output format
+            sample_rate: Sample rate in Hz
+            channels: Number of channels
+            tmp_path: Fixed temporary path, so a partial file can be found
+                again after a restart (default: unique per writer)
+        """
+        self.path = Path(path)
+        self.audio_format = audio_format
+        self._tmp_path = tmp_path or self.path.with_name(
+            f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.part"
+        )
+        self._file = sf.SoundFile(
+            str(self._tmp_path), 'w',
+            samplerate=sample_rate,
+            channels=channels,
+            format=audio_format.container,
+            subtype=audio_format.subtype
+        )
+        self.frames_written = 0
+
+    def write(self, wav: np.ndarray):
+        """Encode and append a chunk of float samples"""
+        self._file.write(wav)
+        self.frames_written += len(wav)
+
+    def flush(self):
+        """Update the header and flush buffered data to disk"""
+        self._file.flush()
+
+    def close(self) -> Path:
+        """Finish encoding and move the file into place"""
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        logger.debug(f"Wrote {self.frames_written} frames to {self.path.name}")
+        return self.path
+
+    def abort(self):
+        """Discard the partially written file"""
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def release(self):
+        """Close the file, keeping the partial data for a later resume"""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class CrossfadeJoiner:
+    """
+    Joins consecutive audio chunks with a short linear crossfade
+
+    The last ``overlap`` samples of each chunk are held back and blended
+    with the start of the next chunk, so the joined audio is shorter by
+    ``overlap`` samples per boundary. Call flush() after the last chunk.
+    """
+
+    def __init__(self, overlap: int):
+        """
+        Initialize joiner
+
+        Args:
+            overlap: Crossfade length in samples (0 concatenates)
+        """
+        self.overlap = max(0, overlap)
+        self._tail: Optional[np.ndarray] = None
+
+    def push(self, wav: np.ndarray) -> np.ndarray:
+        """
+        Add the next chunk
+
+        Args:
+            wav: Chunk samples
+
+        Returns:
+            Samples ready to be written (may be empty)
+        """
+        if self.overlap == 0:
+            return wav
+
+        if self._tail is not None and len(self._tail) and len(wav):
+            n = min(len(self._tail), len(wav))
+            fade_in = np.linspace(0.0, 1.0, n + 2, dtype=np.float32)[1:-1]
+            blended = self._tail[-n:] * (1.0 - fade_in) + wav[:n] * fade_in
+            joined = np.concatenate([self._tail[:-n], blended.astype(wav.dtype), wav[n:]])
+        else:
+            joined = wav if self._tail is None else np.concatenate([self._tail, wav])
+
+        split = max(0, len(joined) - self.overlap)
+        self._tail = joined[split:]
+        return joined[:split]
+
+    def flush(self) -> np.ndarray:
+        """Return the held-back end of the last chunk"""
+        tail = self._tail if self._tail is not None else np.zeros(0, dtype=np.float32)
+        self._tail = None
+        return tail
+
+
+def transcode_file(
+    source: Path,
+    target: Path,
+    audio_format: AudioFormat,
+    block_size: int = 65536
+) -> Path:
+    """
+    Encode an existing audio file into another format, block by block
+
+    Args:
+        source: Source audio file
+        target: Target path
+        audio_format: Target format
+        block_size: Frames read and encoded per block
+
+    Returns:
+        Target path
+    """
+    info = sf.info(str(source))
+    with AudioFileWriter(target, audio_format, info.samplerate, info.channels) as writer:
+        for block in sf.blocks(str(source), blocksize=block_size, dtype='float32'):
+            writer.write(block)
+    logger.info(f"Encoded {source.name} -> {target.name}")
+    return target
+
+
+class StreamEncoder:
+    """
+    Incremental encoder for streamable formats
+
+    Feed chunks with encode() and send the returned bytes as they come;
+    finish() flushes the encoder. Usable from both sync and async code.
+    """
+
+    def __init__(self, audio_format: AudioFormat, sample_rate: int):
+        """
+        Initialize stream encoder
+
+        Args:
+            audio_format: Streamable output format
+            sample_rate: Sample rate in Hz
+
+        Raises:
+            ValueError: If the format cannot be streamed
+        """
+        if not audio_format.streamable:
+            raise ValueError(f"Format '{audio_format.name}' cannot be streamed")
+
+        self.audio_format = audio_format
+        self.sample_rate = sample_rate
+        self._started = False
+        self._tmp = None
+        self._reader = None
+        self._encoder = None
+
+        if audio_format.name != 'wav':
+            # libsndfile encodes into a file; new bytes are read back after each write
+            self._tmp = tempfile.NamedTemporaryFile(suffix=f".{audio_format.extension}")
+            self._reader = open(self._tmp.name, 'rb')
+            self._encoder = sf.SoundFile(
+                self._tmp, 'w',
+                samplerate=sample_rate,
+                channels=1,
+                format=audio_format.container,
+                subtype=audio_format.subtype
+            )
+
+    def encode(self, chunk: np.ndarray) -> bytes:
+        """
+        Encode one float audio chunk
+
+        Args:
+            chunk: Float audio samples
+
+        Returns:
+            Newly encoded bytes (may be empty)
+        """
+        if self._encoder is None:
+            data = float_to_pcm16(chunk)
+            if not self._started:
+                self._started = True
+                data = wav_header(self.sample_rate) + data
+            return data
+
+        self._encoder.write(chunk)
+        self._tmp.flush()
+        return self._reader.read()
+
+    def finish(self) -> bytes:
+        """
+        Flush the encoder and release its resources
+
+        Returns:
+            Remaining encoded bytes (may be empty)
+        """
+        if self._encoder is None:
+            data = b'' if self._started else wav_header(self.sample_rate)
+            self._started = True
+            return data
+
+        try:
+            self._encoder.close()
+            self._tmp.flush()
+            return self._reader.read()
+        finally:
+            self.close()
+
+    def close(self):
+        """Release resources without flushing (safe to call more than once)"""
+        if self._encoder is not None:
+            if not self._encoder.closed:
+                self._encoder.close()
+            self._reader.close()
+            self._tmp.close()
+
+
+def encode_stream(
+    chunks: Iterable[np.ndarray],
+    audio_format: AudioFormat,
+    sample_rate: int
+) -> Generator[bytes, None, None]:
+    """
+    Encode audio chunks on the fly, yielding encoded bytes as they are produced
+
+    Args:
+        chunks: Float audio chunks
+        audio_format: Streamable output format
+        sample_rate: Sample rate in Hz
+
+    Yields:
+        Encoded bytes
+
+    Raises:
+        ValueError: If the format cannot be streamed
+    """
+    encoder = StreamEncoder(audio_format, sample_rate)
+    try:
+        for chunk in chunks:
+            data = encoder.encode(chunk)
+            if data:
+                yield data
+        data = encoder.finish()
+        if data:
+            yield data
+    finally:
+        encoder.close()
+
+
+def wav_header(
+    sample_rate: int,
+    channels: int = 1,
+    bits_per_sample: int = 16,
+    data_size: Optional[int] = None
+) -> bytes:
+    """
+    Build a PCM WAV (RIFF) header
+
+    Args:
+        sample_rate: Sample rate in Hz
+        channels: Number of channels
+        bits_per_sample: Bits per sample (16 for PCM_16)
+        data_size: Size of the PCM data in bytes; None for an open-ended stream
+
+    Returns:
+        44-byte WAV header
+    """
+    block_align = channels * bits_per_sample // 8
+    byte_rate = sample_rate * block_align
+
+    if data_size is None:
+        riff_size = data_size = WAV_UNKNOWN_SIZE
+    else:
+        riff_size = min(36 + data_size, WAV_UNKNOWN_SIZE)
+
+    return (
+        b"RIFF" + struct.pack("<I", riff_size) + b"WAVE"
+        + b"fmt " + struct.pack(
+            "<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, block_align, bits_per_sample
+        )
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+
+def float_to_pcm16(wav: np.ndarray) -> bytes:
+    """
+    Convert a float waveform in [-1, 1] to little-endian 16-bit PCM bytes
+
+    Args:
+        wav: Float audio samples
+
+    Returns:
+        PCM_16 bytes
+    """
+    pcm = np.clip(wav, -1.0, 1.0) * 32767.0
+    return pcm.astype("<i2").tobytes()
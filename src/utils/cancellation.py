@@ -0,0 +1,71 @@
+"""
+Cancellation Utilities
+Cooperative cancellation of in-flight synthesis
+"""
+from threading import Event
+from typing import Optional
+
+
+class SynthesisCancelled(Exception):
+    """Raised inside a job when its cancellation token has been triggered"""
+
+
+class CancellationToken:
+    """
+    Thread-safe flag checked by long-running work to stop early
+
+    The token is cancelled from request handlers (client disconnect or an
+    explicit cancel) and polled by the synthesis worker between chunks and
+    by the backbone between generated tokens.
+    """
+
+    def __init__(self, event=None):
+        """
+        Initialize cancellation token
+
+        Args:
+            event: Optional event to share the flag with, e.g. a
+                multiprocessing.Event watched by an engine process
+        """
+        self._event = event if event is not None else Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "cancelled"):
+        """
+        Request cancellation
+
+        Args:
+            reason: Why the work was cancelled (for logs)
+        """
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation has been requested"""
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """
+        Raise if cancellation has been requested
+
+        Raises:
+            SynthesisCancelled: If the token is cancelled
+        """
+        if self._event.is_set():
+            raise SynthesisCancelled(self.reason)
+
+
+def raise_if_cancelled(token: Optional[CancellationToken]):
+    """
+    Raise if an optional token has been cancelled
+
+    Args:
+        token: Cancellation token or None
+
+    Raises:
+        SynthesisCancelled: If the token is cancelled
+    """
+    if token is not None:
+        token.raise_if_cancelled()
@@ -2,39 +2,31 @@
 General Helper Utilities
 Miscellaneous helper functions
 """
+import hashlib
+import os
+import secrets
+import time
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from src.config.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
-def generate_timestamp_filename(prefix: str = "", extension: str = "wav") -> str:
-    """
-    Generate a filename with timestamp
-
-    Args:
-        prefix: Optional prefix for the filename
-        extension: File extension (without dot)
-
-    Returns:
-        Filename string
-    """
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    if prefix:
-        return f"{prefix}_{timestamp}.{extension}"
-    return f"{timestamp}.{extension}"
-
-
 def generate_session_id() -> str:
     """
-    Generate a unique session ID
+    Generate a unique, unguessable session ID
+
+    The ID is all a client needs to follow or cancel a job, so it must not
+    be predictable.
 
     Returns:
         Session ID string
     """
-    return datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    return secrets.token_urlsafe(16)
 
 
 def get_file_info(file_path: Path) -> Dict[str, Any]:
@@ -62,9 +54,102 @@ def get_file_info(file_path: Path) -> Dict[str, Any]:
     }
 
 
+@lru_cache(maxsize=4096)
+def _hash_file(path: str, mtime_ns: int, size: int) -> str:
+    """Hash file contents; cached per (path, mtime, size) so unchanged files are read once"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compute_file_etag(file_path: Path) -> str:
+    """
+    Compute a strong ETag for a file from its contents
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Content hash suitable as a strong ETag value
+    """
+    stat = file_path.stat()
+    return _hash_file(str(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+def sharded_path(directory: Path, filename: str, width: int = 2) -> Path:
+    """
+    Location of a file in a directory split into hashed subdirectories
+
+    The shard is derived from the file's stem, so encoded variants of a
+    file (same stem, other extension) share its subdirectory.
+
+    Args:
+        directory: Sharded directory
+        filename: File name
+        width: Hex characters per shard name (256 shards for 2)
+
+    Returns:
+        Path ``directory/<shard>/<filename>``
+    """
+    shard = hashlib.sha256(Path(filename).stem.encode('utf-8')).hexdigest()[:width]
+    return directory / shard / filename
+
+
+@dataclass
+class StoredFile:
+    """File found by scan_files"""
+    path: Path
+    size: int
+    modified: float
+    # Latest of access and modification time
+    last_used: float
+
+
+def scan_files(directory: Path) -> list[StoredFile]:
+    """
+    List the files of a directory and of its shard subdirectories
+
+    Uses os.scandir, whose entries carry their type, so only regular files
+    are stat'ed. Hidden subdirectories (e.g. staging directories of running
+    jobs) are not entered.
+
+    Args:
+        directory: Directory to scan
+
+    Returns:
+        Files found; entries removed during the scan are skipped
+    """
+    files = []
+    pending = [(directory, True)]
+    while pending:
+        current, is_root = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if is_root and not entry.name.startswith('.'):
+                                pending.append((Path(entry.path), False))
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            files.append(StoredFile(
+                                path=Path(entry.path),
+                                size=stat.st_size,
+                                modified=stat.st_mtime,
+                                last_used=max(stat.st_atime, stat.st_mtime)
+                            ))
+                    except FileNotFoundError:
+                        continue
+        except FileNotFoundError:
+            continue
+    return files
+
+
 def cleanup_old_files(directory: Path, max_age_hours: int = 24) -> int:
     """
-    Clean up old files from a directory
+    Clean up old files from a directory and its shard subdirectories
 
     Args:
         directory: Directory to clean
@@ -76,18 +161,15 @@ def cleanup_old_files(directory: Path, max_age_hours: int = 24) -> int:
     if not directory.exists():
         return 0
 
-    from datetime import timedelta
-    cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
+    cutoff_time = time.time() - max_age_hours * 3600
     deleted_count = 0
 
     try:
-        for file_path in directory.iterdir():
-            if file_path.is_file():
-                file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-                if file_mtime < cutoff_time:
-                    logger.debug(f"Deleting old file: {file_path}")
-                    file_path.unlink()
-                    deleted_count += 1
+        for stored in scan_files(directory):
+            if stored.modified < cutoff_time:
+                logger.debug(f"Deleting old file: {stored.path}")
+                stored.path.unlink(missing_ok=True)
+                deleted_count += 1
     except Exception as e:
         logger.error(f"Error cleaning up old files: {e}")
 
@@ -121,41 +203,29 @@ def format_duration(seconds: float) -> str:
     return f"{hours}h {remaining_minutes}m"
 
 
-def get_sample_files(samples_dir: Path) -> List[Dict[str, Any]]:
+def find_reference_sample(samples_dir: Path, name: str = "") -> Optional[Tuple[Path, str]]:
     """
-    Get list of available sample files
+    Find a sample with a transcript, searching subdirectories too
 
     Args:
         samples_dir: Directory containing samples
+        name: Preferred sample name (without extension); any sample if empty
 
     Returns:
-        List of sample dictionaries with name, wav path, and txt content
+        Tuple of (wav path, transcript) or None if no sample has a transcript
     """
-    samples = []
-
     if not samples_dir.exists():
-        logger.warning(f"Samples directory does not exist: {samples_dir}")
-        return samples
-
-    # Find all wav files
-    for wav_file in samples_dir.glob('*.wav'):
-        name = wav_file.stem
-        txt_file = samples_dir / f"{name}.txt"
-
-        # Read text content if available
-        txt_content = None
-        if txt_file.exists():
-            try:
-                with open(txt_file, 'r', encoding='utf-8') as f:
-                    txt_content = f.read().strip()
-            except Exception as e:
-                logger.error(f"Error reading {txt_file}: {e}")
-
-        samples.append({
-            'name': name,
-            'wav': str(wav_file),
-            'txt': txt_content
-        })
-
-    logger.debug(f"Found {len(samples)} sample files")
-    return samples
+        return None
+
+    for wav_file in sorted(samples_dir.rglob(f"{name or '*'}.wav")):
+        txt_file = wav_file.with_suffix('.txt')
+        if not txt_file.exists():
+            continue
+        try:
+            text = txt_file.read_text(encoding='utf-8').strip()
+        except Exception as e:
+            logger.error(f"Error reading {txt_file}: {e}")
+            continue
+        if text:
+            return wav_file, text
+    return None
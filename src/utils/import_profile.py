@@ -0,0 +1,90 @@
+"""
+Import Profiling
+Measures what the web tier imports and how long it takes
+
+The web tier (Flask/ASGI apps, routes, services) must not import the ML
+stack; torch, the codec and the watermarker are only imported where the
+model runs (NeuTTSAir, engine processes). Imports are measured in a fresh
+interpreter so modules already loaded by the caller do not hide any cost.
+"""
+import json
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Modules making up the web tier
+WEB_TIER_MODULES = ("src.api.app", "src.api.asgi")
+
+# Top-level packages that belong behind the engine boundary
+ENGINE_MODULES = ("torch", "neucodec", "perth", "transformers", "librosa", "phonemizer", "llama_cpp")
+
+# Import time budget for WEB_TIER_MODULES in a fresh interpreter
+WEB_TIER_IMPORT_BUDGET_SECONDS = 1.0
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+_PROBE = """
+import importlib, json, sys, time
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+print(json.dumps({"seconds": time.perf_counter() - start, "modules": sorted(sys.modules)}))
+"""
+
+
+@dataclass
+class ImportProfile:
+    """Result of importing modules in a fresh interpreter"""
+    seconds: float
+    modules: list[str]
+    # (module, cumulative seconds) from -X importtime, slowest first
+    slowest: list[tuple[str, float]] = field(default_factory=list)
+
+    def engine_modules(self) -> list[str]:
+        """ENGINE_MODULES packages that were imported"""
+        return [name for name in ENGINE_MODULES if name in self.modules]
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, float]]:
+    """Parse ``-X importtime`` output into (module, cumulative seconds)"""
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            timings.append((name.strip(), int(cumulative) / 1e6))
+        except ValueError:
+            continue
+    return sorted(timings, key=lambda timing: timing[1], reverse=True)
+
+
+def profile_imports(modules: tuple[str, ...] = WEB_TIER_MODULES) -> ImportProfile:
+    """
+    Import modules in a fresh interpreter and report time and modules loaded
+
+    Args:
+        modules: Dotted module names to import
+
+    Returns:
+        Import profile
+
+    Raises:
+        RuntimeError: If importing failed
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE, *modules],
+        cwd=_PROJECT_ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n{result.stderr[-2000:]}")
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return ImportProfile(
+        seconds=report["seconds"],
+        modules=report["modules"],
+        slowest=_parse_importtime(result.stderr)
+    )
@@ -0,0 +1,119 @@
+"""
+Batch Manifest Parsing
+Reads the texts of a batch synthesis request from JSONL or CSV
+"""
+import csv
+import io
+import json
+from typing import Optional, Tuple
+
+from src.models.synthesis_request import BatchItem
+from src.utils.validators import sanitize_filename, validate_text_input
+
+# Accepted names of the text and identifier fields
+TEXT_FIELDS = ('text', 'input_text')
+ID_FIELDS = ('id', 'item_id')
+
+
+def _field(record: dict, names: tuple) -> Optional[str]:
+    """First non-empty value among the accepted field names"""
+    for name in names:
+        value = record.get(name)
+        if value not in (None, ''):
+            return str(value)
+    return None
+
+
+def _read_jsonl(content: str) -> Tuple[Optional[list[tuple[int, dict]]], Optional[str]]:
+    """Parse one JSON object per non-blank line"""
+    records = []
+    for line_number, line in enumerate(content.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            return None, f"Line {line_number}: invalid JSON ({e.msg})"
+        if not isinstance(record, dict):
+            return None, f"Line {line_number}: expected a JSON object"
+        records.append((line_number, record))
+    return records, None
+
+
+def _read_lines(content: str) -> Tuple[Optional[list[tuple[int, dict]]], Optional[str]]:
+    """Parse one text per non-blank line"""
+    return [
+        (line_number, {'text': line})
+        for line_number, line in enumerate(content.splitlines(), start=1)
+        if line.strip()
+    ], None
+
+
+def _read_csv(content: str) -> Tuple[Optional[list[tuple[int, dict]]], Optional[str]]:
+    """Parse a CSV file with a header row"""
+    reader = csv.DictReader(io.StringIO(content))
+    if not reader.fieldnames or not any(name in reader.fieldnames for name in TEXT_FIELDS):
+        return None, f"CSV header must contain a '{TEXT_FIELDS[0]}' column"
+    try:
+        # Line numbers count the header row
+        return [(index, row) for index, row in enumerate(reader, start=2)], None
+    except csv.Error as e:
+        return None, f"Invalid CSV: {e}"
+
+
+def parse_manifest(
+    content: str,
+    filename: str = "",
+    max_items: int = 1000,
+    max_text_length: int = 10000
+) -> Tuple[Optional[list[BatchItem]], Optional[str]]:
+    """
+    Parse a batch manifest
+
+    JSONL manifests hold one object per line with a ``text`` field; CSV
+    manifests need a header row with a ``text`` column; plain text files
+    (.txt) hold one text per line. An optional ``id`` names each item's
+    output file and defaults to the line number. The format follows the
+    file extension (.jsonl/.ndjson, .csv or .txt) and is otherwise detected
+    from the content.
+
+    Args:
+        content: Manifest text
+        filename: Original filename, used to pick the format
+        max_items: Maximum number of items
+        max_text_length: Maximum length of each text
+
+    Returns:
+        Tuple of (items, error_message); exactly one is None
+    """
+    suffix = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if suffix == 'txt':
+        records, error = _read_lines(content)
+    elif suffix in ('jsonl', 'ndjson') or (suffix != 'csv' and content.lstrip().startswith('{')):
+        records, error = _read_jsonl(content)
+    else:
+        records, error = _read_csv(content)
+    if error:
+        return None, error
+
+    if not records:
+        return None, "Manifest contains no items"
+    if len(records) > max_items:
+        return None, f"Manifest has {len(records)} items, the limit is {max_items}"
+
+    items, seen = [], set()
+    for line_number, record in records:
+        item_id = sanitize_filename(_field(record, ID_FIELDS) or str(line_number))
+        if item_id in seen:
+            return None, f"Line {line_number}: duplicate id '{item_id}'"
+        seen.add(item_id)
+
+        text = (_field(record, TEXT_FIELDS) or '').strip()
+        is_valid, error_msg = validate_text_input(
+            text, max_length=max_text_length, field_name=f"Line {line_number}: text"
+        )
+        if not is_valid:
+            return None, error_msg
+        items.append(BatchItem(item_id=item_id, input_text=text))
+
+    return items, None
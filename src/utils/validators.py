@@ -4,7 +4,7 @@ Validates user inputs and file uploads
 """
 from pathlib import Path
 from typing import Optional, Tuple
-from werkzeug.datastructures import FileStorage
+import soundfile as sf
 from src.config.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -15,49 +15,84 @@ class ValidationError(Exception):
     pass
 
 
-def validate_audio_file(
-    file: FileStorage,
-    max_size_mb: int = 50,
-    allowed_extensions: Optional[set] = None
-) -> Tuple[bool, Optional[str]]:
+# Leading bytes needed to identify an upload's container format
+SNIFF_BYTES = 12
+
+# Containers libsndfile reads, so their duration and sample rate are probed on
+# upload; browser recordings (WebM, MP4) are only decoded by the engine
+PROBED_CONTAINERS = ('wav', 'flac', 'ogg', 'mp3')
+UPLOAD_CONTAINERS = PROBED_CONTAINERS + ('webm', 'm4a')
+
+MIN_SAMPLE_RATE = 8000
+
+
+def sniff_audio_container(header: bytes) -> Optional[str]:
     """
-    Validate uploaded audio file
+    Identify an audio container from the first bytes of a file
 
     Args:
-        file: Uploaded file from Flask request
-        max_size_mb: Maximum file size in MB
-        allowed_extensions: Set of allowed file extensions (e.g., {'wav', 'mp3'})
+        header: At least SNIFF_BYTES leading bytes of the file
 
     Returns:
-        Tuple of (is_valid, error_message)
+        File extension of the container, or None if not a supported audio file
+    """
+    if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+        return 'wav'
+    if header[:4] == b'fLaC':
+        return 'flac'
+    if header[:4] == b'OggS':
+        return 'ogg'
+    if header[:3] == b'ID3':
+        return 'mp3'
+    # MPEG audio frame sync; a non-zero layer rules out AAC (ADTS) streams
+    if len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0 and header[1] & 0x06:
+        return 'mp3'
+    # EBML header of WebM/Matroska
+    if header[:4] == b'\x1a\x45\xdf\xa3':
+        return 'webm'
+    if header[4:8] == b'ftyp':
+        return 'm4a'
+    return None
+
+
+def validate_audio_content(
+    file_path: Path,
+    container: str,
+    max_duration_seconds: float = 60.0
+) -> Tuple[bool, Optional[str]]:
     """
-    if allowed_extensions is None:
-        allowed_extensions = {'wav', 'mp3', 'flac', 'ogg', 'webm'}
+    Validate an uploaded audio file by probing its header
 
-    # Check if file exists
-    if not file or file.filename == '':
-        return False, "No file provided"
+    Only the header is read, not the audio, so this is cheap enough for the
+    request thread.
 
-    # Check file extension
-    file_ext = Path(file.filename).suffix.lower().lstrip('.')
-    if file_ext not in allowed_extensions:
-        return False, f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
+    Args:
+        file_path: Path to the uploaded file
+        container: Container format from sniff_audio_container
+        max_duration_seconds: Maximum duration in seconds
+
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    if container not in PROBED_CONTAINERS:
+        return True, None
 
-    # Check file size (if we can determine it)
     try:
-        file.seek(0, 2)  # Seek to end
-        size_bytes = file.tell()
-        file.seek(0)  # Reset to beginning
+        info = sf.info(str(file_path))
+    except Exception as e:
+        logger.debug(f"Could not probe {file_path}: {e}")
+        return False, f"Could not read {container.upper()} audio file"
 
-        max_size_bytes = max_size_mb * 1024 * 1024
-        if size_bytes > max_size_bytes:
-            size_mb = size_bytes / (1024 * 1024)
-            return False, f"File too large ({size_mb:.1f}MB). Maximum: {max_size_mb}MB"
+    if info.frames <= 0:
+        return False, "Audio file contains no audio"
 
-        logger.debug(f"Audio file validated: {file.filename} ({size_bytes} bytes)")
-    except Exception as e:
-        logger.warning(f"Could not determine file size: {e}")
+    if info.samplerate < MIN_SAMPLE_RATE:
+        return False, f"Sample rate too low ({info.samplerate} Hz). Minimum: {MIN_SAMPLE_RATE} Hz"
+
+    if info.duration > max_duration_seconds:
+        return False, f"Audio too long ({info.duration:.1f}s). Maximum: {max_duration_seconds:g}s"
 
+    logger.debug(f"Audio file validated: {file_path.name} ({info.duration:.2f}s, {info.samplerate} Hz)")
     return True, None
 
 
@@ -93,40 +128,6 @@ def validate_text_input(
     return True, None
 
 
-def validate_sample_name(
-    sample_name: str,
-    samples_dir: Path
-) -> Tuple[bool, Optional[str]]:
-    """
-    Validate that a sample name exists
-
-    Args:
-        sample_name: Name of the sample (without extension)
-        samples_dir: Directory containing samples
-
-    Returns:
-        Tuple of (is_valid, error_message)
-    """
-    if not sample_name:
-        return False, "Sample name is required"
-
-    # Check for path traversal attempts
-    if '..' in sample_name or '/' in sample_name or '\\' in sample_name:
-        return False, "Invalid sample name"
-
-    # Check if sample files exist
-    wav_path = samples_dir / f"{sample_name}.wav"
-    txt_path = samples_dir / f"{sample_name}.txt"
-
-    if not wav_path.exists():
-        return False, f"Sample not found: {sample_name}"
-
-    if not txt_path.exists():
-        logger.warning(f"Sample {sample_name} missing .txt file")
-
-    return True, None
-
-
 def sanitize_filename(filename: str) -> str:
     """
     Sanitize filename to prevent path traversal and other issues
@@ -0,0 +1,180 @@
+import asyncio
+import io
+import json
+import time
+from unittest.mock import patch
+
+from werkzeug.datastructures import FileStorage
+from werkzeug.test import encode_multipart
+from src.api.asgi import create_asgi_app
+from src.services.session_manager import get_session_manager
+
+
+def http_scope(method, path, query=b"", headers=()):
+    """ASGI scope of an HTTP request"""
+    return {
+        "type": "http", "method": method, "path": path, "query_string": query,
+        "headers": list(headers), "http_version": "1.1", "root_path": "",
+        "server": ("testserver", 80), "scheme": "http",
+    }
+
+
+def call(app, method, path, query=b""):
+    """Run one HTTP request through the ASGI app and collect the response"""
+    sent = []
+
+    async def receive():
+        if not sent:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(10)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asyncio.wait_for(app(http_scope(method, path, query), receive, send), 5))
+    status = sent[0]["status"]
+    body = b"".join(message.get("body", b"") for message in sent[1:])
+    return status, body
+
+
+def post(app, path, chunks, headers=()):
+    """POST a body in chunks through the ASGI app; returns (status, body, chunks received)"""
+    sent, received = [], []
+
+    async def receive():
+        if len(received) < len(chunks):
+            received.append(chunks[len(received)])
+            return {"type": "http.request", "body": received[-1], "more_body": len(received) < len(chunks)}
+        await asyncio.sleep(10)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asyncio.wait_for(app(http_scope("POST", path, headers=headers), receive, send), 5))
+    body = b"".join(message.get("body", b"") for message in sent[1:])
+    return sent[0]["status"], json.loads(body), len(received)
+
+
+def test_progress_events_are_served_async():
+    app = create_asgi_app("testing")
+    session_manager = get_session_manager(app.config.SESSION_TIMEOUT_SECONDS)
+    session_manager.create_session("asgi-session")
+    session_manager.send_progress("asgi-session", 1, "Working...", 10)
+    session_manager.send_completion("asgi-session", "out.wav")
+
+    status, body = call(app, "GET", "/api/progress/asgi-session")
+
+    events = [json.loads(line[len("data: "):]) for line in body.decode().split("\n\n") if line]
+    assert status == 200
+    assert events[0]["progress"] == 10
+    assert events[-1]["complete"]
+    assert not session_manager.has_session("asgi-session")
+
+
+def test_only_the_first_progress_stream_cancels_on_disconnect():
+    app = create_asgi_app("testing")
+    session_manager = get_session_manager(app.config.SESSION_TIMEOUT_SECONDS)
+    session_manager.create_session("followed-session")
+
+    async def follow(leave):
+        async def receive():
+            await leave.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            pass
+
+        await app(http_scope("GET", "/api/progress/followed-session"), receive, send)
+
+    async def owner_then_watcher(cancel):
+        owner_leaves, watcher_leaves = asyncio.Event(), asyncio.Event()
+        owner = asyncio.ensure_future(follow(owner_leaves))
+        await asyncio.sleep(0.1)
+        watcher = asyncio.ensure_future(follow(watcher_leaves))
+        await asyncio.sleep(0.1)
+        watcher_leaves.set()
+        await watcher
+        cancelled_by_watcher = cancel.called
+        owner_leaves.set()
+        await owner
+        return cancelled_by_watcher
+
+    with patch("src.api.routes.synthesis.cancel_synthesis") as cancel:
+        cancelled_by_watcher = asyncio.run(asyncio.wait_for(owner_then_watcher(cancel), 5))
+
+    assert not cancelled_by_watcher
+    cancel.assert_called_once_with("followed-session", reason="progress stream disconnected")
+
+
+def test_stream_validation_errors_come_from_flask_handling():
+    app = create_asgi_app("testing")
+
+    status, body = call(app, "GET", "/api/stream", query=b"input_text=")
+
+    assert status == 400
+    assert "error" in json.loads(body)
+
+
+def test_other_routes_fall_through_to_flask():
+    app = create_asgi_app("testing")
+
+    status, body = call(app, "GET", "/health")
+
+    assert status == 200
+
+
+def test_flask_routes_run_concurrently():
+    app = create_asgi_app("testing")
+
+    @app.flask_app.route("/slow")
+    def slow():
+        time.sleep(0.5)
+        return "done"
+
+    async def slow_request():
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        await app(http_scope("GET", "/slow"), receive, send)
+        return sent[0]["status"]
+
+    async def three_requests():
+        return await asyncio.gather(*(slow_request() for _ in range(3)))
+
+    start = time.monotonic()
+    statuses = asyncio.run(asyncio.wait_for(three_requests(), 5))
+    elapsed = time.monotonic() - start
+
+    assert statuses == [200, 200, 200]
+    # One after the other would take at least 1.5s
+    assert elapsed < 1.2
+
+
+def test_oversized_bodies_are_rejected_while_receiving():
+    app = create_asgi_app("testing")
+    limit = app.config.MAX_CONTENT_LENGTH
+    chunks = [b"\0" * (limit // 4)] * 8
+
+    declared = post(app, "/api/synthesize", chunks, [(b"content-length", str(limit * 2).encode())])
+    streamed = post(app, "/api/synthesize", chunks)
+
+    assert declared[0] == 413 and declared[2] == 0
+    assert streamed[0] == 413 and streamed[2] == 5
+
+
+def test_uploads_are_checked_under_the_asgi_server():
+    app = create_asgi_app("testing")
+    boundary, body = encode_multipart({
+        "input_text": "Hello.", "ref_text": "Hi.", "ref_audio": FileStorage(io.BytesIO(b"<html></html>"), "voice.wav")
+    })
+    headers = [(b"content-type", f"multipart/form-data; boundary={boundary}".encode())]
+
+    status, payload, _ = post(app, "/api/synthesize", [body[:100], body[100:]], headers)
+
+    assert status == 400
+    assert payload["error"].startswith("Unsupported audio format")
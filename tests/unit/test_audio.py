@@ -0,0 +1,95 @@
+import io
+import struct
+import wave
+import numpy as np
+from src.utils.audio import CrossfadeJoiner, wav_header, float_to_pcm16, WAV_UNKNOWN_SIZE
+
+
+def test_wav_header_with_known_size_is_readable():
+    pcm = float_to_pcm16(np.array([0.0, 0.5, -0.5, 1.0], dtype=np.float32))
+    data = wav_header(24000, data_size=len(pcm)) + pcm
+
+    with wave.open(io.BytesIO(data)) as wav:
+        assert wav.getframerate() == 24000
+        assert wav.getnchannels() == 1
+        assert wav.getsampwidth() == 2
+        assert wav.getnframes() == 4
+
+
+def test_streaming_wav_header_uses_unknown_size():
+    header = wav_header(24000)
+    assert len(header) == 44
+    assert struct.unpack("<I", header[4:8])[0] == WAV_UNKNOWN_SIZE
+    assert struct.unpack("<I", header[40:44])[0] == WAV_UNKNOWN_SIZE
+
+
+def test_float_to_pcm16_clips():
+    pcm = np.frombuffer(float_to_pcm16(np.array([2.0, -2.0, 0.0])), dtype="<i2")
+    assert pcm.tolist() == [32767, -32767, 0]
+
+
+def test_negotiate_format_prefers_explicit_field_then_accept_header():
+    from werkzeug.datastructures import MIMEAccept
+    from src.utils.audio import negotiate_format
+
+    assert negotiate_format("ogg").name == "opus"
+    assert negotiate_format("nope") is None
+    assert negotiate_format(None, MIMEAccept([("audio/flac", 1)])).name == "flac"
+    assert negotiate_format(None, MIMEAccept([("*/*", 1)])).name == "wav"
+    assert negotiate_format(None, MIMEAccept([("*/*", 1)]), default="opus").name == "opus"
+    assert negotiate_format(None, MIMEAccept([("application/json", 1)])).name == "wav"
+
+
+def test_audio_file_writer_encodes_incrementally(tmp_path):
+    import soundfile as sf
+    from src.utils.audio import AUDIO_FORMATS, AudioFileWriter
+
+    target = tmp_path / "out.flac"
+    with AudioFileWriter(target, AUDIO_FORMATS["flac"], 24000) as writer:
+        writer.write(np.zeros(1000, dtype=np.float32))
+        writer.write(np.full(500, 0.25, dtype=np.float32))
+        assert not target.exists()
+
+    data, sample_rate = sf.read(str(target))
+    assert sample_rate == 24000
+    assert len(data) == 1500
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_encode_stream_opus_is_decodable():
+    import soundfile as sf
+    from src.utils.audio import AUDIO_FORMATS, encode_stream
+
+    chunks = [np.sin(np.arange(12000) / 10).astype(np.float32) * 0.3] * 3
+    encoded = b"".join(encode_stream(iter(chunks), AUDIO_FORMATS["opus"], 24000))
+
+    data, sample_rate = sf.read(io.BytesIO(encoded))
+    assert sample_rate == 24000
+    assert abs(len(data) - 36000) < 2400
+
+
+def test_audio_file_writer_flush_leaves_valid_partial_file(tmp_path):
+    import soundfile as sf
+    from src.utils.audio import AUDIO_FORMATS, AudioFileWriter
+
+    writer = AudioFileWriter(tmp_path / "out.wav", AUDIO_FORMATS["wav"], 24000)
+    writer.write(np.full(2400, 0.5, dtype=np.float32))
+    writer.flush()
+
+    (partial,) = tmp_path.glob("*.part")
+    assert sf.info(str(partial)).frames == 2400
+
+    writer.abort()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_crossfade_joiner_blends_chunk_boundaries():
+    joiner = CrossfadeJoiner(4)
+
+    parts = [joiner.push(np.zeros(10, dtype=np.float32)), joiner.push(np.ones(10, dtype=np.float32))]
+    parts.append(joiner.flush())
+    joined = np.concatenate(parts)
+
+    assert len(joined) == 16
+    assert np.all(joined[:6] == 0.0) and np.all(joined[10:] == 1.0)
+    assert np.all(np.diff(joined[5:11]) > 0)
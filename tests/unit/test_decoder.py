@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from src.tts.decoder import SpeechDecoder
+
+
+class FakeOnnxCodec:
+    """Decodes every code to 3 samples and records batch shapes"""
+
+    def __init__(self):
+        self.calls = []
+
+    def decode_code(self, codes):
+        self.calls.append(codes.shape)
+        return np.repeat(codes.astype(np.float32), 3, axis=-1)
+
+
+def test_parse_codes():
+    assert SpeechDecoder.parse_codes("<|speech_4|>x<|speech_12|>") == [4, 12]
+    assert SpeechDecoder.parse_codes("no speech") == []
+
+
+def test_decode_batch_matches_single_decodes_and_order():
+    codec = FakeOnnxCodec()
+    decoder = SpeechDecoder(codec, is_onnx=True)
+    sequences = [[1] * 20, [2] * 10, [3] * 21, [4] * 11]
+
+    wavs = decoder.decode_batch(sequences, max_batch_size=8, max_pad_ratio=0.1)
+
+    for seq, wav in zip(sequences, wavs):
+        np.testing.assert_array_equal(wav, decoder.decode_tokens(seq))
+    # Two buckets: lengths {10, 11} and {20, 21}
+    assert codec.calls[:2] == [(2, 1, 11), (2, 1, 21)]
+
+
+def test_decode_batch_rejects_empty_sequence():
+    decoder = SpeechDecoder(FakeOnnxCodec(), is_onnx=True)
+    with pytest.raises(ValueError):
+        decoder.decode_batch([[1, 2], []])
@@ -0,0 +1,151 @@
+import time
+from unittest.mock import MagicMock
+import numpy as np
+import pytest
+from src.models.synthesis_request import SynthesisRequest
+from src.services.engine_pool import EngineProcessPool
+from src.services.tts_service import TTSService
+from src.utils.cancellation import CancellationToken, SynthesisCancelled
+
+
+class FakeEngine:
+    """Picklable engine stand-in loaded inside the worker process"""
+
+    sample_rate = 24000
+    supports_streaming = True
+
+    def __init__(self, scale=1.0):
+        self.scale = scale
+
+    def encode_reference(self, path):
+        return np.arange(3)
+
+    def generate_codes(self, text, ref_codes, ref_text, language="en-us", cancel_token=None):
+        if text == "fail":
+            raise ValueError("bad text")
+        return [len(text)] * 2
+
+    def infer_stream(self, text, ref_codes, ref_text, language="en-us", cancel_token=None):
+        for i in range(1000):
+            cancel_token.raise_if_cancelled()
+            yield np.full(4, i * self.scale, dtype=np.float32)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = EngineProcessPool(num_processes=1, engine_factory=FakeEngine, scale=2.0)
+    yield pool
+    pool.close()
+
+
+def test_calls_run_in_engine_process(pool):
+    assert pool.supports_streaming
+    np.testing.assert_array_equal(pool.encode_reference("ref.wav"), [0, 1, 2])
+    assert pool.generate_codes("abc", [0], "ref", cancel_token=CancellationToken()) == [3, 3]
+
+    with pytest.raises(ValueError, match="bad text"):
+        pool.generate_codes("fail", [0], "ref")
+
+
+def test_abandoned_stream_keeps_process_usable(pool):
+    chunks = pool.infer_stream("abc", [0], "ref")
+    assert next(chunks)[0] == 0.0
+    assert next(chunks)[0] == 2.0
+    chunks.close()
+
+    # The process drained the cancelled stream and answers new calls
+    assert pool.generate_codes("ab", [0], "ref") == [2, 2]
+
+
+def test_cancel_token_stops_stream_in_process(pool):
+    token = CancellationToken()
+    chunks = pool.infer_stream("abc", [0], "ref", cancel_token=token)
+    next(chunks)
+    token.cancel()
+    with pytest.raises(SynthesisCancelled):
+        for _ in chunks:
+            pass
+
+
+class SlowLoadingEngine(FakeEngine):
+    """Engine whose model takes a while to load"""
+
+    def __init__(self, scale=1.0):
+        time.sleep(2.0)
+        super().__init__(scale)
+
+
+def test_engine_processes_load_in_parallel():
+    start = time.monotonic()
+    pool = EngineProcessPool(num_processes=2, engine_factory=SlowLoadingEngine)
+    elapsed = time.monotonic() - start
+    pool.close()
+
+    # One after the other would take at least 4s
+    assert elapsed < 3.5
+
+
+def test_checkout_times_out_when_no_process_is_idle(pool):
+    chunks = pool.infer_stream("abc", [0], "ref")
+    next(chunks)
+    pool.checkout_timeout = 0.3
+    try:
+        with pytest.raises(TimeoutError):
+            pool.generate_codes("ab", [0], "ref")
+    finally:
+        pool.checkout_timeout = 300.0
+        chunks.close()
+
+
+class ServiceEngine(FakeEngine):
+    """Engine with everything a synthesis job calls, streaming a few chunks"""
+
+    def generate_codes_batch(self, texts, ref_codes, ref_text, language="en-us", cancel_token=None):
+        return [[len(text)] * 2 for text in texts]
+
+    def decode_batch(self, code_sequences):
+        return [np.full(100, 0.1, dtype=np.float32) for _ in code_sequences]
+
+    def watermark(self, wav):
+        return wav
+
+    def infer_stream(self, text, ref_codes, ref_text, language="en-us", cancel_token=None):
+        for i in range(3):
+            time.sleep(0.05)
+            yield np.full(100, i, dtype=np.float32)
+
+
+def test_stream_and_concurrent_job_share_one_process(tmp_path):
+    pool = EngineProcessPool(num_processes=1, engine_factory=ServiceEngine, checkout_timeout=10.0)
+    session_manager = MagicMock()
+    service = TTSService(session_manager, tmp_path, num_workers=1)
+    service._tts_engine = pool
+    ref = tmp_path / "ref.wav"
+    ref.touch()
+
+    def make_request(text, session_id):
+        return SynthesisRequest(
+            input_text=text, ref_text="ref", ref_audio_path=ref, max_tokens=20, session_id=session_id
+        )
+
+    try:
+        text = "A longer streamed text, so the queued job is cheaper."
+        chunks = service.synthesize_stream_async(make_request(text, "stream"))
+        # Queue the job once the stream holds the engine process
+        received = [next(chunks)]
+        service.synthesize_async(make_request("Queued.", "queued"))
+        received.extend(chunks)
+
+        deadline = time.monotonic() + 10
+        while not session_manager.send_completion.called and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        service.shutdown()
+        pool.close()
+
+    assert received and len(received) % 3 == 0
+    session_manager.send_error.assert_not_called()
+    session_manager.send_completion.assert_called_once()
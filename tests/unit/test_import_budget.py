@@ -0,0 +1,15 @@
+import pytest
+from src.utils.import_profile import WEB_TIER_IMPORT_BUDGET_SECONDS, profile_imports
+
+
+@pytest.fixture(scope="module")
+def web_profile():
+    return profile_imports()
+
+
+def test_web_tier_does_not_import_ml_stack(web_profile):
+    assert web_profile.engine_modules() == []
+
+
+def test_web_tier_import_time_within_budget(web_profile):
+    assert web_profile.seconds < WEB_TIER_IMPORT_BUDGET_SECONDS, web_profile.slowest[:10]
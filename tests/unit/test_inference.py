@@ -0,0 +1,78 @@
+import pytest
+from src.tts.inference import GGMLInference
+from src.utils.cancellation import CancellationToken, SynthesisCancelled
+
+
+class FakeLlama:
+    """Tiny stand-in for llama_cpp.Llama with a handful of special tokens"""
+
+    vocab = [b"<eos>", b"hello", b"<|SPEECH_GENERATION_END|>"] + [
+        f"<|speech_{i}|>".encode() for i in range(8)
+    ]
+
+    def __init__(self, generated=()):
+        self.generated = generated
+        self.tokenized = []
+
+    def n_vocab(self):
+        return len(self.vocab)
+
+    def detokenize(self, tokens, special=False):
+        return b"".join(self.vocab[t] for t in tokens)
+
+    def tokenize(self, text, add_bos=True, special=False):
+        self.tokenized.append(text)
+        if text in self.vocab:
+            return [self.vocab.index(text)]
+        return [1]
+
+    def token_eos(self):
+        return 0
+
+    def generate(self, tokens, **kwargs):
+        yield from self.generated
+
+
+def speech(code):
+    """Token ID of <|speech_{code}|> in FakeLlama's vocabulary"""
+    return 3 + code
+
+
+def test_infer_stream_yields_codes_until_speech_end():
+    llama = FakeLlama([speech(5), 1, speech(0), speech(7), 2, speech(1)])
+    engine = GGMLInference(llama, max_context=64)
+
+    assert list(engine.infer_stream([1, 2], "ref", "text")) == [5, 0, 7]
+
+
+def test_infer_stream_respects_context_window():
+    llama = FakeLlama([3] * 100)
+    engine = GGMLInference(llama, max_context=10)
+
+    # Prompt is 4 tokens, so at most 6 new tokens fit in the context
+    assert len(list(engine.infer_stream([], "ref", "text"))) == 6
+
+
+def test_infer_stream_stops_when_cancelled():
+    llama = FakeLlama([3] * 100)
+    engine = GGMLInference(llama, max_context=200)
+    token = CancellationToken()
+
+    codes = engine.infer_stream([], "ref", "text", cancel_token=token)
+    next(codes)
+    token.cancel()
+    with pytest.raises(SynthesisCancelled):
+        next(codes)
+
+
+def test_prompt_tokens_cache_voice_and_map_reference_codes():
+    llama = FakeLlama()
+    engine = GGMLInference(llama)
+
+    prompt = engine.create_prompt_tokens([2, 0, 7], "ref", "one")
+    assert prompt[-3:] == [3 + 2, 3 + 0, 3 + 7]
+
+    llama.tokenized.clear()
+    engine.create_prompt_tokens([2, 0, 7], "ref", "two")
+    # Only the input text is tokenized for a cached voice
+    assert llama.tokenized == [b" two"]
@@ -0,0 +1,136 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from src.services.job_queue import Job, JobQueue, QueueFullError, PRIORITY_BATCH
+
+
+def test_rejects_jobs_beyond_queue_size():
+    queue = JobQueue(MagicMock(), num_workers=1, max_queue_size=2, initial_seconds_per_cost=10)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+
+    queue.submit(Job("running", blocking))
+    started.wait(5)
+    assert queue.submit(Job("a", lambda: None)) == 1
+    assert queue.submit(Job("b", lambda: None)) == 2
+
+    with pytest.raises(QueueFullError) as exc_info:
+        queue.submit(Job("c", lambda: None))
+    # Backlog of three unit-cost jobs spread over two queue slots
+    assert exc_info.value.retry_after == 15
+
+    release.set()
+    queue.stop()
+
+
+def test_publishes_positions_and_runs_jobs():
+    session_manager = MagicMock()
+    queue = JobQueue(session_manager, num_workers=1, max_queue_size=4, initial_seconds_per_cost=3)
+    release = threading.Event()
+    started = threading.Event()
+    done = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+
+    queue.submit(Job("running", blocking))
+    started.wait(5)
+    queue.submit(Job("waiting", done.set, session_id="s1"))
+
+    # One unit-cost job ahead on the only worker
+    session_manager.send_queue_status.assert_called_with("s1", 1, 3)
+
+    release.set()
+    assert done.wait(5)
+    queue.stop()
+
+
+def run_in_order(queue, jobs):
+    """Queue jobs behind a blocker, then wait until all of them have run"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+
+    queue.submit(Job("blocker", blocking))
+    started.wait(5)
+    for job in jobs:
+        queue.submit(job)
+    release.set()
+
+    finished = threading.Event()
+    queue.submit(Job("last", finished.set, priority=PRIORITY_BATCH, cost=1e9))
+    assert finished.wait(5)
+    queue.stop()
+
+
+def test_orders_by_priority_class_then_cost():
+    order = []
+    record = lambda name: (lambda: order.append(name))
+    run_in_order(JobQueue(MagicMock()), [
+        Job("batch-short", record("batch-short"), priority=PRIORITY_BATCH, cost=1),
+        Job("long", record("long"), cost=500),
+        Job("short", record("short"), cost=5),
+    ])
+    assert order == ["short", "long", "batch-short"]
+
+
+def test_aging_promotes_long_waiting_jobs():
+    order = []
+    record = lambda name: (lambda: order.append(name))
+    old_batch = Job("old-batch", record("old-batch"), priority=PRIORITY_BATCH, cost=100)
+    old_batch.enqueued_at -= 120
+    run_in_order(JobQueue(MagicMock(), aging_seconds=60), [
+        Job("new", record("new"), cost=100),
+        old_batch,
+    ])
+    assert order == ["old-batch", "new"]
+
+
+def test_long_jobs_interleave_with_short_ones():
+    queue = JobQueue(MagicMock())
+    order = []
+
+    def long_steps():
+        for i in range(3):
+            order.append(f"long-{i}")
+            if i == 0:
+                queue.submit(Job("short", lambda: order.append("short"), cost=150))
+            yield (i + 1) / 3
+
+    run_in_order(queue, [Job("long", long_steps, cost=300)])
+    # After its first step the long job has 200 left, more than the short job
+    assert order == ["long-0", "short", "long-1", "long-2"]
+
+
+def test_cancel_drops_waiting_job():
+    queue = JobQueue(MagicMock())
+    ran = []
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+
+    queue.submit(Job("blocker", blocking))
+    started.wait(5)
+    job = Job("job", lambda: ran.append(True))
+    queue.submit(job)
+
+    assert queue.cancel("job")
+    assert job.cancel_token.cancelled
+    assert not queue.cancel("job")
+    assert len(queue) == 0
+
+    release.set()
+    queue.stop()
+    assert ran == []
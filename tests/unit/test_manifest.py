@@ -0,0 +1,38 @@
+from src.utils.manifest import parse_manifest
+
+
+def test_parse_jsonl_manifest_with_default_ids():
+    content = '{"id": "intro", "text": "Hello there."}\n\n{"text": "Second line."}\n'
+
+    items, error = parse_manifest(content, "prompts.jsonl")
+
+    assert error is None
+    assert [(item.item_id, item.input_text) for item in items] == [
+        ("intro", "Hello there."), ("3", "Second line.")
+    ]
+
+
+def test_parse_csv_manifest():
+    content = "id,text\na,\"Hello, world.\"\nb,Goodbye.\n"
+
+    items, error = parse_manifest(content, "prompts.csv")
+
+    assert error is None
+    assert [item.input_text for item in items] == ["Hello, world.", "Goodbye."]
+
+
+def test_parse_text_manifest_one_text_per_line():
+    items, error = parse_manifest("{Braces} are text here.\n\nSecond.\n", "prompts.txt")
+
+    assert error is None
+    assert [(item.item_id, item.input_text) for item in items] == [
+        ("1", "{Braces} are text here."), ("3", "Second.")
+    ]
+
+
+def test_parse_manifest_rejects_bad_input():
+    assert parse_manifest('{"text": "a"}\nnot json\n')[1].startswith("Line 2")
+    assert parse_manifest("name\nHello\n", "x.csv")[1] == "CSV header must contain a 'text' column"
+    assert "duplicate id" in parse_manifest('{"id": 1, "text": "a"}\n{"id": 1, "text": "b"}\n')[1]
+    assert "limit is 1" in parse_manifest('{"text": "a"}\n{"text": "b"}\n', max_items=1)[1]
+    assert parse_manifest("", "x.jsonl")[1] == "Manifest contains no items"
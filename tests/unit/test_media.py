@@ -0,0 +1,15 @@
+import os
+
+from src.api.routes.media import _accel_path
+
+
+def test_accel_path_resolves_both_sides(tmp_path, monkeypatch):
+    output_folder = tmp_path / "outputs"
+    (output_folder / "ab").mkdir(parents=True)
+    (tmp_path / "data").symlink_to(tmp_path)
+    monkeypatch.chdir(tmp_path)
+
+    assert _accel_path(output_folder / "ab" / "x.wav", "outputs") == "ab/x.wav"
+    assert _accel_path(tmp_path / "data" / "outputs" / "x.wav", output_folder) == "x.wav"
+    assert _accel_path(tmp_path / "batch.zip", output_folder) is None
+    assert _accel_path(os.path.join("outputs", "..", "x.wav"), output_folder) is None
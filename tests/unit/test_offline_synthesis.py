@@ -0,0 +1,66 @@
+import json
+from concurrent.futures import Future
+import numpy as np
+import soundfile as sf
+from src.models.synthesis_request import BatchItem
+from src.services.offline_synthesis import plan_workers, resolve_voice, run_offline_synthesis
+
+
+class FakeEngine:
+    """Picklable engine stand-in loaded inside each worker process"""
+
+    def encode_reference(self, path):
+        return np.arange(4)
+
+    def generate_codes_batch(self, texts, ref_codes, ref_text, language="en-us", cancel_token=None):
+        return [[] if text == "fail." else [len(text)] * 2 for text in texts]
+
+    def decode_batch(self, code_sequences):
+        return [np.full(100, 0.1, dtype=np.float32) for _ in code_sequences]
+
+    def watermark_async(self, wav):
+        future = Future()
+        future.set_result(wav)
+        return future
+
+
+def test_plan_workers_splits_cores():
+    assert plan_workers(16) == (4, 4)
+    assert plan_workers(16, workers=8) == (8, 2)
+    assert plan_workers(16, threads=1) == (16, 1)
+    assert plan_workers(2) == (1, 2)
+
+
+def test_resolve_voice_prefers_precomputed_sample_codes(tmp_path):
+    (tmp_path / "nested").mkdir()
+    for suffix in (".wav", ".pt"):
+        (tmp_path / "nested" / f"dave{suffix}").touch()
+    (tmp_path / "nested" / "dave.txt").write_text("Hello there.")
+
+    voice, error = resolve_voice("dave", tmp_path)
+
+    assert error is None
+    assert voice.ref_codes_path == tmp_path / "nested" / "dave.pt"
+    assert voice.ref_text == "Hello there."
+    assert resolve_voice("nobody", tmp_path)[1] == "Sample not found: nobody"
+
+
+def test_offline_run_writes_outputs_manifest_and_summary(tmp_path):
+    ref = tmp_path / "ref.wav"
+    ref.touch()
+    voice, _ = resolve_voice(str(ref), tmp_path, ref_text="ref")
+    items = [BatchItem(str(i), "fail." if i == 3 else f"Item number {i}.") for i in range(7)]
+
+    summary = run_offline_synthesis(
+        items, voice, tmp_path / "out", engine_kwargs={},
+        workers=2, threads_per_worker=1, generation_batch_size=2,
+        engine_factory=FakeEngine
+    )
+
+    assert (summary.completed, summary.failed) == (6, 1)
+    assert summary.audio_seconds == round(6 * 100 / 24000, 3)
+    entries = [json.loads(line) for line in (tmp_path / "out" / "manifest.jsonl").read_text().splitlines()]
+    assert [entry["id"] for entry in entries] == [str(i) for i in range(7)]
+    assert entries[3]["status"] == "failed"
+    assert sf.info(str(tmp_path / "out" / "0.wav")).frames == 100
+    assert json.loads((tmp_path / "out" / "summary.json").read_text())["items"] == 7
@@ -0,0 +1,67 @@
+import numpy as np
+import soundfile as sf
+from src.services.output_store import OutputStore, hash_text
+from src.utils.audio import AUDIO_FORMATS
+
+
+def job_entry(store, job_id):
+    """Indexed (voice, format) of a job's output, or None"""
+    return store._connection().execute(
+        "SELECT voice, format FROM output_jobs WHERE job_id = ?", (job_id,)
+    ).fetchone()
+
+
+def write_output(path, value, flac=False):
+    wav = np.full(240, value, dtype=np.float32)
+    sf.write(str(path), wav, 24000, subtype="PCM_16")
+    if flac:
+        sf.write(str(path.with_suffix(".flac")), wav, 24000, format="FLAC")
+    return path
+
+
+def test_identical_outputs_are_stored_once(tmp_path):
+    store = OutputStore(tmp_path / "outputs", tmp_path / "outputs.db")
+
+    first = store.add(
+        write_output(tmp_path / "outputs" / "output_a.wav", 0.1), "a",
+        voice="dave.wav", text_hash=hash_text("Hello."), duration=0.01
+    )
+    second = store.add(
+        write_output(tmp_path / "outputs" / "output_b.wav", 0.1, flac=True), "b",
+        output_format="flac", voice="dave.wav", text_hash=hash_text("Hello."), duration=0.01
+    )
+    other = store.add(write_output(tmp_path / "outputs" / "output_c.wav", 0.2), "c")
+
+    assert first.digest == second.digest != other.digest
+    assert second.filename == f"{first.digest}.flac"
+    assert sorted(p.name for p in (tmp_path / "outputs").rglob("*.*")) == sorted([
+        f"{first.digest}.wav", f"{first.digest}.flac", f"{other.digest}.wav"
+    ])
+    assert job_entry(store, "b") == ("dave.wav", "flac")
+    assert job_entry(store, "a") == ("dave.wav", "wav")
+
+
+def test_resolve_returns_master_for_variants_not_yet_encoded(tmp_path):
+    store = OutputStore(tmp_path / "outputs", tmp_path / "outputs.db")
+    record = store.add(write_output(tmp_path / "outputs" / "output_a.wav", 0.1), "a")
+    master = store.path_for(record.digest, AUDIO_FORMATS["wav"])
+
+    assert store.resolve(f"{record.digest}.wav") == master
+    assert store.resolve(f"{record.digest}.opus") == master
+    assert store.resolve("output_a.wav") is None
+    assert store.resolve(f"../{record.digest}.wav") is None
+
+
+def test_discard_removes_all_formats_and_index_entries(tmp_path):
+    store = OutputStore(tmp_path / "outputs", tmp_path / "outputs.db")
+    record = store.add(
+        write_output(tmp_path / "outputs" / "output_a.wav", 0.1, flac=True), "a", output_format="flac"
+    )
+    master = store.path_for(record.digest, AUDIO_FORMATS["wav"])
+    master.unlink()
+
+    assert store.discard(master)
+    assert not store.path_for(record.digest, AUDIO_FORMATS["flac"]).exists()
+    assert job_entry(store, "a") is None
+    assert store.resolve(record.filename) is None
+    assert not store.discard(master)
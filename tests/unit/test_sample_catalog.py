@@ -0,0 +1,64 @@
+import numpy as np
+import soundfile as sf
+from src.api.app import create_app
+from src.services.sample_catalog import SampleCatalog
+
+
+def add_sample(directory, name, transcript=None, codes=False):
+    directory.mkdir(parents=True, exist_ok=True)
+    sf.write(str(directory / f"{name}.wav"), np.zeros(12000, dtype=np.float32), 24000)
+    if transcript is not None:
+        (directory / f"{name}.txt").write_text(transcript)
+    if codes:
+        (directory / f"{name}.pt").write_bytes(b"codes")
+
+
+def test_catalog_lists_samples_in_subdirectories(tmp_path):
+    add_sample(tmp_path / "samples", "dave", "Hello there.", codes=True)
+    add_sample(tmp_path, "jo")
+    catalog = SampleCatalog(tmp_path, check_interval=0)
+
+    dave = catalog.get("dave")
+    payload, etag = catalog.listing()
+
+    assert dave.transcript == "Hello there."
+    assert dave.duration == 0.5
+    assert dave.reference_path == tmp_path / "samples" / "dave.pt"
+    assert catalog.get("jo").reference_path == tmp_path / "jo.wav"
+    assert sorted(sample["name"] for sample in payload["samples"]) == ["dave", "jo"]
+    assert etag and catalog.listing()[1] == etag
+
+
+def test_catalog_reloads_when_the_tree_changes(tmp_path):
+    add_sample(tmp_path / "samples", "dave", "Hello there.")
+    catalog = SampleCatalog(tmp_path, check_interval=0)
+    _, etag = catalog.listing()
+
+    (tmp_path / "samples" / "dave.txt").write_text("Something else entirely.")
+    add_sample(tmp_path / "samples", "jo", "Hi.")
+
+    assert catalog.get("dave").transcript == "Something else entirely."
+    assert catalog.get("jo") is not None
+    assert catalog.listing()[1] != etag
+
+
+def test_catalog_checks_for_changes_at_most_every_interval(tmp_path):
+    add_sample(tmp_path, "dave", "Hello there.")
+    catalog = SampleCatalog(tmp_path, check_interval=60)
+    catalog.listing()
+
+    add_sample(tmp_path, "jo", "Hi.")
+
+    assert catalog.get("jo") is None
+    catalog.invalidate()
+    assert catalog.get("jo") is not None
+
+
+def test_samples_endpoint_revalidates_with_etag():
+    client = create_app("testing").test_client()
+
+    first = client.get("/api/samples")
+    second = client.get("/api/samples", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200 and "samples" in first.get_json()
+    assert second.status_code == 304
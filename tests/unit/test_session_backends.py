@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from src.services.session_backends import create_session_backend
+from src.services.session_manager import SessionManager
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    return create_session_backend(request.param, tmp_path / "sessions.db")
+
+
+def test_updates_are_delivered_in_order(backend):
+    backend.create("s1")
+    backend.publish("s1", {"progress": 10})
+    backend.publish("s1", {"progress": 20})
+
+    assert backend.get("s1", timeout=1) == {"progress": 10}
+    assert backend.get("s1", timeout=1) == {"progress": 20}
+    assert backend.get("s1", timeout=0.05) is None
+    assert not backend.publish("unknown", {"progress": 10})
+
+
+def test_blocked_reader_wakes_on_publish(backend):
+    backend.create("s1")
+    threading.Timer(0.1, backend.publish, args=("s1", {"complete": True})).start()
+
+    start = time.monotonic()
+    update = backend.get("s1", timeout=5)
+
+    assert update == {"complete": True}
+    assert time.monotonic() - start < 2
+
+
+def test_async_reader_wakes_on_publish(backend):
+    backend.create("s1")
+    threading.Timer(0.1, backend.publish, args=("s1", {"complete": True})).start()
+
+    assert asyncio.run(backend.get_async("s1", timeout=5)) == {"complete": True}
+
+
+def test_expire_removes_old_sessions(backend):
+    backend.create("s1")
+
+    assert backend.expire(time.time() + 1) == ["s1"]
+    assert not backend.exists("s1")
+    assert backend.count() == 0
+
+
+def test_sqlite_sessions_are_shared_between_processes(tmp_path):
+    # Separate backend instances stand in for separate web processes
+    front = SessionManager(backend=create_session_backend("sqlite", tmp_path / "sessions.db"))
+    worker = SessionManager(backend=create_session_backend("sqlite", tmp_path / "sessions.db"))
+
+    front.create_session("s1")
+    assert worker.send_progress("s1", 1, "Working...", 10)
+    assert worker.send_completion("s1", "out.wav")
+
+    assert front.get_progress("s1", timeout=1)["progress"] == 10
+    assert front.get_progress("s1", timeout=1)["complete"]
+    assert worker.delete_session("s1")
+    assert front.get_progress("s1", timeout=1) == {"error": "Invalid session ID"}
+
+
+def test_sessions_expire_on_inactivity_not_age(backend):
+    manager = SessionManager(timeout_seconds=1, backend=backend)
+    manager.create_session("running")
+    manager.create_session("queued")
+    manager.create_session("idle")
+    time.sleep(0.7)
+    manager.send_progress("running", 1, "Working...", 10)
+    time.sleep(0.7)
+
+    # A long job keeps its session even between progress updates
+    assert manager.cleanup_old_sessions(active_session_ids=["queued"]) == 1
+    assert not manager.has_session("idle")
+    assert manager.send_progress("running", 2, "Working...", 20)
+    assert manager.send_completion("queued", "out.wav")
@@ -0,0 +1,51 @@
+import os
+import time
+from unittest.mock import MagicMock
+from src.services.storage_reaper import StoragePolicy, StorageReaper
+from src.utils.helpers import sharded_path
+
+
+def write_file(directory, name, size, age):
+    path = sharded_path(directory, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    used = time.time() - age
+    os.utime(path, (used, used))
+    return path
+
+
+def test_sweep_deletes_expired_then_least_recently_used_files(tmp_path):
+    old = write_file(tmp_path, "old.wav", 100, age=7200)
+    stale = write_file(tmp_path, "stale.wav", 100, age=3000)
+    recent = write_file(tmp_path, "recent.wav", 100, age=1200)
+    fresh = write_file(tmp_path, "fresh.wav", 100, age=10)
+    deleted = []
+    policy = StoragePolicy(
+        tmp_path, max_bytes=150, max_age_seconds=3600, grace_seconds=600, on_delete=deleted.append
+    )
+
+    stats = StorageReaper([policy]).sweep(policy)
+
+    assert stats.files == 4
+    assert deleted == [old, stale, recent]
+    assert stats.used_bytes == 100
+    assert fresh.exists()
+
+
+def test_recently_used_and_partial_files_are_kept_over_quota(tmp_path):
+    partial = write_file(tmp_path, ".output_1.wav.job.part", 500, age=1200)
+    recent = write_file(tmp_path, "recent.wav", 100, age=10)
+    policy = StoragePolicy(tmp_path, max_bytes=50, max_age_seconds=3600)
+
+    stats = StorageReaper([policy]).sweep(policy)
+
+    assert stats.deleted == 0
+    assert partial.exists() and recent.exists()
+
+
+def test_run_once_expires_sessions_except_those_of_active_jobs():
+    session_manager = MagicMock()
+
+    StorageReaper([], session_manager, active_sessions=lambda: ["job-1"]).run_once()
+
+    session_manager.cleanup_old_sessions.assert_called_once_with(["job-1"])
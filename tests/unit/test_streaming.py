@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from src.tts.streaming import CodeRingBuffer, StreamingProcessor
+from src.tts.utils import linear_overlap_add
+
+
+class FakeDecoder:
+    """Maps each code to `hop` samples so windows are easy to check"""
+
+    def __init__(self, hop):
+        self.hop = hop
+
+    def decode_tokens(self, token_ids):
+        return np.repeat(np.asarray(token_ids, dtype=np.float32) + 1.0, self.hop)
+
+
+class NoWatermark:
+    def apply_watermark(self, wav, sample_rate):
+        return wav
+
+
+def reference_stream(processor, fragments, ref_codes):
+    """Original list-based implementation, kept to check equivalence"""
+    p = processor
+    cache = list(ref_codes)
+    audio_cache = []
+    n_samples, n_tokens = 0, len(ref_codes)
+    for code in fragments:
+        cache.append(code)
+        if len(cache[n_tokens:]) >= p.frames_per_chunk + p.lookforward:
+            start = max(n_tokens - p.lookback - p.overlap_frames, 0)
+            end = n_tokens + p.frames_per_chunk + p.lookforward + p.overlap_frames
+            s0 = (n_tokens - start) * p.hop_length
+            s1 = s0 + (p.frames_per_chunk + 2 * p.overlap_frames) * p.hop_length
+            audio_cache.append(p.decoder.decode_tokens(cache[start:end])[s0:s1])
+            out = linear_overlap_add(audio_cache, stride=p.stride_samples)
+            new_end = len(audio_cache) * p.stride_samples
+            yield out[n_samples:new_end]
+            n_samples = new_end
+            n_tokens += p.frames_per_chunk
+    remaining = len(cache) - n_tokens
+    if remaining > 0:
+        start = max(len(cache) - (p.lookback + p.overlap_frames + remaining), 0)
+        s0 = (len(cache) - start - remaining - p.overlap_frames) * p.hop_length
+        audio_cache.append(p.decoder.decode_tokens(cache[start:])[s0:])
+        yield linear_overlap_add(audio_cache, stride=p.stride_samples)[n_samples:]
+
+
+def test_ring_buffer_windows_are_contiguous_across_wraparound():
+    ring = CodeRingBuffer(4)
+    ring.extend([10, 11, 12])
+    ring.append(13)
+    ring.append(14)  # overwrites 10
+
+    assert len(ring) == 5
+    np.testing.assert_array_equal(ring.window(1, 5), [11, 12, 13, 14])
+    np.testing.assert_array_equal(ring.window(3, 99), [13, 14])
+
+    with pytest.raises(IndexError):
+        ring.window(0, 3)
+
+
+def test_ring_buffer_extend_keeps_only_tail():
+    ring = CodeRingBuffer(3)
+    ring.extend(range(10))
+    assert len(ring) == 10
+    np.testing.assert_array_equal(ring.window(7, 10), [7, 8, 9])
+
+
+@pytest.mark.parametrize("n_generated", [3, 12, 40])
+def test_process_stream_matches_reference(n_generated):
+    processor = StreamingProcessor(
+        decoder=FakeDecoder(hop=4),
+        watermarker=NoWatermark(),
+        hop_length=4,
+        frames_per_chunk=5,
+        lookforward=2,
+        lookback=6,
+        overlap_frames=1,
+    )
+    ref_codes = list(range(100, 120))
+    generated = list(range(n_generated))
+
+    expected = list(reference_stream(processor, generated, ref_codes))
+    actual = list(processor.process_stream(iter(generated), ref_codes))
+
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        np.testing.assert_allclose(got, want, rtol=1e-6)
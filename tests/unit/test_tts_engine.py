@@ -1,6 +1,9 @@
+import time
+
 import pytest
 from unittest.mock import MagicMock, patch
 from src.tts.engine import NeuTTSAir
+from src.tts import weights
 
 @patch('src.tts.engine.Phonemizer')
 def test_get_phonemizer(mock_phonemizer_cls):
@@ -20,4 +23,127 @@ def test_get_phonemizer(mock_phonemizer_cls):
         
         # Call with different language should create new instance
         engine.get_phonemizer("fr-fr")
-        mock_phonemizer_cls.assert_called_with(language="fr-fr")
\ No newline at end of file
+        mock_phonemizer_cls.assert_called_with(language="fr-fr")
+
+def test_components_load_concurrently_with_timings():
+    loading = set()
+    overlapped = []
+
+    def loader(name):
+        def load(self, *args):
+            loading.add(name)
+            time.sleep(0.05)
+            overlapped.append(len(loading) > 1)
+            if name == "codec":
+                self.codec = MagicMock()
+            elif name == "watermarker":
+                self.watermarker = MagicMock()
+        return load
+
+    with patch.object(NeuTTSAir, '_load_backbone', loader("backbone")), \
+            patch.object(NeuTTSAir, '_load_codec', loader("codec")), \
+            patch.object(NeuTTSAir, '_load_watermarker', loader("watermarker")):
+        engine = NeuTTSAir()
+
+    assert any(overlapped)
+    assert set(engine.load_timings) == {"backbone", "codec", "watermarker", "total"}
+    assert engine.load_timings["total"] < sum(
+        engine.load_timings[name] for name in ("backbone", "codec", "watermarker")
+    )
+
+
+def test_close_stops_the_watermark_worker():
+    def load_codec(self, *args):
+        self.codec = MagicMock()
+
+    def load_watermarker(self):
+        self.watermarker = MagicMock()
+        self.watermarker.apply_watermark.side_effect = lambda wav, sample_rate: wav
+
+    with patch.object(NeuTTSAir, '_load_backbone'), \
+            patch.object(NeuTTSAir, '_load_codec', load_codec), \
+            patch.object(NeuTTSAir, '_load_watermarker', load_watermarker):
+        engine = NeuTTSAir()
+
+    pending = engine.watermark_async([0.5])
+    engine.close()
+
+    assert pending.result() == [0.5]
+    with pytest.raises(RuntimeError):
+        engine.watermark_async([0.5])
+
+
+def test_only_module_construction_is_serialized():
+    constructing = set()
+    overlapped = []
+
+    def construct(name):
+        def build(*args, **kwargs):
+            constructing.add(name)
+            time.sleep(0.05)
+            overlapped.append(len(constructing) > 1)
+            constructing.discard(name)
+            return MagicMock()
+        return build
+
+    def download_codec(repo):
+        time.sleep(0.1)
+        return "pytorch_model.bin"
+
+    def load_gguf_backbone(self, *args):
+        time.sleep(0.1)
+
+    with patch.object(NeuTTSAir, '_load_backbone', load_gguf_backbone), \
+            patch('src.tts.weights.download_codec', download_codec), \
+            patch('src.tts.weights.read_codec_checkpoint', return_value={}), \
+            patch('src.tts.weights.build_codec', construct("codec")), \
+            patch('src.tts.engine.perth.PerthImplicitWatermarker', construct("watermarker")):
+        engine = NeuTTSAir()
+
+    assert overlapped == [False, False]
+    # The codec download does not hold the lock while the watermarker is built
+    assert engine.load_timings["watermarker_lock_wait"] < 0.05
+    assert "codec_lock_wait" in engine.load_timings
+    # The GGUF backbone still loads alongside them
+    assert engine.load_timings["total"] < engine.load_timings["backbone"] + 0.1
+
+
+def test_transformers_backbone_loads_like_from_pretrained(tmp_path):
+    import torch
+    from transformers import AutoModelForCausalLM, Qwen2Config, Qwen2ForCausalLM
+
+    config = Qwen2Config(
+        vocab_size=64, hidden_size=32, intermediate_size=64, num_hidden_layers=1,
+        num_attention_heads=4, num_key_value_heads=2, tie_word_embeddings=True
+    )
+    path = weights.cache_path(tmp_path, "test/tiny-backbone")
+    Qwen2ForCausalLM(config).save_pretrained(path)
+
+    engine = NeuTTSAir.__new__(NeuTTSAir)
+    engine._weights_cache_dir = tmp_path
+    engine.max_context = 2048
+    engine.load_timings = {}
+    with patch('transformers.AutoTokenizer.from_pretrained'):
+        engine._load_backbone("test/tiny-backbone", "cpu")
+
+    expected = AutoModelForCausalLM.from_pretrained(path, low_cpu_mem_usage=True)
+    tokens = torch.tensor([[1, 2, 3]])
+    assert not engine.backbone.training
+    assert torch.equal(engine.backbone(tokens).logits, expected(tokens).logits)
+    assert "backbone_lock_wait" in engine.load_timings
+
+
+def test_weight_cache_lookup(tmp_path):
+    assert weights.find_backbone(tmp_path, "neuphonic/neutts-air") is None
+    assert weights.find_codec(None, "neuphonic/neucodec") is None
+
+    backbone_dir = weights.cache_path(tmp_path, "neuphonic/neutts-air")
+    backbone_dir.mkdir(parents=True)
+    (backbone_dir / "config.json").write_text("{}")
+    gguf_dir = weights.cache_path(tmp_path, "neuphonic/neutts-air-q4-gguf")
+    gguf_dir.mkdir(parents=True)
+    (gguf_dir / "neutts-air-Q4-0.gguf").touch()
+
+    assert backbone_dir.name == "neuphonic--neutts-air"
+    assert weights.find_backbone(tmp_path, "neuphonic/neutts-air") == backbone_dir
+    assert weights.find_backbone(tmp_path, "neuphonic/neutts-air-q4-gguf") == gguf_dir / "neutts-air-Q4-0.gguf"
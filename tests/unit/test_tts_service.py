@@ -0,0 +1,308 @@
+from concurrent.futures import Future
+import json
+import threading
+import time
+import zipfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+import numpy as np
+import soundfile as sf
+from src.models.synthesis_request import BatchItem, BatchSynthesisRequest, SynthesisRequest
+from src.services.job_store import JobStore
+from src.services.output_store import OutputStore
+from src.services.tts_service import TTSService
+from src.utils.cancellation import CancellationToken
+
+
+class FakeEngine:
+    """Engine stand-in producing 100 samples per text chunk"""
+
+    def __init__(self):
+        self.generated = []
+
+    def encode_reference(self, path):
+        return np.arange(4)
+
+    def generate_codes(self, text, ref_codes, ref_text, language="en-us", cancel_token=None):
+        self.generated.append(text)
+        return [len(text)] * 2
+
+    def generate_codes_batch(self, texts, ref_codes, ref_text, language="en-us", cancel_token=None):
+        self.generated.append(list(texts))
+        # Texts mentioning "silence" yield no speech tokens
+        return [[] if "silence" in text else [len(text)] * 2 for text in texts]
+
+    def decode_batch(self, code_sequences):
+        return [np.full(100, 0.1, dtype=np.float32) for _ in code_sequences]
+
+    def warm_up(self, ref_audio_path, ref_text):
+        self.generate_codes("warm-up", self.encode_reference(ref_audio_path), ref_text)
+
+    def watermark_async(self, wav):
+        future = Future()
+        future.set_result(wav)
+        return future
+
+    def close(self):
+        self.closed = True
+
+
+def make_service(tmp_path):
+    service = TTSService(MagicMock(), tmp_path, decode_batch_size=2)
+    service._tts_engine = FakeEngine()
+    return service
+
+
+def make_request(tmp_path, text, **kwargs):
+    ref = tmp_path / "ref.wav"
+    ref.touch()
+    return SynthesisRequest(
+        input_text=text, ref_text="ref", ref_audio_path=ref,
+        max_tokens=20, session_id="s1", **kwargs
+    )
+
+
+def test_synthesize_writes_all_chunks(tmp_path):
+    service = make_service(tmp_path)
+    text = "First sentence here. Second one now. Third sentence too."
+
+    result = service.synthesize(make_request(tmp_path, text))
+
+    assert result.success, result.error_message
+    data, sample_rate = sf.read(str(result.output_path))
+    assert sample_rate == 24000
+    assert len(data) == 100 * result.chunks_processed
+    assert result.chunks_processed == 3
+
+
+def test_synthesize_encodes_requested_format(tmp_path):
+    service = make_service(tmp_path)
+
+    result = service.synthesize(make_request(tmp_path, "Hello there.", output_format="flac"))
+
+    assert result.success, result.error_message
+    assert result.output_file.endswith(".flac")
+    assert Path(result.output_path).with_suffix(".wav").exists()
+    assert sf.info(str(result.output_path)).frames == 100
+
+
+def test_outputs_are_named_by_content_and_deduplicated(tmp_path):
+    service = make_service(tmp_path)
+    service.output_store = OutputStore(tmp_path, tmp_path / "index.db")
+
+    first = service.synthesize(make_request(tmp_path, "Hello there.", output_format="flac"))
+    second = service.synthesize(make_request(tmp_path, "Hello there.", output_format="flac"))
+
+    assert first.success and second.success
+    assert first.output_file == second.output_file == first.output_path.name
+    assert first.output_file.endswith(".flac")
+    assert sorted(p.suffix for p in first.output_path.parent.glob(f"{first.output_path.stem}.*")) == [".flac", ".wav"]
+    assert list(tmp_path.glob("output_*")) == []
+
+
+def test_cancelled_synthesis_stops_between_chunks_and_leaves_no_files(tmp_path):
+    service = make_service(tmp_path)
+    token = CancellationToken()
+    steps = service._synthesis_steps(
+        make_request(tmp_path, "First sentence here. Second one now. Third sentence too."),
+        token
+    )
+
+    next(steps)
+    token.cancel()
+    try:
+        next(steps)
+    except StopIteration as stop:
+        result = stop.value
+
+    assert not result.success
+    assert len(service._tts_engine.generated) == 1
+    assert list(tmp_path.glob("output*")) == []
+    assert list(tmp_path.glob(".*.part")) == []
+
+
+def test_concurrent_first_requests_load_engine_once(tmp_path):
+    service = TTSService(MagicMock(), tmp_path)
+    loads = []
+
+    def load_engine(**kwargs):
+        loads.append(kwargs)
+        time.sleep(0.05)
+        return FakeEngine()
+
+    with patch("src.tts.engine.NeuTTSAir", side_effect=load_engine):
+        threads = [threading.Thread(target=service.get_tts_engine) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(loads) == 1
+
+
+def test_service_is_ready_only_after_warm_up(tmp_path):
+    service = TTSService(MagicMock(), tmp_path)
+    engine = FakeEngine()
+
+    with patch("src.tts.engine.NeuTTSAir", return_value=engine):
+        assert not service.is_ready
+        service.start_warm_up(tmp_path / "ref.wav", "ref").join()
+
+    assert service.is_ready
+    assert engine.generated == ["warm-up"]
+
+
+def test_interrupted_job_resumes_after_last_written_chunk(tmp_path):
+    text = "First sentence here. Second one now. Third sentence too."
+    crashed_store = JobStore(tmp_path / "jobs.db")
+    service = make_service(tmp_path)
+    service.job_store = crashed_store
+    request = make_request(tmp_path, text)
+    record = crashed_store.add("s1", request, "interactive")
+
+    # Two chunks are written, then the process goes away
+    steps = service._synthesis_steps(request, CancellationToken(), record)
+    next(steps)
+    next(steps)
+    steps.close()
+    crashed_store.close()
+    assert crashed_store.get("s1").chunks_done == 2
+
+    restarted = make_service(tmp_path)
+    restarted.job_store = JobStore(tmp_path / "jobs.db")
+    [recovered] = restarted.job_store.claim_orphaned()
+    steps = restarted._synthesis_steps(recovered.request, CancellationToken(), recovered)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            result = stop.value
+            break
+
+    assert result.success, result.error_message
+    assert restarted._tts_engine.generated == ["Third sentence too."]
+    assert sf.info(str(result.output_path)).frames == 300
+    assert restarted.job_store.get("s1").state == "completed"
+    assert list(tmp_path.glob(".*.part*")) == []
+
+
+class FakeProcessPool(FakeEngine):
+    """Pool stand-in whose infer() calls finish out of order"""
+
+    num_processes = 3
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def infer(self, text, ref_codes, ref_text, language="en-us", cancel_token=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        # Earlier chunks take longer, so later ones complete first
+        index = int(text.split()[1])
+        time.sleep(0.01 * (6 - index))
+        with self.lock:
+            self.active -= 1
+        return np.full(100, index / 10, dtype=np.float32)
+
+
+def test_long_document_runs_chunks_in_parallel_and_joins_them_in_order(tmp_path):
+    service = TTSService(MagicMock(), tmp_path, long_document_chunks=4, crossfade_ms=1)
+    service._tts_engine = pool = FakeProcessPool()
+    text = " ".join(f"Sentence {i} is here." for i in range(6))
+
+    result = service.synthesize(make_request(tmp_path, text))
+    service.shutdown()
+
+    assert result.success, result.error_message
+    assert result.chunks_processed == 6
+    assert pool.generated == []
+    assert pool.max_active == 3
+    data, _ = sf.read(str(result.output_path), dtype="float32")
+    # Six chunks joined by five 24-sample crossfades
+    assert len(data) == 6 * 100 - 5 * 24
+    starts = [0] + [i * 76 + 24 for i in range(1, 6)]
+    assert [round(float(data[start + 10]), 2) for start in starts] == [0.0, 0.1, 0.2, 0.3, 0.4, 0.5]
+
+
+def test_batch_generates_items_together_and_archives_outputs(tmp_path):
+    service = TTSService(MagicMock(), tmp_path, decode_batch_size=2, generation_batch_size=3)
+    service._tts_engine = engine = FakeEngine()
+    ref = tmp_path / "ref.wav"
+    ref.touch()
+    batch = BatchSynthesisRequest(
+        items=[
+            BatchItem("a", "First item."),
+            BatchItem("b", "Second item, one that is split. Into several chunks."),
+            BatchItem("c", "Pure silence."),
+            BatchItem("d", "Last item."),
+        ],
+        ref_text="ref", ref_audio_path=ref, max_tokens=20, session_id="batch1"
+    )
+
+    steps = service._batch_steps(batch)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            result = stop.value
+            break
+
+    assert result.success, result.error_message
+    # Six chunks (three of them item b's) in backbone passes of three
+    assert [len(texts) for texts in engine.generated] == [3, 3]
+
+    with zipfile.ZipFile(result.output_path) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        assert sorted(archive.namelist()) == ["a.wav", "b.wav", "d.wav", "manifest.json"]
+        with archive.open("b.wav") as item:
+            assert sf.info(item).frames == 300
+    assert [entry["status"] for entry in manifest["items"]] == ["completed", "completed", "failed", "completed"]
+    assert (tmp_path / "batch_batch1.json").exists()
+    assert not list(tmp_path.glob(".batch_*"))
+
+    item_updates = [call.args[1] for call in service.session_manager.send_item_result.call_args_list]
+    assert [update["id"] for update in item_updates] == ["a", "c", "b", "d"]
+
+
+class FakeStreamingEngine(FakeEngine):
+    """Engine stand-in with streaming inference that logs its calls"""
+
+    supports_streaming = True
+
+    def infer_stream(self, text, ref_codes, ref_text, language="en-us", cancel_token=None):
+        for i in range(3):
+            self.generated.append(f"stream {i}")
+            time.sleep(0.01)
+            yield np.full(10, i, dtype=np.float32)
+
+
+def test_stream_is_not_interleaved_with_other_jobs(tmp_path):
+    service = TTSService(MagicMock(), tmp_path, decode_batch_size=2)
+    service._tts_engine = engine = FakeStreamingEngine()
+
+    text = "A longer streamed text, so the queued job is cheaper and would be picked first."
+    chunks = service.synthesize_stream_async(make_request(tmp_path, text), job_id="stream")
+    time.sleep(0.005)
+    service.synthesize_async(make_request(tmp_path, "Short."))
+    received = list(chunks)
+    deadline = time.monotonic() + 5
+    while "Short." not in engine.generated and time.monotonic() < deadline:
+        time.sleep(0.01)
+    service.shutdown()
+
+    # The stream owns the engine until it finishes
+    assert engine.generated == ["stream 0", "stream 1", "stream 2"] * (len(received) // 3) + ["Short."]
+
+
+def test_shutdown_closes_the_engine(tmp_path):
+    service = make_service(tmp_path)
+    engine = service._tts_engine
+
+    service.shutdown()
+
+    assert engine.closed
+    assert service._tts_engine is None
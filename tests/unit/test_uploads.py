@@ -0,0 +1,70 @@
+import io
+import numpy as np
+import soundfile as sf
+from werkzeug.datastructures import FileStorage
+from src.api.app import create_app
+from src.services.file_manager import FileManager
+from src.utils.validators import sniff_audio_container
+
+
+def audio_bytes(seconds, fmt="WAV", sample_rate=24000):
+    buffer = io.BytesIO()
+    sf.write(buffer, np.zeros(int(seconds * sample_rate), dtype=np.float32), sample_rate, format=fmt)
+    return buffer.getvalue()
+
+
+def upload(data, filename):
+    return FileStorage(stream=io.BytesIO(data), filename=filename)
+
+
+def test_sniff_identifies_containers_from_leading_bytes():
+    assert sniff_audio_container(audio_bytes(0.1)[:12]) == "wav"
+    assert sniff_audio_container(audio_bytes(0.1, "FLAC")[:12]) == "flac"
+    assert sniff_audio_container(b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01\x42\xf7\x81") == "webm"
+    assert sniff_audio_container(b"\xff\xf1\x50\x80\x02\x1f\xfc\x21\x00\x00\x00\x00") is None
+    assert sniff_audio_container(b"<html><body>") is None
+
+
+def test_upload_is_saved_under_its_sniffed_format(tmp_path):
+    file_manager = FileManager(tmp_path / "uploads", tmp_path / "outputs", tmp_path / "samples")
+
+    success, path, error = file_manager.save_uploaded_audio(upload(audio_bytes(1, "FLAC"), "recording.wav"))
+
+    assert success, error
+    assert path.suffix == ".flac" and sf.info(str(path)).duration == 1.0
+    assert [p for p in (tmp_path / "uploads").rglob("*") if p.is_file()] == [path]
+
+
+def test_simultaneous_uploads_keep_their_own_files(tmp_path):
+    file_manager = FileManager(tmp_path / "uploads", tmp_path / "outputs", tmp_path / "samples")
+
+    paths = [file_manager.save_uploaded_audio(upload(audio_bytes(seconds), "voice.wav"))[1] for seconds in (1, 2)]
+
+    assert paths[0] != paths[1]
+    assert [sf.info(str(path)).duration for path in paths] == [1.0, 2.0]
+
+
+def test_bad_uploads_are_rejected_and_removed(tmp_path):
+    file_manager = FileManager(tmp_path / "uploads", tmp_path / "outputs", tmp_path / "samples")
+
+    results = [
+        file_manager.save_uploaded_audio(upload(b"not audio at all", "voice.wav")),
+        file_manager.save_uploaded_audio(upload(audio_bytes(3), "voice.wav"), max_duration_seconds=2),
+        file_manager.save_uploaded_audio(upload(audio_bytes(0), "voice.wav")),
+        file_manager.save_uploaded_audio(upload(b"\0" * (2 * 1024 * 1024), "voice.wav"), max_size_mb=1),
+    ]
+
+    expected = ["Unsupported audio format", "Audio too long", "Audio file contains no audio", "File too large"]
+    assert all(error.startswith(prefix) for (_, _, error), prefix in zip(results, expected))
+    assert not any(p.is_file() for p in (tmp_path / "uploads").rglob("*"))
+
+
+def test_oversized_upload_is_rejected_while_streaming():
+    app = create_app("testing")
+    app.config["MAX_UPLOAD_SIZE_MB"] = 1
+    data = {"input_text": "Hello.", "ref_text": "Hi.", "ref_audio": (io.BytesIO(b"\0" * (2 * 1024 * 1024)), "a.wav")}
+
+    response = app.test_client().post("/api/synthesize", data=data)
+
+    assert response.status_code == 413
+    assert not any(p.name.startswith(".upload_") for p in app.config["UPLOAD_FOLDER"].rglob("*"))